@@ -1,3 +1,5 @@
+import os
+import sys
 import time
 import csv
 import re
@@ -13,10 +15,15 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+# Shared helpers (exports.py) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from exports import export_widget
+from resource_blocking import block_selenium, block_selenium_options
+
 OBI_URL = "https://www.obi.de"
 
-def setup_driver(headless: bool = True) -> webdriver.Chrome:
-    """Setup Chrome WebDriver."""
+def setup_driver(headless: bool = True, block_resources: bool = True) -> webdriver.Chrome:
+    """Setup Chrome WebDriver (without images, fonts, media and trackers unless block_resources=False)."""
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -28,7 +35,11 @@ def setup_driver(headless: bool = True) -> webdriver.Chrome:
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
     )
+    if block_resources:
+        block_selenium_options(options)
     driver = webdriver.Chrome(options=options)
+    if block_resources:
+        block_selenium(driver)
     driver.implicitly_wait(5)
     return driver
 
@@ -264,57 +275,56 @@ def main():
                     # Save to CSV
                     save_to_csv("obi_offers.csv", offers)
                     
-                    # Display results
-                    st.success(f"✅ Found {len(offers)} products!")
-                    
-                    # Convert to DataFrame for better display
-                    df = pd.DataFrame(offers)
-                    
-                    # Find cheapest product
-                    valid_prices = [o for o in offers if price_to_float(o['price']) < 999999]
-                    if valid_prices:
-                        cheapest = min(valid_prices, key=lambda x: price_to_float(x['price']))
-                        st.info(f"💶 **Cheapest offer:** {cheapest['product']} for **{cheapest['price']}**")
-                    
-                    # Display products in cards
-                    st.subheader("📦 Products")
-                    for idx, offer in enumerate(offers, 1):
-                        with st.expander(f"{idx}. {offer['product']}", expanded=True):
-                            col_a, col_b = st.columns([3, 1])
-                            with col_a:
-                                st.markdown(f"**Price:** {offer['price']}")
-                                st.markdown(f"**Site:** {offer['site']}")
-                            with col_b:
-                                st.link_button("🔗 View Product", offer['link'], use_container_width=True)
-                    
-                    # Display as table
-                    st.subheader("📊 Results Table")
-                    st.dataframe(
-                        df,
-                        column_config={
-                            "link": st.column_config.LinkColumn("Product Link"),
-                            "product": "Product Name",
-                            "price": "Price",
-                            "site": "Website"
-                        },
-                        hide_index=True,
-                        use_container_width=True
-                    )
-                    
-                    # Download button
-                    csv_data = df.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="📥 Download CSV",
-                        data=csv_data,
-                        file_name="obi_offers.csv",
-                        mime="text/csv",
-                    )
-                    
+                    st.session_state.obi_offers = offers
+                    st.session_state.obi_offers_version = st.session_state.get('obi_offers_version', 0) + 1
             except Exception as e:
                 st.error(f"❌ Error occurred: {str(e)}")
             finally:
                 if driver:
                     driver.quit()
+
+    # Results survive reruns so the export is only built when requested
+    offers = st.session_state.get('obi_offers')
+    if offers:
+        # Display results
+        st.success(f"✅ Found {len(offers)} products!")
+        
+        # Convert to DataFrame for better display
+        df = pd.DataFrame(offers)
+        
+        # Find cheapest product
+        valid_prices = [o for o in offers if price_to_float(o['price']) < 999999]
+        if valid_prices:
+            cheapest = min(valid_prices, key=lambda x: price_to_float(x['price']))
+            st.info(f"💶 **Cheapest offer:** {cheapest['product']} for **{cheapest['price']}**")
+        
+        # Display products in cards
+        st.subheader("📦 Products")
+        for idx, offer in enumerate(offers, 1):
+            with st.expander(f"{idx}. {offer['product']}", expanded=True):
+                col_a, col_b = st.columns([3, 1])
+                with col_a:
+                    st.markdown(f"**Price:** {offer['price']}")
+                    st.markdown(f"**Site:** {offer['site']}")
+                with col_b:
+                    st.link_button("🔗 View Product", offer['link'], use_container_width=True)
+        
+        # Display as table
+        st.subheader("📊 Results Table")
+        st.dataframe(
+            df,
+            column_config={
+                "link": st.column_config.LinkColumn("Product Link"),
+                "product": "Product Name",
+                "price": "Price",
+                "site": "Website"
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+        # Download (CSV/Parquet/Excel) is built on click
+        export_widget(offers, "obi_offers", key="obi_export", version=st.session_state.obi_offers_version)
     
     # Instructions
     with st.expander("ℹ️ How to use"):
@@ -4,85 +4,60 @@ import os
 import glob
 import re
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import time
+import tempfile
 from pathlib import Path
 
-# Load environment variables with fallback for Streamlit Cloud
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # On Streamlit Cloud, use st.secrets instead
-    pass
-
-# Transcriber imports
-import speech_recognition as sr
-import pyaudio
-from playwright.sync_api import sync_playwright
-from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
-import openai
+# Settings (.env / st.secrets), LLM gateway, HTTP pool, browser pool: built once per process
+from resources import (get_settings, get_llm_gateway, get_http_session, get_browser_pool, get_form_runner,
+                       get_form_cache, ensure_folders, render_resource_panel, PHONE_RE, FILENAME_UNSAFE_RE)
+
+# Load environment variables with fallback for Streamlit Cloud (once per process)
+get_settings()
+
+# Heavy optional dependencies (speech_recognition/pyaudio, playwright, selenium,
+# openai, bs4) are imported on first use via features.require(), so the hub
+# starts without them and a cold start only pays for what is used
+from features import FeatureUnavailable, missing, require, render_feature_status
 
 # Job Scraper imports
 import requests
-from bs4 import BeautifulSoup
+from job_discovery import discover_job_urls, DEFAULT_JOB_URL_PATTERN
+from job_posting import extract_job_postings
+from exports import export_widget
+from report_store import ReportStore, PAGE_SIZE as REPORTS_PAGE_SIZE
+from instrumentation import span, timed, record, render_diagnostics
+from form_runner import CONCURRENCY as FORM_CONCURRENCY, MAX_CONCURRENCY as MAX_FORM_CONCURRENCY
+from form_profiles import PROFILES, PROFILE_LABELS, get_profile, wait_for_form
+from form_html import compact_form_html
+from form_fields import extract_form_fields_regex
+from form_cache import parse as parse_html
+from field_classifier import confident_mapping, log_examples
+from resource_blocking import block_selenium, block_selenium_options
+from metrics import (start_metrics_server, PAGES_FETCHED, BYTES_FETCHED, JOBS_FOUND,
+                     PHONES_FOUND, FORMS_FILLED, SHOP_RESULTS, QUEUE_DEPTH)
 
 # Shopping Agent imports
 from urllib.parse import quote_plus
 import csv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-
-# ===== OpenAI integration =====
-# Try to get API key from environment or Streamlit secrets
-try:
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or st.secrets.get("OPENAI_API_KEY")
-except:
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Detect and support both new and legacy OpenAI SDKs
-client_new = None
-client_legacy = None
-openai_mode = None   # "new" or "legacy" or None
-
-try:
-    # New SDK (>=1.0): from openai import OpenAI
-    from openai import OpenAI
-    client_new = OpenAI(api_key=OPENAI_API_KEY)
-    openai_mode = "new"
-except Exception:
-    try:
-        # Legacy SDK (<1.0): import openai and set api_key
-        import openai as openai_legacy
-        openai_legacy.api_key = OPENAI_API_KEY
-        client_legacy = openai_legacy
-        openai_mode = "legacy"
-    except Exception:
-        openai_mode = None
 
 # === CONFIG ===
 JOBS_FOLDER = "scraped_jobs"
 REPORTS_FOLDER = "hvac_reports"
 LANGUAGE = "de-DE"
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
 
 # === SETUP ===
-os.makedirs(JOBS_FOLDER, exist_ok=True)
-os.makedirs(REPORTS_FOLDER, exist_ok=True)
-
-# Initialize session state
-if 'jobs' not in st.session_state:
-    st.session_state.jobs = []
-if 'scraping_history' not in st.session_state:
-    st.session_state.scraping_history = []
-if 'transcribed_text' not in st.session_state:
-    st.session_state.transcribed_text = ""
-if 'recording_status' not in st.session_state:
-    st.session_state.recording_status = ""
+ensure_folders(JOBS_FOLDER, REPORTS_FOLDER)
+
+# Prometheus /metrics endpoint (started once per process, not per rerun)
+start_metrics_server()
+
+# Initialize session state (only missing keys are set)
+for key, default in {"jobs": [], "scraping_history": [], "transcribed_text": "", "recording_status": ""}.items():
+    st.session_state.setdefault(key, default)
 
 # Page configuration
 st.set_page_config(page_title="Agent Hub", page_icon="🚀", layout="wide")
@@ -92,44 +67,86 @@ class JobScraper:
     """Main job scraper class"""
     
     def __init__(self):
+        self.session = get_http_session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
     
-    def scrape_jobs(self, url, job_selector=None, title_selector=None, company_selector=None, location_selector=None):
+    @timed("scraper.scrape_jobs")
+    def scrape_jobs(self, url, job_selector=None, title_selector=None, company_selector=None, location_selector=None, use_structured_data=True):
         """
         Scrape jobs from a given URL with custom selectors
         """
-        jobs = []
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            with span("fetch.scrape_jobs"):
+                response = self.session.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # If selectors provided, use them
-            if job_selector:
-                job_elements = soup.select(job_selector)
-                
-                for job_elem in job_elements:
-                    job_data = {
-                        'title': self._extract_text(job_elem, title_selector),
-                        'company': self._extract_text(job_elem, company_selector),
-                        'location': self._extract_text(job_elem, location_selector),
-                        'url': url,
-                        'scraped_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    jobs.append(job_data)
-            else:
-                # Generic scraping - look for common patterns
-                jobs = self._generic_scrape(soup, url)
-            
+            PAGES_FETCHED.inc(source="scraper")
+            BYTES_FETCHED.inc(len(response.content), source="scraper")
+            jobs = self.parse_jobs(self._decode(response), url, job_selector, title_selector,
+                                   company_selector, location_selector, use_structured_data)
+            JOBS_FOUND.inc(len(jobs), source="scraper")
             return jobs
             
         except requests.RequestException as e:
             st.error(f"Error scraping {url}: {e}")
             return []
     
+    @timed("parse.parse_jobs")
+    def parse_jobs(self, html, url, job_selector=None, title_selector=None, company_selector=None, location_selector=None, use_structured_data=True):
+        """
+        Extract jobs from already downloaded HTML
+        """
+        # Structured schema.org JobPosting data first - no soup needed
+        if use_structured_data:
+            with span("parse.job_posting_ld"):
+                jobs = extract_job_postings(html, url)
+            if jobs:
+                return jobs
+        
+        jobs = []
+        with span("parse.soup"):
+            require("html")
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html, 'html.parser')
+        
+        # If selectors provided, use them
+        if job_selector:
+            with span("parse.select"):
+                job_elements = soup.select(job_selector)
+            
+            for job_elem in job_elements:
+                job_data = {
+                    'title': self._extract_text(job_elem, title_selector),
+                    'company': self._extract_text(job_elem, company_selector),
+                    'location': self._extract_text(job_elem, location_selector),
+                    'url': url,
+                    'scraped_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+                jobs.append(job_data)
+        else:
+            # Generic scraping - look for common patterns
+            jobs = self._generic_scrape(soup, url)
+        
+        return jobs
+    
+    def _decode(self, response):
+        """Response text: header charset, else the page's <meta charset>, else UTF-8 or a guess"""
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.text
+        content = response.content
+        match = META_CHARSET_RE.search(content[:4096])
+        if match:
+            try:
+                return content.decode(match.group(1).decode('ascii'), errors='replace')
+            except LookupError:
+                pass  # unknown charset name
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            # Mostly ISO-8859-1/Windows-1252 pages without any declaration
+            return content.decode(response.apparent_encoding or 'windows-1252', errors='replace')
+    
     def _extract_text(self, element, selector):
         """Extract text from element using selector"""
         if not selector:
@@ -140,6 +157,7 @@ class JobScraper:
         except:
             return "N/A"
     
+    @timed("parse.generic_scrape")
     def _generic_scrape(self, soup, url):
         """Generic scraping for common job listing patterns"""
         jobs = []
@@ -161,6 +179,7 @@ class JobScraper:
         
         return jobs
     
+    @timed("io.save_jobs_csv")
     def save_to_csv(self, jobs, filename=None):
         """Save scraped jobs to CSV file"""
         if not jobs:
@@ -175,6 +194,40 @@ class JobScraper:
         df.to_csv(filepath, index=False)
         return filepath
 
+# Organized storage folder for downloaded job pages
+STORAGE_FOLDER = Path("org")
+
+@timed("fetch.save_website")
+def save_website(url):
+    """Download a page into the storage folder once; returns (filename, downloaded)."""
+    filename = STORAGE_FOLDER / f"{FILENAME_UNSAFE_RE.sub('_', url)}.html"
+    if not filename.exists():
+        start = time.perf_counter_ns()
+        r = get_http_session().get(url)
+        # elapsed = time until the response headers were parsed, the rest is the body transfer
+        headers_ns = int(r.elapsed.total_seconds() * 1e9)
+        record("fetch.http_headers", headers_ns)
+        record("fetch.http_body", max(time.perf_counter_ns() - start - headers_ns, 0))
+        r.raise_for_status()
+        PAGES_FETCHED.inc(source="job_finder")
+        BYTES_FETCHED.inc(len(r.content), source="job_finder")
+        with span("io.write_page"):
+            with open(filename, "wb") as f:
+                f.write(r.content)
+        return filename, True
+    return filename, False  # Already downloaded
+
+@timed("parse.analyze_file")
+def analyze_file(filename, keyword):
+    """Check a saved page for the keyword and return the first phone number."""
+    with span("io.read_page"):
+        contents = Path(filename).read_text(encoding="utf-8")
+    with span("regex.analyze_file"):
+        found = keyword in contents
+        phones = PHONE_RE.findall(contents)
+    first_phone = phones[0] if phones else None
+    return found, first_phone
+
 def get_saved_files():
     """Get list of all saved CSV files"""
     files = glob.glob(os.path.join(JOBS_FOLDER, "jobs_*.csv"))
@@ -191,6 +244,10 @@ def load_csv_data(filepath):
 # ===== TRANSCRIBER FUNCTIONS =====
 def record_speech_simple(duration=10):
     """Capture audio with a simple timeout-based approach."""
+    require("microphone")
+    import speech_recognition as sr
+    from transcription import calibrate, remember_threshold, prepare_for_recognition
+
     r = sr.Recognizer()
     r.energy_threshold = 300
     r.dynamic_energy_threshold = True
@@ -198,12 +255,19 @@ def record_speech_simple(duration=10):
     
     with sr.Microphone() as source:
         st.session_state.recording_status = "🎙️ Adjusting for ambient noise..."
-        r.adjust_for_ambient_noise(source, duration=0.5)
+        # Only the first recording per device (or after 10 min) pays the 0.5 s calibration
+        calibrate(r, source)
         st.session_state.recording_status = "🔴 Recording... Speak now!"
         
         try:
             # Record with shorter phrase limit for better responsiveness
             audio = r.listen(source, timeout=5, phrase_time_limit=duration)
+            remember_threshold(r)
+            # Trim silence so only speech is sent to recognition
+            audio = prepare_for_recognition(audio, r)
+            if audio is None:
+                st.session_state.recording_status = "⏰ No speech detected. Please try again."
+                return None, r
             st.session_state.recording_status = "✅ Recording complete!"
             return audio, r
         except sr.WaitTimeoutError:
@@ -213,34 +277,60 @@ def record_speech_simple(duration=10):
             st.session_state.recording_status = f"❌ Recording error: {str(e)}"
             return None, r
 
-def convert_to_text(audio, recognizer):
+@st.cache_resource(show_spinner="Lade Spracherkennung...")
+def get_speech_backend(name, language=LANGUAGE):
+    """Speech backend kept resident across reruns (an offline model is loaded only once)."""
+    from speech_backends import load_backend
+    return load_backend(name, language)
+
+def active_speech_backend():
+    """Configured backend plus a warning if it had to fall back to Google."""
+    from speech_backends import configured_backend
+    name = configured_backend()
+    try:
+        return get_speech_backend(name), None
+    except RuntimeError as e:
+        return get_speech_backend("google"), f"⚠️ {e} – verwende Google-Spracherkennung."
+
+def convert_to_text(audio, backend):
     """Convert recorded speech to text."""
     if audio is None:
         return None, "⏰ No audio recorded. Please try again."
-    
+    import speech_recognition as sr
+
     try:
-        text = recognizer.recognize_google(audio, language=LANGUAGE)
+        text = backend.recognize(audio)
         return text, None
     except sr.UnknownValueError:
         return None, "⚠️ Could not understand audio. Please try again."
     except sr.RequestError as e:
         return None, f"❌ Could not connect to speech recognition service: {e}"
 
-def save_report(text):
-    """Save the recognized text to a timestamped report file."""
+def save_report(text, technician="", customer=""):
+    """Save the recognized text to a timestamped report file and index it."""
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     filename = f"report_{timestamp}.txt"
     filepath = os.path.join(REPORTS_FOLDER, filename)
+    # Batch transcription can finish several reports within one second
+    n = 1
+    while os.path.exists(filepath):
+        filepath = os.path.join(REPORTS_FOLDER, f"report_{timestamp}_{n}.txt")
+        n += 1
     with open(filepath, "w", encoding="utf-8") as f:
         f.write(f"HVAC Report – {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if technician:
+            f.write(f"Techniker: {technician}\n")
+        if customer:
+            f.write(f"Kunde: {customer}\n")
         f.write("=" * 50 + "\n")
         f.write(text + "\n")
+    get_report_store().add(filepath)
     return filepath
 
-def get_saved_reports():
-    """Get list of all saved reports."""
-    reports = glob.glob(os.path.join(REPORTS_FOLDER, "report_*.txt"))
-    return sorted(reports, reverse=True)
+@st.cache_resource
+def get_report_store():
+    """Report index shared by all sessions (hvac_reports/reports.db)."""
+    return ReportStore(REPORTS_FOLDER)
 
 # ===== KONTAKT AGENT FUNCTIONS =====
 def split_full_name(name_str):
@@ -261,94 +351,51 @@ def normalize_selector_value(v):
         return v if v else None
     return None
 
-def extract_form_fields_regex(html):
-    soup = BeautifulSoup(html, "html.parser")
-    forms = soup.find_all("form")
-    if not forms:
-        return None
-
-    # Pick the largest form
-    form = max(forms, key=lambda f: len(f.find_all(["input", "textarea", "select"])))
-
-    mapping = {}
-
-    def selector(inp):
-        if inp.get("id"): return f"#{inp.get('id')}"
-        if inp.get("name"): return f"[name='{inp.get('name')}']"
-        return None
-
-    for inp in form.find_all(["input", "textarea", "select"]):
-        attr_text = " ".join([
-            (inp.get("name") or ""),
-            (inp.get("id") or ""),
-            (inp.get("placeholder") or ""),
-            (inp.get("aria-label") or "")
-        ]).lower()
-
-        if inp.get("id"):
-            label_tag = soup.find("label", {"for": inp.get("id")})
-            if label_tag:
-                attr_text += " " + label_tag.text.strip().lower()
-
-        sel = selector(inp)
-
-        # Create field info dictionary
-        field_info = {
-            'selector': sel,
-            'name': inp.get('name'),
-            'id': inp.get('id'),
-            'type': inp.get('type'),
-            'placeholder': inp.get('placeholder')
-        }
-
-        # Name fields
-        if re.search(r"(full.?name|your.?name|contact.?name|^name$|\bname\b)", attr_text):
-            mapping.setdefault("name", field_info)
-        if re.search(r"(vorname|first.?name|given.?name|\bfname\b)", attr_text):
-            mapping.setdefault("first_name", field_info)
-        if re.search(r"(nachname|last.?name|family.?name|\blname\b|surname)", attr_text):
-            mapping.setdefault("last_name", field_info)
-
-        # Email
-        if re.search(r"(mail|e.?mail)", attr_text) or (inp.get("type") or "").lower() == "email":
-            mapping.setdefault("email", field_info)
-
-        # Phone
-        if re.search(r"(telefon|handy|mobil|phone|tel|telephone|phone.?number)", attr_text) or (inp.get("type") or "").lower() == "tel":
-            mapping.setdefault("phone", field_info)
-
-        # Street (address line)
-        if re.search(r"(stra(ss|ß)e|street|address(\s*line)?\s*1|hausnummer|addr1)", attr_text):
-            mapping.setdefault("street", field_info)
-
-        # ZIP/PLZ
-        if re.search(r"(plz|zip|postal.?code|post.?code)", attr_text):
-            mapping.setdefault("zip", field_info)
-
-        # City
-        if re.search(r"(ort|stadt|city|locality|town)", attr_text):
-            mapping.setdefault("city", field_info)
-
-        # Message
-        if re.search(r"(nachricht|message|bemerkung|kommentar|anschreiben|cover.?letter|motivation|inquiry|comments|text)", attr_text) or inp.name == "textarea":
-            mapping.setdefault("message", field_info)
-
-    return mapping if mapping else None
-
-def ai_extract_form_fields(html):
-    if openai_mode is None:
+def _field_infos(selectors):
+    """field -> selector (LLM/cache format) to the field info dicts of the regex extractor."""
+    result_mapping = {}
+    for k in ["first_name", "last_name", "name", "email", "phone", "street", "zip", "city", "message"]:
+        selector = normalize_selector_value(selectors.get(k))
+        if selector:
+            result_mapping[k] = {
+                'selector': selector,
+                'name': None,
+                'id': None,
+                'type': None,
+                'placeholder': None
+            }
+    return result_mapping or None
+
+@timed("llm.ai_extract_form_fields")
+def ai_extract_form_fields(html, url=None, form_cache=None):
+    # A form mapped before (same domain, same field structure) skips the LLM
+    cache_key = None
+    if url and form_cache is not None:
+        cached, cache_key = form_cache.lookup(url, html)
+        if cached:
+            return _field_infos(cached)
+
+    # Local classifier first: the LLM is only asked when it is unsure
+    local = confident_mapping(parse_html(html))
+    if local:
+        return _field_infos(local)
+
+    llm = get_llm_gateway()
+    if not llm.available:
         return None
 
-    max_chars = 60000
-    html_snippet = html[:max_chars] if len(html) > max_chars else html
+    # Only the forms and their labels, not the first 60,000 characters of the page
+    html_snippet = compact_form_html(html)
+    if not html_snippet:
+        return None  # no fillable fields
 
     system_prompt = (
-        "Du bist ein Experte für Web-Formulare. Du erhältst das GERENDERTE HTML einer Seite und sollst die besten Felder "
+        "Du bist ein Experte für Web-Formulare. Du erhältst die Formulare einer gerenderten Seite (gekürztes HTML: nur Formulare, Labels und Felder) und sollst die besten Felder "
         "(input/textarea/select) für folgende Zwecke identifizieren: first_name, last_name, name, email, phone, street, zip, city, message.\n\n"
         "Ziel: Liefere AUSSCHLIESSLICH ein JSON-Objekt mit GENAU diesen Schlüsseln. Jeder Wert ist entweder ein CSS-Selektor (String) oder null.\n\n"
         "Suche gründlich in: id, name, placeholder, aria-label, type, <label for=...>-Texten und nahen Überschriften. IDs/Namen sind oft englisch/zusammengesetzt "
         "(z. B. text-name, your_name, first_name, last_name, email_address, phone_number, locality, town, street, address_line1, zip, postal_code, message, comments).\n"
-        "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child ohne Not. "
+        "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child/:nth-of-type und keine >-Kombinatoren (die Struktur ist gekürzt). "
         "Nur sichtbare, interaktive Felder.\n"
         "Feldlogik (de+en): first_name (vorname/given_name), last_name (nachname/family_name/surname), name (fullname), email, phone, street (straße/strasse/address/address_line1/hausnummer), "
         "zip (plz/zip/postal_code), city (ort/stadt/locality/town), message (textarea bevorzugt).\n"
@@ -357,47 +404,24 @@ def ai_extract_form_fields(html):
     user_prompt = f"HTML:\n\n{html_snippet}\n\nGib NUR das JSON-Objekt zurück mit den Schlüsseln: first_name, last_name, name, email, phone, street, zip, city, message."
 
     try:
-        if openai_mode == "new":
-            completion = client_new.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0,
-                response_format={"type": "json_object"}
-            )
-            content = completion.choices[0].message.content.strip()
-        else:
-            resp = client_legacy.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0
-            )
-            content = resp.choices[0].message["content"].strip()
-            m = re.search(r"\{[\s\S]*\}", content)
-            content = m.group(0) if m else content
-
+        content = llm.complete(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            model="gpt-4o-mini",
+            json_mode=True,
+            temperature=0
+        )
         mapping = json.loads(content)
         
         # Convert string selectors to field info dictionaries
-        result_mapping = {}
-        for k in ["first_name", "last_name", "name", "email", "phone", "street", "zip", "city", "message"]:
-            selector = normalize_selector_value(mapping.get(k))
-            if selector:
-                result_mapping[k] = {
-                    'selector': selector,
-                    'name': None,
-                    'id': None,
-                    'type': None,
-                    'placeholder': None
-                }
-        
-        if not result_mapping:
-            return None
+        result_mapping = _field_infos(mapping)
+        if result_mapping:
+            selectors = {k: v['selector'] for k, v in result_mapping.items()}
+            if form_cache is not None:
+                form_cache.store(cache_key, selectors)
+            log_examples(url, html, selectors)  # training data for the local classifier
         return result_mapping
     except Exception as e:
         st.warning(f"KI-Extraktion fehlgeschlagen: {e}")
@@ -459,6 +483,7 @@ def submit_form(page, debug=False):
         st.warning("Kein Absende-Button gefunden")
     return False
 
+@timed("browser.fill_form_automation")
 def fill_form_automation(url, form_data, use_ai=True, debug=False):
     """Complete form automation exactly like the example code."""
     results = {
@@ -469,113 +494,12 @@ def fill_form_automation(url, form_data, use_ai=True, debug=False):
         'error': None
     }
     
+    # Slow motion and fixed pauses only for watching a debug run
+    profile = get_profile("debug" if debug else "fast")
     try:
-        # Start playwright exactly like in example
-        playwright = sync_playwright().start()
-        browser = playwright.firefox.launch(headless=False, slow_mo=200)
-        page = browser.new_page()
-        
-        # Go to page
-        page.goto(url, wait_until="networkidle")
-        
-        # Special handling for arnovogel.de - exact sequence from example
-        if "arnovogel.de" in url:
-            try:
-                # Click contact button FIRST
-                page.locator("#header_contact_btn").click()
-                page.wait_for_timeout(1000)  # Wait for form to appear
-                
-                # Click radio button
-                page.locator("#radio1").click()
-                
-                # Fill form fields exactly like in example
-                page.locator("#name").fill(form_data.get('name', 'Maddox'))
-                page.locator("#strasse").fill(form_data.get('strasse', 'Sciuchetti'))
-                page.locator("#plz").fill(form_data.get('plz', '14193'))
-                page.locator("#ort").fill(form_data.get('ort', 'Berlin'))
-                page.locator("#telefon").fill(form_data.get('telefon', '01512'))
-                page.locator("#mail").fill(form_data.get('mail', 'maddoxsciuchetti@icloud.com'))
-                page.locator("#message").fill(form_data.get('message', 'Guten Tag - kann ich bei euch ein Praktikum in einer länge von zwei Wochen?'))
-                page.locator("#Check_Datenschutz").click()
-                page.locator("html").press("End")
-                
-                # Track filled fields
-                filled_fields = [
-                    f"name: {form_data.get('name', 'Maddox')}",
-                    f"strasse: {form_data.get('strasse', 'Sciuchetti')}",
-                    f"plz: {form_data.get('plz', '14193')}",
-                    f"ort: {form_data.get('ort', 'Berlin')}",
-                    f"telefon: {form_data.get('telefon', '01512')}",
-                    f"mail: {form_data.get('mail', 'maddoxsciuchetti@icloud.com')}",
-                    f"message: {form_data.get('message', 'Guten Tag - kann ich bei euch ein Praktikum in einer länge von zwei Wochen?')}"
-                ]
-                
-                results['fields_filled'] = filled_fields
-                results['submitted'] = True  # Assume submitted since we followed the exact sequence
-                
-                if debug:
-                    st.success(f"✅ Formular auf {url} nach Beispiel ausgeführt!")
-                    st.write(f"Gefüllte Felder: {len(filled_fields)}")
-                    for field in filled_fields:
-                        st.write(f"• {field}")
-                
-            except Exception as e:
-                results['error'] = f"Fehler bei arnovogel.de: {str(e)}"
-                if debug:
-                    st.error(f"❌ Fehler bei arnovogel.de: {str(e)}")
-        
-        else:
-            # For other websites, try to extract and fill normally
-            html = page.content()
-            
-            # Extract form fields
-            if use_ai:
-                fields = ai_extract_form_fields(html)
-            else:
-                fields = extract_form_fields_regex(html)
-            
-            if fields:
-                results['fields_found'] = fields
-                
-                # Fill the form
-                filled_fields = []
-                for field_type, field_info in fields.items():
-                    if field_type in form_data and form_data[field_type]:
-                        selector = field_info.get('selector')
-                        if selector:
-                            try:
-                                page.locator(selector).fill(form_data[field_type])
-                                filled_fields.append(f"{field_type}: {form_data[field_type]}")
-                                if debug:
-                                    st.success(f"[{field_type}] Gefüllt: {form_data[field_type]}")
-                            except Exception as e:
-                                if debug:
-                                    st.warning(f"[{field_type}] Feld nicht gefunden: {selector}")
-                
-                results['fields_filled'] = filled_fields
-                
-                # Try to submit
-                try:
-                    page.locator("button[type='submit']").click()
-                    results['submitted'] = True
-                except Exception:
-                    results['submitted'] = False
-                
-                if debug:
-                    st.success(f"✅ Formular auf {url} verarbeitet!")
-                    st.write(f"Gefundene Felder: {len(fields)}")
-                    st.write(f"Gefüllte Felder: {len(filled_fields)}")
-            else:
-                results['error'] = "Keine Formularfelder gefunden"
-                if debug:
-                    st.warning(f"⚠️ Keine Formularfelder auf {url} gefunden")
-        
-        # Keep browser open for debugging
-        if debug:
-            page.pause()
-        else:
-            browser.close()
-            
+        # Warm browser from the pool; every URL gets its own context
+        get_browser_pool().run(_fill_form_page, url, form_data, use_ai, debug, results, profile,
+                               headless=not debug, profile=profile)
     except Exception as e:
         results['error'] = str(e)
         if debug:
@@ -583,6 +507,160 @@ def fill_form_automation(url, form_data, use_ai=True, debug=False):
     
     return results
 
+def _fill_form_page(page, url, form_data, use_ai, debug, results, profile):
+    """Body of fill_form_automation; runs on the browser's pool thread."""
+    # Go to page; "networkidle" never fires on sites with analytics beacons
+    with span("browser.goto"):
+        page.goto(url, wait_until=profile["wait_until"])
+    
+    # Special handling for arnovogel.de - exact sequence from example
+    if "arnovogel.de" in url:
+        try:
+            # Click contact button FIRST
+            page.locator("#header_contact_btn").click()
+            page.locator("#radio1").wait_for(state="visible")  # Wait for form to appear
+            
+            # Click radio button
+            page.locator("#radio1").click()
+            
+            # Fill form fields exactly like in example
+            page.locator("#name").fill(form_data.get('name', 'Maddox'))
+            page.locator("#strasse").fill(form_data.get('strasse', 'Sciuchetti'))
+            page.locator("#plz").fill(form_data.get('plz', '14193'))
+            page.locator("#ort").fill(form_data.get('ort', 'Berlin'))
+            page.locator("#telefon").fill(form_data.get('telefon', '01512'))
+            page.locator("#mail").fill(form_data.get('mail', 'maddoxsciuchetti@icloud.com'))
+            page.locator("#message").fill(form_data.get('message', 'Guten Tag - kann ich bei euch ein Praktikum in einer länge von zwei Wochen?'))
+            page.locator("#Check_Datenschutz").click()
+            page.locator("html").press("End")
+            
+            # Track filled fields
+            filled_fields = [
+                f"name: {form_data.get('name', 'Maddox')}",
+                f"strasse: {form_data.get('strasse', 'Sciuchetti')}",
+                f"plz: {form_data.get('plz', '14193')}",
+                f"ort: {form_data.get('ort', 'Berlin')}",
+                f"telefon: {form_data.get('telefon', '01512')}",
+                f"mail: {form_data.get('mail', 'maddoxsciuchetti@icloud.com')}",
+                f"message: {form_data.get('message', 'Guten Tag - kann ich bei euch ein Praktikum in einer länge von zwei Wochen?')}"
+            ]
+            
+            results['fields_filled'] = filled_fields
+            results['submitted'] = True  # Assume submitted since we followed the exact sequence
+            FORMS_FILLED.inc()
+            
+            if debug:
+                st.success(f"✅ Formular auf {url} nach Beispiel ausgeführt!")
+                st.write(f"Gefüllte Felder: {len(filled_fields)}")
+                for field in filled_fields:
+                    st.write(f"• {field}")
+            
+        except Exception as e:
+            results['error'] = f"Fehler bei arnovogel.de: {str(e)}"
+            if debug:
+                st.error(f"❌ Fehler bei arnovogel.de: {str(e)}")
+    
+    else:
+        # For other websites, try to extract and fill normally
+        wait_for_form(page, profile)
+        html = page.content()
+        
+        # Extract form fields
+        if use_ai:
+            fields = ai_extract_form_fields(html, url, get_form_cache())
+        else:
+            fields = extract_form_fields_regex(html)
+        
+        if fields:
+            results['fields_found'] = fields
+            
+            # Fill the form
+            filled_fields = []
+            for field_type, field_info in fields.items():
+                if field_type in form_data and form_data[field_type]:
+                    selector = field_info.get('selector')
+                    if selector:
+                        try:
+                            page.locator(selector).fill(form_data[field_type])
+                            filled_fields.append(f"{field_type}: {form_data[field_type]}")
+                            if debug:
+                                st.success(f"[{field_type}] Gefüllt: {form_data[field_type]}")
+                        except Exception as e:
+                            if debug:
+                                st.warning(f"[{field_type}] Feld nicht gefunden: {selector}")
+            
+            results['fields_filled'] = filled_fields
+            if filled_fields:
+                FORMS_FILLED.inc()
+            
+            # Try to submit
+            try:
+                page.locator("button[type='submit']").click()
+                results['submitted'] = True
+            except Exception:
+                results['submitted'] = False
+            
+            if debug:
+                st.success(f"✅ Formular auf {url} verarbeitet!")
+                st.write(f"Gefundene Felder: {len(fields)}")
+                st.write(f"Gefüllte Felder: {len(filled_fields)}")
+        else:
+            results['error'] = "Keine Formularfelder gefunden"
+            if debug:
+                st.warning(f"⚠️ Keine Formularfelder auf {url} gefunden")
+    
+    # Keep the page open for debugging until the inspector is resumed
+    if debug:
+        page.pause()
+
+async def apply_application(page, url, applicant, profile):
+    """Auto-Bewerbung for one URL on an async Playwright page; returns (level, message) for the UI."""
+    await page.goto(url, wait_until=profile["wait_until"])
+    if "arnovogel.de" not in url:
+        return "info", f"ℹ️ {url} - Website geöffnet (keine spezifische Formular-Logik)"
+    await page.locator("#header_contact_btn").click()
+    await page.locator("#radio1").click()  # waits until the form is shown
+    await page.locator("#name").fill(applicant["first_name"])
+    await page.locator("#strasse").fill(applicant["last_name"])
+    await page.locator("#plz").fill(applicant["plz"])
+    await page.locator("#ort").fill(applicant["city"])
+    await page.locator("#telefon").fill(applicant["phone"])
+    await page.locator("#mail").fill(applicant["email"])
+    await page.locator("#message").fill(applicant["message"])
+    await page.locator("#Check_Datenschutz").click()
+    FORMS_FILLED.inc()
+    return "success", f"✅ {url} - Formular ausgefüllt!"
+
+def run_applications_parallel(urls, applicant, headless=True, profile=None, concurrency=FORM_CONCURRENCY):
+    """Process the URLs concurrently, one browser context each, and show every result as it arrives."""
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    status_text.info(f"⚡ {min(concurrency, len(urls))} Seiten parallel...")
+    show = {"success": st.success, "info": st.info}
+    done = failed = 0
+    try:
+        for url, result in get_form_runner().stream(
+                urls, lambda page, url: apply_application(page, url, applicant, profile or get_profile()),
+                concurrency=concurrency, headless=headless, profile=profile):
+            done += 1
+            if isinstance(result, Exception):
+                failed += 1
+                st.error(f"❌ Fehler bei {url}: {str(result)}")
+            else:
+                level, text = result
+                show[level](text)
+            progress_bar.progress(done / len(urls))
+            status_text.info(f"⚡ {done}/{len(urls)} fertig")
+    except FeatureUnavailable:
+        st.error("❌ Playwright ist nicht installiert!")
+        st.code("pip install playwright && playwright install firefox", language="bash")
+        return
+    except Exception as e:
+        st.error(f"❌ Fehler: {str(e)}")
+        return
+    status_text.success(f"✅ Alle Bewerbungen wurden verarbeitet! ({failed} Fehler)")
+    st.balloons()
+
 def find_locator_in_page_or_iframes(page, selector):
     try:
         loc = page.locator(selector)
@@ -633,7 +711,7 @@ def try_fill_by_selector(page, selector, value, field_name, debug=False):
             except Exception:
                 try:
                     loc.click()
-                    loc.type(value, delay=15)
+                    loc.type(value, delay=PROFILES["debug" if debug else "fast"]["type_delay"])
                 except Exception:
                     if debug:
                         st.error(f"[{field_name}] Konnte nicht füllen: {selector}")
@@ -678,7 +756,7 @@ def try_semantic_fill(page, field_name, value, debug=False):
                 try:
                     loc.first.fill(value)
                 except Exception:
-                    loc.first.type(value, delay=15)
+                    loc.first.type(value, delay=PROFILES["debug" if debug else "fast"]["type_delay"])
                 if debug:
                     st.success(f"[{field_name}] Gefüllt über Label: {lbl}")
                 return True
@@ -693,7 +771,7 @@ def try_semantic_fill(page, field_name, value, debug=False):
                 try:
                     loc.first.fill(value)
                 except Exception:
-                    loc.first.type(value, delay=15)
+                    loc.first.type(value, delay=PROFILES["debug" if debug else "fast"]["type_delay"])
                 if debug:
                     st.success(f"[{field_name}] Gefüllt über Placeholder: {ph}")
                 return True
@@ -709,8 +787,12 @@ OBI_URL = "https://www.obi.de"
 WUERTH_URL = "https://www.wuerth.de"
 BAUHAUS_URL = "https://www.bauhaus.info"
 
-def setup_driver(headless: bool = True) -> webdriver.Chrome:
-    """Setup Chrome WebDriver."""
+def setup_driver(headless: bool = True, block_resources: bool = True) -> "webdriver.Chrome":
+    """Setup Chrome WebDriver (without images, fonts, media and trackers unless block_resources=False)."""
+    require("selenium")
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -722,7 +804,11 @@ def setup_driver(headless: bool = True) -> webdriver.Chrome:
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
     )
+    if block_resources:
+        block_selenium_options(options)
     driver = webdriver.Chrome(options=options)
+    if block_resources:
+        block_selenium(driver)
     driver.implicitly_wait(5)
     return driver
 
@@ -730,8 +816,14 @@ def _click_js(driver, el):
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", el)
     driver.execute_script("arguments[0].click();", el)
 
-def accept_cookies(driver: webdriver.Chrome, site="obi"):
+@timed("browser.accept_cookies")
+def accept_cookies(driver: "webdriver.Chrome", site="obi"):
     """Robustly accept cookies on different sites."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     try:
         time.sleep(1.0)
         if site == "obi":
@@ -829,8 +921,11 @@ def accept_cookies(driver: webdriver.Chrome, site="obi"):
         except Exception:
             pass
 
+@timed("browser.wait_for_results")
 def wait_for_results(driver, site="obi"):
     """Warte robust auf Suchergebnis-Elemente für verschiedene Shops."""
+    from selenium.webdriver.common.by import By
+
     selectors = {
         "obi": [
             (By.CSS_SELECTOR, "a[data-test='product-title']"),
@@ -881,8 +976,11 @@ def wait_for_results(driver, site="obi"):
     # damit die Suche weitergeht und collect_items die Fallback-Ergebnisse liefern kann
     return True
 
+@timed("browser.collect_items")
 def collect_items(driver, site="obi", limit=3):
     """Sammle Produktkarten für verschiedene Shops mit Fallback-Optionen."""
+    from selenium.webdriver.common.by import By
+
     results = []
     
     if site == "obi":
@@ -1102,8 +1200,14 @@ def price_to_float(price_str: str) -> float:
     num = m.group(1).replace(".", "").replace(",", ".")
     return float(num)
 
-def scrape_shop(driver: webdriver.Chrome, term: str, site: str, limit: int = 3):
+@timed("browser.scrape_shop")
+def scrape_shop(driver: "webdriver.Chrome", term: str, site: str, limit: int = 3):
     """Scrape verschiedene Shops für den Suchbegriff mit robusten Fallbacks."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     urls = {
         "obi": f"{OBI_URL}/search/?searchTerm={quote_plus(term)}",
         "wuertth": f"{WUERTH_URL}/search?query={quote_plus(term)}",
@@ -1246,9 +1350,11 @@ def scrape_shop(driver: webdriver.Chrome, term: str, site: str, limit: int = 3):
         ]
         return fallback_results
 
+@timed("llm.enhance_search_term")
 def enhance_search_term_with_ai(term: str) -> list:
     """Use AI to generate alternative search terms for better results."""
-    if not OPENAI_API_KEY or openai_mode is None:
+    llm = get_llm_gateway() if get_settings()["openai_api_key"] else None
+    if llm is None or not llm.available:
         # Fallback: return normalized term
         return [term.lower(), term.capitalize(), term.upper()]
     
@@ -1257,22 +1363,13 @@ def enhance_search_term_with_ai(term: str) -> list:
 Beispiel: Für 'wärmepumpe' -> ['Wärmepumpe', 'Waermepumpe', 'Heizungspumpe']
 Nur die Begriffe ausgeben, kommasepariert, keine Erklärungen."""
         
-        if openai_mode == "new":
-            response = client_new.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.3
-            )
-            alternatives = response.choices[0].message.content.strip().split(",")
-        else:
-            response = client_legacy.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.3
-            )
-            alternatives = response.choices[0].message.content.strip().split(",")
+        content = llm.complete(
+            [{"role": "user", "content": prompt}],
+            model="gpt-3.5-turbo",
+            max_tokens=50,
+            temperature=0.3
+        )
+        alternatives = content.split(",")
         
         # Clean and return alternatives
         alternatives = [alt.strip().strip("'\"") for alt in alternatives if alt.strip()]
@@ -1354,6 +1451,7 @@ def scrape_multiple_shops_simple(term: str, shops: list, limit: int = 3, progres
         if not shop_results:
             shop_results = scrape_shop_simple(term, shop, limit)
         
+        SHOP_RESULTS.inc(len(shop_results), shop=shop)
         all_results.extend(shop_results)
     
     # Stelle sicher, dass immer Ergebnisse zurückgegeben werden
@@ -1391,31 +1489,13 @@ def main():
     # ===== JOB SCRAPER TAB =====
     with tab1:
         # Organized storage folder
-        storage_folder = Path("org")
-        storage_folder.mkdir(exist_ok=True)
+        STORAGE_FOLDER.mkdir(exist_ok=True)
 
         if "storage_websites" not in st.session_state:
             st.session_state.storage_websites = []
         if "job_count" not in st.session_state:
             st.session_state.job_count = 0
 
-        def save_website(url):
-            filename = storage_folder / f"{re.sub(r'[^A-Za-z0-9]', '_', url)}.html"
-            if not filename.exists():
-                r = requests.get(url)
-                r.raise_for_status()
-                with open(filename, "wb") as f:
-                    f.write(r.content)
-                return filename, True
-            return filename, False  # Already downloaded
-
-        def analyze_file(filename, keyword):
-            contents = Path(filename).read_text(encoding="utf-8")
-            found = keyword in contents
-            phones = re.findall(r'\b(?:\+49|0)[1-9][0-9\s\-]{7,}\b', contents)
-            first_phone = phones[0] if phones else None
-            return found, first_phone
-
         def is_handyman_website(url):
             """Check if URL is from a valid handyman/handcraft website."""
             # Simple validation - check for handyman or job keywords
@@ -1432,7 +1512,34 @@ def main():
 
         st.title("Anlagenmechaniker Job Finder")
 
-        urls = st.text_area("Website-URLs eingeben (eine pro Zeile):")
+        with st.expander("🗺️ Job-URLs aus Sitemap ermitteln"):
+            st.caption("Liest robots.txt und sitemap.xml der Karriereseite und übernimmt nur neue oder geänderte Stellen-URLs.")
+            sitemap_site = st.text_input("Karriereseite / Domain", placeholder="https://www.example.de", key="sitemap_site")
+            sitemap_pattern = st.text_input("URL-Muster (Regex)", value=DEFAULT_JOB_URL_PATTERN, key="sitemap_pattern")
+            sitemap_days = st.number_input("Nur Einträge der letzten Tage (0 = alle)", min_value=0, value=30, step=1, key="sitemap_days")
+            if st.button("Sitemap durchsuchen", key="sitemap_discover"):
+                pattern_error = None
+                try:
+                    re.compile(sitemap_pattern or "")
+                except re.error as e:
+                    pattern_error = e
+                if pattern_error is not None:
+                    st.error(f"Ungültiges URL-Muster: {pattern_error}")
+                elif sitemap_site.strip():
+                    since = datetime.now(timezone.utc) - timedelta(days=sitemap_days) if sitemap_days else None
+                    with st.spinner("Lese Sitemaps..."):
+                        entries = discover_job_urls(sitemap_site.strip(), url_pattern=sitemap_pattern or None, since=since)
+                    if entries:
+                        queued = [e["url"] for e in entries]
+                        existing = st.session_state.get("job_urls", "").strip()
+                        st.session_state.job_urls = "\n".join(([existing] if existing else []) + queued)
+                        st.success(f"{len(queued)} neue oder geänderte Job-URLs übernommen.")
+                    else:
+                        st.info("Keine neuen oder geänderten Job-URLs gefunden.")
+                else:
+                    st.warning("Bitte eine Domain eingeben.")
+
+        urls = st.text_area("Website-URLs eingeben (eine pro Zeile):", key="job_urls")
         keyword = "Anlagenmechaniker"
 
         if st.button("Webseiten überprüfen"):
@@ -1470,6 +1577,7 @@ def main():
                     progress = st.progress(0)
                     status_placeholder = st.empty()
                     for i, url in enumerate(valid_urls):
+                        QUEUE_DEPTH.set(len(valid_urls) - i, queue="job_finder")
                         status_placeholder.info(f"Verarbeite {url} ...")
                         time.sleep(1)  # Ladezeit simulieren
                         if url not in st.session_state.storage_websites:
@@ -1478,6 +1586,9 @@ def main():
                                 found, phone = analyze_file(filename, keyword)
 
                                 if found:
+                                    JOBS_FOUND.inc(source="job_finder")
+                                    if phone:
+                                        PHONES_FOUND.inc()
                                     st.session_state.job_count += 1
                                     st.session_state.storage_websites.append(url)
                                     st.success(f"Job gefunden auf: {url}")
@@ -1489,6 +1600,7 @@ def main():
                         else:
                             st.warning(f"Website bereits gespeichert: {url}")
                         progress.progress((i + 1) / len(valid_urls))
+                    QUEUE_DEPTH.set(0, queue="job_finder")
                     status_placeholder.success("✅ Analyse abgeschlossen!")
                 elif not invalid_urls:
                     st.warning("Bitte geben Sie mindestens eine URL ein.")
@@ -1497,8 +1609,9 @@ def main():
     
     # ===== TRANSCRIBER TAB =====
     with tab2:
-        # Berichte abrufen
-        reports = get_saved_reports()
+        # Berichtsindex aktualisieren (liest nur neue/geänderte Dateien)
+        report_store = get_report_store()
+        report_store.sync()
         
         # Hauptinhaltbereich
         col1, col2 = st.columns([2, 1])
@@ -1506,48 +1619,162 @@ def main():
         with col1:
             st.header("🎤 Neuen Bericht aufnehmen")
             
-            # Recording duration slider
-            recording_duration = st.slider(
-                "Recording duration (seconds)",
-                min_value=5,
-                max_value=30,
-                value=10,
-                step=5,
-                help="Recording will stop after this duration or when you pause speaking"
-            )
+            # st.tabs runs every tab body on every rerun, so the speech stack is
+            # only loaded once speech input is switched on
+            speech_enabled = st.checkbox("🎙️ Spracheingabe aktivieren", key="speech_enabled",
+                                         help="Lädt Spracherkennung und Mikrofonzugriff")
+            speech_error = missing("speech") if speech_enabled else None
+            if not speech_enabled:
+                st.caption("Aufnahme und Sprachmemos stehen nach dem Aktivieren zur Verfügung.")
+                # A live recording still running when speech input was switched off
+                interrupted = st.session_state.pop("active_transcriber", None)
+                if interrupted is not None:
+                    text = interrupted.stop()
+                    if text:
+                        st.session_state.transcribed_text = text
+            elif speech_error:
+                st.error(f"🎙️ {speech_error}")
+            else:
+                from transcription import StreamingTranscriber, SILENCE_STOP_SECONDS, forget_calibration
+                from batch_transcription import AUDIO_TYPES, transcribe_files
+                microphone_error = missing("microphone")
+
+                # Recording duration slider
+                recording_duration = st.slider(
+                    "Recording duration (seconds)",
+                    min_value=5,
+                    max_value=30,
+                    value=10,
+                    step=5,
+                    help="Recording will stop after this duration or when you pause speaking"
+                )
             
-            # Simple one-button recording
-            if st.button(
-                "🔴 Start Recording", 
-                type="primary", 
-                key="transcribe_start"
-            ):
-                with st.spinner(f"Recording for up to {recording_duration} seconds... Speak now!"):
+                speech_backend, backend_warning = active_speech_backend()
+                if backend_warning:
+                    st.warning(backend_warning)
+                col_engine, col_calibrate = st.columns([3, 1])
+                with col_engine:
+                    st.caption(f"Spracherkennung: {speech_backend.name} ({'offline' if speech_backend.offline else 'online'})")
+                with col_calibrate:
+                    if st.button("🎚️ Neu kalibrieren", key="transcribe_recalibrate",
+                                 help="Umgebungsgeräusch bei der nächsten Aufnahme neu messen (z.B. nach Ortswechsel)"):
+                        forget_calibration()
+
+                live_mode = st.checkbox(
+                    "⚡ Live-Transkription",
+                    value=True,
+                    key="transcribe_live",
+                    help="Text erscheint segmentweise schon während der Aufnahme"
+                )
+
+                # A live recording interrupted by a rerun (e.g. the stop button) is finished here
+                interrupted = st.session_state.pop("active_transcriber", None)
+                if interrupted is not None:
+                    with st.spinner("Finishing transcription..."):
+                        text = interrupted.stop()
+                    if text:
+                        st.session_state.transcribed_text = text
+                        st.session_state.recording_status = "✅ Transcription completed!"
+
+                # Simple one-button recording
+                if microphone_error:
+                    st.warning(f"🎤 Aufnahme deaktiviert, Sprachmemos funktionieren weiterhin: {microphone_error}")
+                start_recording = st.button(
+                    "🔴 Start Recording", 
+                    type="primary", 
+                    key="transcribe_start",
+                    disabled=bool(microphone_error)
+                )
+                if start_recording and live_mode:
+                    st.button("⏹️ Stop", key="transcribe_stop")
+                    live_text = st.empty()
+                    streamer = None
                     try:
-                        audio, recognizer = record_speech_simple(duration=recording_duration)
-                        
-                        if audio is None:
-                            st.warning(st.session_state.recording_status)
+                        streamer = StreamingTranscriber(language=LANGUAGE, backend=speech_backend)
+                        st.session_state.active_transcriber = streamer.start()
+                        deadline = time.monotonic() + recording_duration
+                        while (time.monotonic() < deadline and streamer.recording
+                               and streamer.silent_for() < SILENCE_STOP_SECONDS):
+                            partial = streamer.text
+                            live_text.info(f"🔴 {partial} {'⏳' if streamer.pending else ''}" if partial
+                                           else "🔴 Recording... Speak now!")
+                            time.sleep(0.25)
+
+                        live_text.info(f"⏳ {streamer.text}")
+                        text = streamer.stop()
+                        st.session_state.pop("active_transcriber", None)
+                        for error in dict.fromkeys(streamer.errors):
+                            st.error(error)
+                        if text:
+                            st.session_state.transcribed_text = text
+                            st.session_state.recording_status = "✅ Transcription completed!"
+                            st.rerun()
                         else:
-                            st.success("Recording complete!")
-                            
-                            with st.spinner("Converting speech to text..."):
-                                text, error = convert_to_text(audio, recognizer)
-                                
-                                if text:
-                                    st.session_state.transcribed_text = text
-                                    st.session_state.recording_status = "✅ Transcription completed!"
-                                    st.success("✅ Transcription complete!")
-                                    st.rerun()
-                                else:
-                                    st.error(error)
-                                    st.session_state.recording_status = "❌ Transcription failed"
-                        
+                            live_text.empty()
+                            st.warning("⏰ No speech recognised. Please try again.")
                     except Exception as e:
+                        if streamer is not None:
+                            streamer.stop(timeout=0)
+                        st.session_state.pop("active_transcriber", None)
                         st.session_state.recording_status = f"❌ Error: {str(e)}"
                         st.error(f"❌ Error during recording: {str(e)}")
+                elif start_recording:
+                    with st.spinner(f"Recording for up to {recording_duration} seconds... Speak now!"):
+                        try:
+                            audio, _ = record_speech_simple(duration=recording_duration)
+                        
+                            if audio is None:
+                                st.warning(st.session_state.recording_status)
+                            else:
+                                st.success("Recording complete!")
+                            
+                                with st.spinner("Converting speech to text..."):
+                                    text, error = convert_to_text(audio, speech_backend)
+                                
+                                    if text:
+                                        st.session_state.transcribed_text = text
+                                        st.session_state.recording_status = "✅ Transcription completed!"
+                                        st.success("✅ Transcription complete!")
+                                        st.rerun()
+                                    else:
+                                        st.error(error)
+                                        st.session_state.recording_status = "❌ Transcription failed"
+                        
+                        except Exception as e:
+                            st.session_state.recording_status = f"❌ Error: {str(e)}"
+                            st.error(f"❌ Error during recording: {str(e)}")
             
-            st.info("💡 **Tip:** Recording will stop automatically when you pause speaking for 1 second, or when the duration limit is reached.")
+                st.info("💡 **Tip:** Recording will stop automatically when you pause speaking for 1 second, or when the duration limit is reached.")
+
+                # Sprachmemos (z.B. aus dem Messenger) stapelweise transkribieren
+                with st.expander("📁 Sprachmemos stapelweise transkribieren"):
+                    memos = st.file_uploader(
+                        "Audiodateien (WAV, MP3, OGG, M4A, ...)",
+                        type=AUDIO_TYPES,
+                        accept_multiple_files=True,
+                        key="memo_upload"
+                    )
+                    if memos and st.button(f"🚀 {len(memos)} Memo(s) transkribieren", key="memo_start"):
+                        progress = st.progress(0.0)
+                        with tempfile.TemporaryDirectory(prefix="upload_") as upload_dir:
+                            paths = []
+                            for i, memo in enumerate(memos):
+                                path = os.path.join(upload_dir, f"{i:04d}_{os.path.basename(memo.name)}")
+                                with open(path, "wb") as f:
+                                    f.write(memo.getbuffer())
+                                paths.append(path)
+
+                            with span("speech.batch"):
+                                for done, result in enumerate(transcribe_files(paths, speech_backend.name, LANGUAGE), 1):
+                                    name = result.name.split("_", 1)[1]
+                                    progress.progress(done / len(paths), text=f"{done}/{len(paths)}: {name}")
+                                    if result.text:
+                                        report = save_report(f"Sprachmemo: {name}\n\n{result.text}")
+                                        st.success(f"✅ {name} ({result.seconds:.0f} s) → {os.path.basename(report)}")
+                                    else:
+                                        st.warning(f"⚠️ {name}: kein Text erkannt")
+                                    for error in dict.fromkeys(result.errors):
+                                        st.error(f"❌ {name}: {error}")
             
             # Transkribierten Text anzeigen
             if st.session_state.transcribed_text:
@@ -1559,10 +1786,16 @@ def main():
                     key="transcribe_editor"
                 )
                 
+                col_tech, col_customer = st.columns(2)
+                with col_tech:
+                    technician = st.text_input("Techniker", key="report_technician")
+                with col_customer:
+                    customer = st.text_input("Kunde", key="report_customer")
+
                 col_save, col_clear = st.columns(2)
                 with col_save:
                     if st.button("💾 Save Report", type="primary", key="transcribe_save"):
-                        filepath = save_report(edited_text)
+                        filepath = save_report(edited_text, technician.strip(), customer.strip())
                         st.success(f"✅ Report saved: {os.path.basename(filepath)}")
                         st.session_state.transcribed_text = ""
                         st.rerun()
@@ -1573,8 +1806,48 @@ def main():
                         st.rerun()
         
         with col2:
-            # Reports section removed
-            pass
+            st.header("📚 Berichtsarchiv")
+            query = st.text_input("🔎 Volltextsuche", key="reports_query",
+                                  placeholder="z.B. Therme undicht, F28, Müller")
+            filter_tech, filter_keyword = st.columns(2)
+            with filter_tech:
+                technician_filter = st.selectbox("Techniker", ["Alle"] + report_store.technicians(),
+                                                 key="reports_technician")
+            with filter_keyword:
+                keyword_filter = st.selectbox("Gerät/Fehler", ["Alle"] + report_store.keywords(),
+                                              key="reports_keyword")
+            filters = {
+                "query": query,
+                "technician": "" if technician_filter == "Alle" else technician_filter,
+                "keyword": "" if keyword_filter == "Alle" else keyword_filter,
+            }
+            total = report_store.count(**filters)
+            pages = max(1, -(-total // REPORTS_PAGE_SIZE))
+            if st.session_state.get("reports_page", 1) > pages:
+                st.session_state.reports_page = pages  # a narrower search has fewer pages
+            page = st.number_input(f"Seite (von {pages})", min_value=1, max_value=pages, value=1, step=1,
+                                   key="reports_page") if pages > 1 else 1
+            st.caption(f"{total} Bericht(e)")
+
+            for report in report_store.search(page=page, **filters):
+                title = report["created_at"][:16]
+                if report["customer"]:
+                    title += f" – {report['customer']}"
+                with st.expander(title):
+                    details = [f"👷 {report['technician']}" if report["technician"] else "",
+                               f"🏷️ {report['keywords']}" if report["keywords"] else ""]
+                    st.caption(" · ".join(d for d in details if d) or report["name"])
+                    st.write(report["preview"] + ("…" if len(report["preview"]) >= 200 else ""))
+                    # The file is only read when the report is opened
+                    if st.checkbox("Ganzen Bericht anzeigen", key=f"report_open_{report['id']}"):
+                        path = report_store.path(report["name"])
+                        if path.exists():
+                            content = path.read_text(encoding="utf-8", errors="ignore")
+                            st.text(content)
+                            st.download_button("📥 Download", content, file_name=report["name"],
+                                               mime="text/plain", key=f"report_dl_{report['id']}")
+                        else:
+                            st.warning("Datei nicht mehr vorhanden")
     
     # ===== SHOPPING AGENT TAB =====
     with tab3:
@@ -1639,57 +1912,58 @@ def main():
                 # Progress-Container leeren
                 progress_container.empty()
                 status_container.empty()
-
-                # Ergebnisse anzeigen - IMMER etwas anzeigen
-                st.success(f"✅ {len(results)} Ergebnisse gefunden!")
-                
-                # Zeige Info über Suchstrategie
-                st.info("💡 **Tipp:** Die Links führen direkt zu den Suchergebnissen der jeweiligen Shops. Klicken Sie auf die Links für detaillierte Produktinformationen.")
-                
-                # Prüfe ob nur OBI Ergebnisse gefunden wurden
-                obi_results = [r for r in results if r['site'] == 'OBI.de']
-                other_results = [r for r in results if r['site'] != 'OBI.de']
-                
-                if len(obi_results) > 0 and len(other_results) == 0:
-                    st.info("🔍 Hauptsächlich OBI-Ergebnisse gefunden")
-                
-                # DataFrame erstellen und anzeigen
-                df = pd.DataFrame(results)
-                
-                # Mache Links klickbar
-                st.dataframe(
-                    df,
-                    column_config={
-                        "link": st.column_config.LinkColumn(
-                            "Link",
-                            help="Klicken Sie hier um zum Shop zu gelangen",
-                            display_text="Zum Shop →"
-                        ),
-                        "product": st.column_config.TextColumn(
-                            "Produkt",
-                            width="large"
-                        ),
-                        "price": st.column_config.TextColumn(
-                            "Preis",
-                            width="small"
-                        ),
-                        "site": st.column_config.TextColumn(
-                            "Shop",
-                            width="small"
-                        )
-                    }
-                )
-                
-                # Download-Button
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Ergebnisse als CSV herunterladen",
-                    data=csv,
-                    file_name=f"shopping_results_{search_term}.csv",
-                    mime="text/csv"
-                )
+                st.session_state.shopping_results = results
+                st.session_state.shopping_term = search_term
+                st.session_state.shopping_version = st.session_state.get('shopping_version', 0) + 1
             else:
                 st.warning("⚠️ Bitte geben Sie einen Suchbegriff ein.")
+
+        # Ergebnisse bleiben über Reruns erhalten, damit der Export erst auf Anfrage erstellt wird
+        results = st.session_state.get('shopping_results')
+        if results:
+            # Ergebnisse anzeigen - IMMER etwas anzeigen
+            st.success(f"✅ {len(results)} Ergebnisse gefunden!")
+            
+            # Zeige Info über Suchstrategie
+            st.info("💡 **Tipp:** Die Links führen direkt zu den Suchergebnissen der jeweiligen Shops. Klicken Sie auf die Links für detaillierte Produktinformationen.")
+            
+            # Prüfe ob nur OBI Ergebnisse gefunden wurden
+            obi_results = [r for r in results if r['site'] == 'OBI.de']
+            other_results = [r for r in results if r['site'] != 'OBI.de']
+            
+            if len(obi_results) > 0 and len(other_results) == 0:
+                st.info("🔍 Hauptsächlich OBI-Ergebnisse gefunden")
+            
+            # DataFrame erstellen und anzeigen
+            df = pd.DataFrame(results)
+            
+            # Mache Links klickbar
+            st.dataframe(
+                df,
+                column_config={
+                    "link": st.column_config.LinkColumn(
+                        "Link",
+                        help="Klicken Sie hier um zum Shop zu gelangen",
+                        display_text="Zum Shop →"
+                    ),
+                    "product": st.column_config.TextColumn(
+                        "Produkt",
+                        width="large"
+                    ),
+                    "price": st.column_config.TextColumn(
+                        "Preis",
+                        width="small"
+                    ),
+                    "site": st.column_config.TextColumn(
+                        "Shop",
+                        width="small"
+                    )
+                }
+            )
+
+            # Export (CSV/Parquet/Excel) wird erst beim Klick erstellt
+            export_widget(results, f"shopping_results_{st.session_state.shopping_term}",
+                          key="shopping_export", version=st.session_state.shopping_version)
     
     # ===== AUTO-BEWERBUNG TAB =====
     with tab4:
@@ -1726,8 +2000,18 @@ def main():
         col_opt1, col_opt2 = st.columns(2)
         with col_opt1:
             headless = st.checkbox("🔇 Headless Mode (Browser unsichtbar)", value=False)
+            keep_open = st.checkbox("🔍 Seiten zur Kontrolle offen lassen (nacheinander)", value=False,
+                                    help="Sonst werden die URLs parallel verarbeitet und jede Seite "
+                                         "geschlossen, sobald sie fertig ist.")
         with col_opt2:
-            slow_mo = st.slider("⏱️ Slow Motion (ms)", 0, 1000, 200, 50)
+            profile_label = st.radio("Ausführung", list(PROFILE_LABELS), horizontal=True,
+                                     help="Schnell wartet nur auf Bedingungen (Seite geladen, Feld sichtbar); "
+                                          "Debug verlangsamt jede Aktion zum Zuschauen.")
+            profile_name = PROFILE_LABELS[profile_label]
+            slow_mo = st.slider("⏱️ Slow Motion (ms)", 0, 1000, 200, 50, disabled=profile_name != "debug")
+            concurrency = st.slider("⚡ Parallele Seiten", 1, MAX_FORM_CONCURRENCY, FORM_CONCURRENCY,
+                                    disabled=keep_open)
+        profile = get_profile(profile_name, slow_mo=slow_mo)
         
         # Start-Button
         if st.button("🚀 Bewerbungen starten", type="primary"):
@@ -1738,78 +2022,90 @@ def main():
                 
                 st.info(f"📋 Verarbeite {len(urls)} URL(s)...")
                 
-                try:
-                    from playwright.sync_api import sync_playwright
-                    
-                    # Zeige Fortschritt
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                applicant = {"first_name": first_name, "last_name": last_name, "email": email, "phone": phone,
+                             "city": city, "plz": plz, "message": message}
+                if not keep_open:
+                    run_applications_parallel(urls, applicant, headless=headless, profile=profile,
+                                              concurrency=concurrency)
+                else:
+                    def apply_to_page(page, url):
+                        """Runs on the browser's pool thread, in a fresh context per URL."""
+                        page.goto(url, wait_until=profile["wait_until"])
                     
-                    # Starte Playwright
-                    with sync_playwright() as playwright:
-                        browser = playwright.firefox.launch(headless=headless, slow_mo=slow_mo)
+                        # Für arnovogel.de spezifische Logik
+                        if "arnovogel.de" in url:
+                            status_text.info(f"📝 Fülle Formular aus für: {url}")
+                        
+                            # Klicke auf Kontakt-Button
+                            page.locator("#header_contact_btn").click()
+                            page.locator("#radio1").click()
+                        
+                            # Fülle Formular aus
+                            page.locator("#name").fill(first_name)
+                            page.locator("#strasse").fill(last_name)
+                            page.locator("#plz").fill(plz)
+                            page.locator("#ort").fill(city)
+                            page.locator("#telefon").fill(phone)
+                            page.locator("#mail").fill(email)
+                            page.locator("#message").fill(message)
                         
-                        pages = []  # Liste aller geöffneten Seiten
+                            # Akzeptiere Datenschutz
+                            page.locator("#Check_Datenschutz").click()
+                            page.locator("html").press("End")
                         
-                        for i, url in enumerate(urls):
-                            status_text.info(f"🔍 Öffne: {url}")
+                            FORMS_FILLED.inc()
+                            st.success(f"✅ {url} - Formular ausgefüllt!")
+                        else:
+                            # Für andere URLs - nur öffnen
+                            status_text.info(f"🌐 Website geöffnet: {url}")
+                            st.info(f"ℹ️ {url} - Website geöffnet (keine spezifische Formular-Logik)")
+                    
+                        # Im Debug-Modus kurz zeigen
+                        if profile["watch_ms"]:
+                            page.wait_for_timeout(profile["watch_ms"])
+                        return page
+                
+                    try:
+                        # Zeige Fortschritt
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                    
+                        # Vorgestarteter Browser aus dem Pool, ein Kontext pro URL
+                        with get_browser_pool().lease(headless=headless, profile=profile) as browser:
+                            pages = []  # Liste aller geöffneten Seiten (bleiben bis zum Ende offen)
+                        
+                            for i, url in enumerate(urls):
+                                QUEUE_DEPTH.set(len(urls) - i, queue="auto_bewerbung")
+                                status_text.info(f"🔍 Öffne: {url}")
                             
-                            try:
-                                page = browser.new_page()
-                                pages.append(page)
-                                page.goto(url)
-                                
-                                # Für arnovogel.de spezifische Logik
-                                if "arnovogel.de" in url:
-                                    status_text.info(f"📝 Fülle Formular aus für: {url}")
-                                    
-                                    # Klicke auf Kontakt-Button
-                                    page.locator("#header_contact_btn").click()
-                                    page.locator("#radio1").click()
-                                    
-                                    # Fülle Formular aus
-                                    page.locator("#name").fill(first_name)
-                                    page.locator("#strasse").fill(last_name)
-                                    page.locator("#plz").fill(plz)
-                                    page.locator("#ort").fill(city)
-                                    page.locator("#telefon").fill(phone)
-                                    page.locator("#mail").fill(email)
-                                    page.locator("#message").fill(message)
-                                    
-                                    # Akzeptiere Datenschutz
-                                    page.locator("#Check_Datenschutz").click()
-                                    page.locator("html").press("End")
-                                    
-                                    st.success(f"✅ {url} - Formular ausgefüllt!")
-                                else:
-                                    # Für andere URLs - nur öffnen
-                                    status_text.info(f"🌐 Website geöffnet: {url}")
-                                    st.info(f"ℹ️ {url} - Website geöffnet (keine spezifische Formular-Logik)")
-                                
-                                # Warte kurz
-                                page.wait_for_timeout(1000)
-                                
-                            except Exception as e:
-                                st.error(f"❌ Fehler bei {url}: {str(e)}")
+                                try:
+                                    pages.append(browser.run(apply_to_page, url, keep_open=True))
+                                except Exception as e:
+                                    st.error(f"❌ Fehler bei {url}: {str(e)}")
                             
-                            progress_bar.progress((i + 1) / len(urls))
+                                progress_bar.progress((i + 1) / len(urls))
                         
-                        # Pause am Ende damit Browser offen bleibt
-                        status_text.success("✅ Alle Bewerbungen wurden verarbeitet!")
-                        st.balloons()
-                        st.info("🔍 Browser bleibt offen - Sie können die Formulare überprüfen!")
+                            QUEUE_DEPTH.set(0, queue="auto_bewerbung")
                         
-                        # Warte auf Benutzer-Interaktion auf der letzten Seite
-                        if pages:
-                            pages[-1].pause()
+                            # Pause am Ende damit Browser offen bleibt
+                            status_text.success("✅ Alle Bewerbungen wurden verarbeitet!")
+                            st.balloons()
+                            st.info("🔍 Browser bleibt offen - Sie können die Formulare überprüfen!")
                         
-                        browser.close()
+                            # Warte auf Benutzer-Interaktion auf der letzten Seite
+                            if pages:
+                                browser.call(pages[-1].pause)
                 
-                except ImportError:
-                    st.error("❌ Playwright ist nicht installiert!")
-                    st.code("pip install playwright && playwright install firefox", language="bash")
-                except Exception as e:
-                    st.error(f"❌ Fehler: {str(e)}")
+                    except FeatureUnavailable:
+                        st.error("❌ Playwright ist nicht installiert!")
+                        st.code("pip install playwright && playwright install firefox", language="bash")
+                    except Exception as e:
+                        st.error(f"❌ Fehler: {str(e)}")
+    
+    # ===== DIAGNOSE =====
+    render_diagnostics()
+    render_feature_status()
+    render_resource_panel()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,156 @@
+"""Audio decoding and silence detection for the Transkriber.
+
+Everything works on raw 16-bit little-endian mono PCM at ``SAMPLE_RATE``,
+the format all recognition backends accept.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAME_MS = 30
+
+SILENCE_FLOOR_RMS = 150     # never treat quieter frames as speech
+MIN_SILENCE_SECONDS = 0.5   # pauses at least this long split a file
+MAX_SEGMENT_SECONDS = 30.0  # recognisers work best (and Google only) on short chunks
+MIN_SEGMENT_SECONDS = 0.3
+PAD_SECONDS = 0.2
+MAX_PAUSE_SECONDS = 0.8     # longer pauses inside a recording are cut down
+
+# Formats speech_recognition can read without ffmpeg
+NATIVE_SUFFIXES = {".wav", ".flac", ".aif", ".aiff"}
+
+
+def decode_to_pcm(path, rate=SAMPLE_RATE):
+    """Decode any audio file to mono 16-bit PCM at ``rate``.
+
+    MP3/OGG/Opus/M4A need ffmpeg; WAV/FLAC/AIFF fall back to
+    speech_recognition when ffmpeg is not installed.
+    """
+    path = Path(path)
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        proc = subprocess.run(
+            [ffmpeg, "-nostdin", "-v", "error", "-i", str(path),
+             "-ac", "1", "-ar", str(rate), "-f", "s16le", "-acodec", "pcm_s16le", "-"],
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            raise ValueError(f"{path.name}: {proc.stderr.decode(errors='ignore').strip() or 'ffmpeg failed'}")
+        return proc.stdout
+    if path.suffix.lower() not in NATIVE_SUFFIXES:
+        raise ValueError(f"{path.name}: ffmpeg wird für {path.suffix} benötigt")
+    with sr.AudioFile(str(path)) as source:
+        audio = sr.Recognizer().record(source)
+    return audio.get_raw_data(convert_rate=rate, convert_width=SAMPLE_WIDTH)
+
+
+def frame_rms(pcm, rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """RMS energy per frame of a 16-bit PCM buffer."""
+    samples = np.frombuffer(pcm, dtype="<i2")
+    frame = int(rate * frame_ms / 1000)
+    n = len(samples) // frame
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:n * frame].reshape(n, frame).astype(np.float32)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def voiced_frames(rms, threshold=None):
+    """Boolean speech mask; the threshold adapts to the file's noise floor."""
+    if threshold is None:
+        noise = np.percentile(rms, 10) if len(rms) else 0.0
+        peak = np.percentile(rms, 95) if len(rms) else 0.0
+        threshold = max(SILENCE_FLOOR_RMS, min(noise * 3, peak * 0.3))
+    return rms > threshold
+
+
+def speech_regions(pcm, rate=SAMPLE_RATE, min_silence=MIN_SILENCE_SECONDS,
+                   min_segment=MIN_SEGMENT_SECONDS, threshold=None):
+    """Padded speech regions as frame ranges ``[(start, end), ...]``.
+
+    Frames are ``FRAME_MS`` long; pauses shorter than ``min_silence`` stay
+    inside a region, blips shorter than ``min_segment`` are dropped.
+    """
+    voiced = voiced_frames(frame_rms(pcm, rate), threshold)
+    idx = np.flatnonzero(voiced)
+    if not idx.size:
+        return []
+
+    gap_frames = int(min_silence * 1000 / FRAME_MS)
+    breaks = np.flatnonzero(np.diff(idx) > gap_frames)
+    starts = np.r_[idx[0], idx[breaks + 1]]
+    ends = np.r_[idx[breaks], idx[-1]] + 1
+
+    pad = int(PAD_SECONDS * 1000 / FRAME_MS)
+    min_frames = int(min_segment * 1000 / FRAME_MS)
+    total = len(voiced)
+    regions = []
+    for start, end in zip(starts, ends):
+        start, end = max(0, start - pad), min(total, end + pad)
+        if end - start >= min_frames:
+            regions.append((int(start), int(end)))
+    return regions
+
+
+def split_on_silence(pcm, rate=SAMPLE_RATE, min_silence=MIN_SILENCE_SECONDS,
+                     max_segment=MAX_SEGMENT_SECONDS, min_segment=MIN_SEGMENT_SECONDS, threshold=None):
+    """Byte ranges ``[(start, end), ...]`` of the speech segments in ``pcm``.
+
+    Pauses of at least ``min_silence`` separate segments; longer speech is
+    cut into ``max_segment`` pieces; leading/trailing silence is dropped.
+    """
+    frame_bytes = int(rate * FRAME_MS / 1000) * SAMPLE_WIDTH
+    max_frames = int(max_segment * 1000 / FRAME_MS)
+    segments = []
+    for start, end in speech_regions(pcm, rate, min_silence, min_segment, threshold):
+        for piece in range(start, end, max_frames):
+            segments.append((piece * frame_bytes, min(end, piece + max_frames) * frame_bytes))
+    return segments
+
+
+def trim_silence(audio, threshold=None, max_pause=MAX_PAUSE_SECONDS):
+    """Drop leading/trailing silence and shorten pauses longer than ``max_pause``.
+
+    Returns a new ``sr.AudioData`` (16-bit, original rate) or None if the
+    recording contains no speech at all.
+    """
+    rate = audio.sample_rate
+    pcm = audio.get_raw_data(convert_width=SAMPLE_WIDTH)
+    frame_bytes = int(rate * FRAME_MS / 1000) * SAMPLE_WIDTH
+    regions = speech_regions(pcm, rate, min_silence=max_pause, threshold=threshold)
+    if not regions:
+        return None
+    # Joined regions keep 2 x PAD_SECONDS of each long pause
+    trimmed = b"".join(pcm[start * frame_bytes:end * frame_bytes] for start, end in regions)
+    return sr.AudioData(trimmed, rate, SAMPLE_WIDTH)
+
+
+class FlacPayload(sr.AudioData):
+    """Upload form of a recording: resampled to ``rate`` and FLAC-encoded once.
+
+    Microphones deliver 44.1/48 kHz, but remote recognisers work at 16 kHz;
+    resampling first shrinks the FLAC upload about threefold. The encoding
+    is cached, so ``flac_bytes`` can be counted after the request.
+    """
+
+    def __init__(self, audio, rate=SAMPLE_RATE):
+        rate = min(rate, audio.sample_rate)  # never upsample
+        super().__init__(audio.get_raw_data(convert_rate=rate, convert_width=SAMPLE_WIDTH), rate, SAMPLE_WIDTH)
+        self.source_bytes = len(audio.frame_data)
+        self._flac = None
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        if convert_rate not in (None, self.sample_rate) or convert_width not in (None, self.sample_width):
+            return super().get_flac_data(convert_rate, convert_width)
+        if self._flac is None:
+            self._flac = super().get_flac_data()
+        return self._flac
+
+    @property
+    def flac_bytes(self):
+        return len(self._flac) if self._flac is not None else 0
@@ -0,0 +1,112 @@
+"""Batch transcription of voice memos across CPU cores.
+
+``transcribe_files`` decodes every file to 16 kHz mono PCM (ffmpeg), splits
+it on silence and recognises all segments in a process pool. Each worker
+process loads the speech backend once. Results are yielded per file as
+soon as its last segment is done, so callers can save reports while the
+rest of the batch is still running.
+"""
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import speech_recognition as sr
+
+from audio_processing import SAMPLE_RATE, SAMPLE_WIDTH, decode_to_pcm, split_on_silence
+
+AUDIO_TYPES = ["wav", "mp3", "ogg", "oga", "opus", "m4a", "aac", "flac", "aiff", "webm"]
+
+_backend = None  # per worker process
+
+
+def _init_worker(backend_name, language):
+    global _backend
+    from speech_backends import load_backend
+    _backend = load_backend(backend_name, language)
+
+
+def prepare_file(path, work_dir):
+    """Decode ``path`` into ``work_dir`` and return (pcm_path, segments, seconds)."""
+    pcm = decode_to_pcm(path)
+    pcm_path = Path(work_dir) / (Path(path).name + ".pcm")
+    pcm_path.write_bytes(pcm)
+    return str(pcm_path), split_on_silence(pcm), len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+
+def recognize_segment(pcm_path, start, end):
+    """Recognise one byte range of a PCM file; returns (text, error)."""
+    with open(pcm_path, "rb") as f:
+        f.seek(start)
+        audio = sr.AudioData(f.read(end - start), SAMPLE_RATE, SAMPLE_WIDTH)
+    try:
+        return _backend.recognize(audio), None
+    except sr.UnknownValueError:
+        return "", None
+    except sr.RequestError as e:
+        return "", f"Spracherkennung nicht erreichbar: {e}"
+
+
+class FileResult:
+    """Transcript of one memo, assembled from its segments in order."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = Path(path).name
+        self.seconds = 0.0
+        self.parts = []
+        self.errors = []
+        self.remaining = 0
+
+    @property
+    def text(self):
+        return " ".join(p for p in self.parts if p)
+
+
+def transcribe_files(paths, backend_name, language="de-DE", workers=None):
+    """Yield a FileResult per file as soon as it is fully transcribed."""
+    workers = workers or os.cpu_count() or 1
+    results = {path: FileResult(path) for path in paths}
+    # spawn: forking the Streamlit server process (threads, sockets) is unsafe
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_init_worker, initargs=(backend_name, language))
+    work_dir = tempfile.TemporaryDirectory(prefix="memos_")
+    try:
+        pending = {pool.submit(prepare_file, path, work_dir.name): ("prepare", path, None) for path in paths}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, path, number = pending.pop(future)
+                result = results[path]
+                try:
+                    value = future.result()
+                except Exception as e:
+                    if kind == "prepare":
+                        result.errors.append(str(e))
+                        yield result
+                        continue
+                    value = ("", str(e))
+
+                if kind == "prepare":
+                    pcm_path, segments, result.seconds = value
+                    result.parts = [""] * len(segments)
+                    result.remaining = len(segments)
+                    for i, (start, end) in enumerate(segments):
+                        pending[pool.submit(recognize_segment, pcm_path, start, end)] = ("segment", path, i)
+                    if not segments:
+                        yield result
+                    continue
+
+                text, error = value
+                result.parts[number] = text
+                if error:
+                    result.errors.append(error)
+                result.remaining -= 1
+                if result.remaining == 0:
+                    yield result
+    finally:
+        # Also reached when the Streamlit run is interrupted mid-batch
+        pool.shutdown(wait=True, cancel_futures=True)
+        work_dir.cleanup()
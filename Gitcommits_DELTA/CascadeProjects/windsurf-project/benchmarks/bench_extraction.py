@@ -0,0 +1,320 @@
+"""Offline benchmark of the extraction hot paths over a saved HTML corpus.
+
+Usage (from the project root):
+
+    python benchmarks/bench_extraction.py                  # run, compare with baseline
+    python benchmarks/bench_extraction.py --save-baseline  # run and store as new baseline
+    python benchmarks/bench_extraction.py --target analyze_file
+
+Every target runs in its own subprocess so that the reported peak RSS belongs
+to that target alone. The corpus is described by corpus/manifest.json; it is
+seeded from ``org/`` and extended by dropping pages into ``corpus/pages/``.
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+MANIFEST_FILE = CORPUS_DIR / "manifest.json"
+BASELINE_FILE = BENCH_DIR / "baseline_extraction.json"
+
+DEFAULT_THRESHOLD = 0.10  # 10 % slower counts as regression
+
+
+# ===== CORPUS =====
+def load_manifest():
+    return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+
+
+def corpus_pages(manifest):
+    """All HTML files of the corpus, sorted for stable ordering."""
+    pages = []
+    for source in manifest.get("sources", []):
+        pages.extend((CORPUS_DIR / source).resolve().glob("*.html"))
+    return sorted(set(pages))
+
+
+def corpus_fingerprint(manifest, pages):
+    """Version string of the corpus: manifest version plus a hash of all page contents."""
+    h = hashlib.sha256()
+    for page in pages:
+        h.update(page.name.encode("utf-8"))
+        h.update(page.read_bytes())
+    return f"v{manifest.get('version', 0)}-{h.hexdigest()[:12]}"
+
+
+# ===== TARGETS =====
+def _import_app():
+    sys.path.insert(0, str(PROJECT_DIR))
+    import app
+    return app
+
+
+def _import_suche():
+    sys.path.insert(0, str(PROJECT_DIR / "kontakt_agent"))
+    import another_app
+    return another_app.Suche()
+
+
+def _target_generic_scrape(manifest, pages):
+    app = _import_app()
+    from bs4 import BeautifulSoup
+    scraper = app.JobScraper()
+    htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [lambda h=h: scraper._generic_scrape(BeautifulSoup(h, "html.parser"), "https://example.de") for h in htmls]
+
+
+def _target_scrape_jobs_selectors(manifest, pages):
+    app = _import_app()
+    scraper = app.JobScraper()
+    selectors = manifest.get("selectors", {})
+    htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [
+        lambda h=h: scraper.parse_jobs(h, "https://example.de", use_structured_data=False, **selectors)
+        for h in htmls
+    ]
+
+
+def _target_scrape_jobs_structured(manifest, pages):
+    app = _import_app()
+    scraper = app.JobScraper()
+    htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [lambda h=h: scraper.parse_jobs(h, "https://example.de") for h in htmls]
+
+
+def _target_analyze_file(manifest, pages):
+    app = _import_app()
+    keyword = manifest.get("keyword", "Anlagenmechaniker")
+    return [lambda p=p: app.analyze_file(p, keyword) for p in pages]
+
+
+def _target_extract_form_fields_regex(manifest, pages):
+    sys.path.insert(0, str(PROJECT_DIR))
+    from form_fields import extract_form_fields_regex
+    htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [lambda h=h: extract_form_fields_regex(h) for h in htmls]
+
+
+def _target_compact_form_html(manifest, pages):
+    sys.path.insert(0, str(PROJECT_DIR))
+    from form_html import compact_form_html
+    htmls = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [lambda h=h: compact_form_html(h) for h in htmls]
+
+
+def _target_classify_form(manifest, pages):
+    sys.path.insert(0, str(PROJECT_DIR))
+    from form_cache import parse
+    from field_classifier import classify_form, get_model
+    get_model()
+    soups = [parse(p.read_text(encoding="utf-8", errors="ignore")) for p in pages]
+    return [lambda s=s: classify_form(s) for s in soups]
+
+
+def _target_match_telefonnummer(manifest, pages):
+    suche = _import_suche()
+    texts = [p.read_text(encoding="utf-8", errors="ignore") for p in pages]
+    return [lambda t=t: suche.match_telefonnummer(t) for t in texts]
+
+
+def _target_extract_betrieb_info(manifest, pages):
+    suche = _import_suche()
+
+    def run(page):
+        suche._html_path = page
+        return suche.extract_betrieb_info()
+
+    return [lambda p=p: run(p) for p in pages]
+
+
+def _target_price_to_float(manifest, pages):
+    app = _import_app()
+    prices = manifest.get("prices", [])
+    return [lambda s=s: app.price_to_float(s) for s in prices]
+
+
+TARGETS = {
+    "JobScraper._generic_scrape": _target_generic_scrape,
+    "JobScraper.scrape_jobs[selectors]": _target_scrape_jobs_selectors,
+    "JobScraper.scrape_jobs[structured]": _target_scrape_jobs_structured,
+    "analyze_file": _target_analyze_file,
+    "extract_form_fields_regex": _target_extract_form_fields_regex,
+    "compact_form_html": _target_compact_form_html,
+    "classify_form": _target_classify_form,
+    "Suche.match_telefonnummer": _target_match_telefonnummer,
+    "Suche.extract_betrieb_info": _target_extract_betrieb_info,
+    "price_to_float": _target_price_to_float,
+}
+
+
+# ===== MEASUREMENT =====
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def measure(calls, repeat):
+    """Time every call ``repeat`` times (after one warm-up pass)."""
+    for call in calls:
+        call()
+
+    latencies = []
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for call in calls:
+            t0 = time.perf_counter_ns()
+            call()
+            latencies.append(time.perf_counter_ns() - t0)
+    total_s = (time.perf_counter_ns() - start) / 1e9
+
+    return {
+        "calls": len(latencies),
+        "per_sec": round(len(latencies) / total_s, 1) if total_s else 0.0,
+        "p50_ms": round(percentile(latencies, 50) / 1e6, 4),
+        "p99_ms": round(percentile(latencies, 99) / 1e6, 4),
+        "mean_ms": round(statistics.fmean(latencies) / 1e6, 4) if latencies else 0.0,
+    }
+
+
+def run_target(name, repeat):
+    """Run one target in this process and return its result dict."""
+    manifest = load_manifest()
+    pages = corpus_pages(manifest)
+    # app.py and another_app.py create working folders relative to cwd
+    os.chdir(tempfile.mkdtemp(prefix="bench_"))
+    try:
+        calls = TARGETS[name](manifest, pages)
+    except ImportError as e:
+        return {"target": name, "skipped": f"ImportError: {e}"}
+    result = measure(calls, repeat)
+    result["target"] = name
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_isolated(name, repeat):
+    """Run a target in a fresh interpreter so peak RSS is per target."""
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--target", name, "--repeat", str(repeat), "--child"],
+        capture_output=True, text=True,
+    )
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"target": name, "skipped": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(lines[-1])
+
+
+# ===== BASELINE =====
+def load_baseline():
+    if BASELINE_FILE.exists():
+        try:
+            return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+    return None
+
+
+def save_baseline(report):
+    BASELINE_FILE.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def compare(report, baseline, threshold):
+    """Return regression messages for targets slower than baseline by more than ``threshold``."""
+    regressions = []
+    old = {r["target"]: r for r in baseline.get("results", []) if "skipped" not in r}
+    for r in report["results"]:
+        prev = old.get(r["target"])
+        if not prev or "skipped" in r:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if prev[key] and r[key] > prev[key] * (1 + threshold):
+                regressions.append(f"{r['target']}: {key} {prev[key]} -> {r[key]} (+{(r[key] / prev[key] - 1) * 100:.0f}%)")
+        if prev["per_sec"] and r["per_sec"] < prev["per_sec"] * (1 - threshold):
+            regressions.append(f"{r['target']}: per_sec {prev['per_sec']} -> {r['per_sec']}")
+        if prev.get("peak_rss_mb") and r.get("peak_rss_mb") and r["peak_rss_mb"] > prev["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{r['target']}: peak_rss_mb {prev['peak_rss_mb']} -> {r['peak_rss_mb']}")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'target':40} {'calls':>7} {'per_sec':>10} {'p50_ms':>10} {'p99_ms':>10} {'rss_mb':>8}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['target']:40} skipped: {r['skipped']}")
+            continue
+        print(f"{r['target']:40} {r['calls']:>7} {r['per_sec']:>10} {r['p50_ms']:>10} {r['p99_ms']:>10} {str(r['peak_rss_mb']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append", help="only run these targets")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over the corpus")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown counted as regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_target(args.target[0], args.repeat)))
+        return 0
+
+    manifest = load_manifest()
+    pages = corpus_pages(manifest)
+    report = {
+        "corpus": corpus_fingerprint(manifest, pages),
+        "pages": len(pages),
+        "python": sys.version.split()[0],
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": [run_isolated(name, args.repeat) for name in (args.target or TARGETS)],
+    }
+    print(f"Corpus {report['corpus']} ({report['pages']} pages)")
+    print_table(report["results"])
+
+    if all("skipped" in r for r in report["results"]):
+        print("Nothing was measured; baseline left untouched.")
+        return 1
+
+    baseline = load_baseline()
+    if args.save_baseline or baseline is None:
+        save_baseline(report)
+        print(f"Baseline saved to {BASELINE_FILE}")
+        return 0
+
+    if baseline.get("corpus") != report["corpus"]:
+        print(f"⚠️ Corpus changed since baseline ({baseline.get('corpus')}); comparison may be misleading.")
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  ❌ {line}")
+        return 1
+    print("\n✅ No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Cold-start and per-rerun latency benchmark for the Streamlit apps.
+
+Usage (from the project root):
+
+    python benchmarks/bench_startup.py                  # run, compare with baseline
+    python benchmarks/bench_startup.py --save-baseline  # run and store as new baseline
+    python benchmarks/bench_startup.py --app app --imports 25
+
+Every app runs headlessly with Streamlit's ``AppTest`` in its own
+``python -X importtime`` subprocess, so each measurement starts cold:
+
+- imports: modules first imported by the cold run itself (Streamlit and
+  the test harness are excluded), with the slowest top-level imports
+  listed; imports that only happen during the reruns (lazy features) are
+  reported separately
+- cold run: first script run, including those imports
+- reruns: p50/p99 of the following runs, each driven by a scripted
+  interaction (text input, checkbox, radio page switch, harmless button)
+- memory: RSS after the cold run and growth per rerun
+
+Scenarios never trigger network or browser work (buttons are only pressed
+with empty inputs).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+BASELINE_FILE = BENCH_DIR / "baseline_startup.json"
+
+DEFAULT_THRESHOLD = 0.20  # startup numbers are noisier than the extraction benchmark
+# A regression must also exceed these absolute deltas (scheduler noise on small numbers)
+MIN_DELTA = {"imports_ms": 25, "cold_run_ms": 50, "rerun_p50_ms": 25, "rerun_p99_ms": 50, "rss_cold_mb": 10}
+DEFAULT_RERUNS = 10
+RUN_TIMEOUT = 120
+MARKER = "--- bench_startup: script run ---"
+RERUN_MARKER = "--- bench_startup: reruns ---"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# app -> (script, scenario). A step is (widget kind, label prefix, value) or a
+# list of such steps applied before the same rerun. Buttons that start work
+# must come with their inputs emptied.
+APPS = {
+    "app": ("app.py", [
+        ("text_input", "🔎 Volltextsuche", "therme"),
+        [("text_area", "Website-URLs eingeben", ""), ("button", "Webseiten überprüfen", None)],
+        ("text_input", "🔎 Volltextsuche", ""),
+        [("text_area", "🔗 Geben Sie Firmen-URLs ein", ""), ("button", "🚀 Bewerbungen starten", None)],
+        ("checkbox", "🎙️ Spracheingabe aktivieren", True),
+        ("checkbox", "⚡ Live-Transkription", False),
+    ]),
+    "kontakt_agent": ("kontakt_agent.py", [
+        ("text_input", "🏙️ Ort", "Hamburg"),
+        ("checkbox", "🛠️ Debug-Ausgaben", False),
+        [("text_area", "🔗 Geben Sie mehrere URLs ein", ""), ("button", "🔍 Webseiten analysieren", None)],
+        ("checkbox", "🛠️ Debug-Ausgaben", True),
+    ]),
+    "another_app": ("kontakt_agent/another_app.py", [
+        ("radio", "Seite auswählen:", "Ad Studio"),
+        ("radio", "Seite auswählen:", "Suche"),
+        ("text_input", "Wie lautet die Website?", "https://example.de"),
+    ]),
+    "shopping_agent": ("agent/shopping_agent.py", [
+        ("text_input", "🔍 Enter search term:", "Wärmepumpe"),
+        ("checkbox", "Run in headless mode", False),
+        ("checkbox", "Run in headless mode", True),
+    ]),
+}
+
+
+# ===== MEASUREMENT (child process) =====
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def apply_step(at, step):
+    """Perform one scenario step on the AppTest; returns the labels of missing widgets."""
+    if isinstance(step, list):
+        return [label for sub in step for label in apply_step(at, sub)]
+    kind, label, value = step
+    widget = next((w for w in at.get(kind) if (w.label or "").startswith(label)), None)
+    if widget is None:
+        return [label]
+    if kind == "button":
+        widget.click()
+    elif kind == "checkbox":
+        widget.set_value(bool(value))
+    else:
+        widget.set_value(value)
+    return []
+
+
+def run_app(name, reruns):
+    """Run one app cold, then ``reruns`` scripted reruns; returns the result dict."""
+    from streamlit.testing.v1 import AppTest
+
+    script, scenario = APPS[name]
+    script = PROJECT_DIR / script
+    sys.path.insert(0, str(script.parent))
+    sys.path.insert(0, str(PROJECT_DIR))
+    # The apps create working folders relative to cwd
+    os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+    at = AppTest.from_file(str(script), default_timeout=RUN_TIMEOUT)
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter_ns()
+    at.run()
+    cold_ms = (time.perf_counter_ns() - start) / 1e6
+    if at.exception:
+        return {"app": name, "skipped": at.exception[0].value.splitlines()[0][:200]}
+    rss_cold = rss_mb()
+    print(RERUN_MARKER, file=sys.stderr, flush=True)
+
+    latencies, rss, missing = [], [], set()
+    for i in range(reruns):
+        if scenario:
+            missing.update(apply_step(at, scenario[i % len(scenario)]))
+        start = time.perf_counter_ns()
+        at.run()
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+        rss.append(rss_mb())
+
+    result = {
+        "app": name,
+        "cold_run_ms": round(cold_ms, 1),
+        "reruns": len(latencies),
+        "rerun_p50_ms": round(percentile(latencies, 50), 1),
+        "rerun_p99_ms": round(percentile(latencies, 99), 1),
+        "rerun_mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        "rss_cold_mb": rss_cold,
+        "rss_last_mb": rss[-1] if rss else rss_cold,
+        "rss_per_rerun_kb": round((rss[-1] - rss_cold) * 1024 / len(rss), 1) if rss and rss_cold else None,
+    }
+    if missing:
+        result["missing_widgets"] = sorted(missing)
+    return result
+
+
+# ===== IMPORT BREAKDOWN =====
+def _toplevel_imports(lines):
+    """(module, cumulative µs) of the directly imported modules, slowest first."""
+    toplevel = []
+    for line in lines:
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:  # one space of indent = imported directly
+            toplevel.append((m.group(4), int(m.group(2))))
+    return sorted(toplevel, key=lambda item: item[1], reverse=True)
+
+
+def parse_importtime(stderr, top):
+    """Import cost of the cold run and of the reruns from ``-X importtime`` output."""
+    lines = stderr.splitlines()
+    start = lines.index(MARKER) + 1 if MARKER in lines else 0
+    end = lines.index(RERUN_MARKER) if RERUN_MARKER in lines else len(lines)
+    cold = _toplevel_imports(lines[start:end])
+    late = _toplevel_imports(lines[end:])
+    return {
+        "imports_ms": round(sum(us for _, us in cold) / 1000, 1),
+        "modules": len(cold),
+        "slowest": [{"module": mod, "ms": round(us / 1000, 1)} for mod, us in cold[:top]],
+        "rerun_imports_ms": round(sum(us for _, us in late) / 1000, 1),
+        "rerun_imports": [mod for mod, _ in late[:top]],
+    }
+
+
+def run_isolated(name, reruns, top):
+    """Run an app in a fresh ``-X importtime`` interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(Path(__file__).resolve()),
+         "--app", name, "--reruns", str(reruns), "--child"],
+        capture_output=True, text=True, timeout=RUN_TIMEOUT * (reruns + 2),
+    )
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        return {"app": name, "skipped": (errors or ["failed"])[-1]}
+    result = json.loads(lines[-1])
+    if "skipped" not in result:
+        result.update(parse_importtime(proc.stderr, top))
+    return result
+
+
+# ===== BASELINE =====
+def load_baseline():
+    if BASELINE_FILE.exists():
+        try:
+            return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+    return None
+
+
+def save_baseline(report):
+    BASELINE_FILE.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def compare(report, baseline, threshold):
+    """Return regression messages for apps that start or rerun slower (or bigger) than baseline."""
+    regressions = []
+    old = {r["app"]: r for r in baseline.get("results", []) if "skipped" not in r}
+    for r in report["results"]:
+        prev = old.get(r["app"])
+        if not prev or "skipped" in r:
+            continue
+        for key, min_delta in MIN_DELTA.items():
+            if (prev.get(key) and r.get(key) and r[key] > prev[key] * (1 + threshold)
+                    and r[key] - prev[key] > min_delta):
+                regressions.append(f"{r['app']}: {key} {prev[key]} -> {r[key]} (+{(r[key] / prev[key] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results, top):
+    print(f"{'app':16} {'imports_ms':>10} {'cold_ms':>9} {'rerun_p50':>10} {'rerun_p99':>10} {'rss_mb':>8} {'kb/rerun':>9}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['app']:16} skipped: {r['skipped']}")
+            continue
+        print(f"{r['app']:16} {r['imports_ms']:>10} {r['cold_run_ms']:>9} {r['rerun_p50_ms']:>10} "
+              f"{r['rerun_p99_ms']:>10} {str(r['rss_cold_mb']):>8} {str(r['rss_per_rerun_kb']):>9}")
+    for r in results:
+        if "skipped" in r:
+            continue
+        if r.get("missing_widgets"):
+            print(f"\n⚠️ {r['app']}: scenario widgets not found: {', '.join(r['missing_widgets'])}")
+        if top and r.get("slowest"):
+            print(f"\n{r['app']}: {r['modules']} top-level imports, slowest:")
+            for item in r["slowest"]:
+                print(f"  {item['ms']:>8} ms  {item['module']}")
+        if r.get("rerun_imports"):
+            print(f"  + {r['rerun_imports_ms']} ms imported during reruns: {', '.join(r['rerun_imports'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=sorted(APPS), action="append", help="only run these apps")
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS, help="scripted reruns after the cold run")
+    parser.add_argument("--imports", type=int, default=10, help="slowest top-level imports to list per app")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown counted as regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_app(args.app[0], args.reruns)))
+        return 0
+
+    report = {
+        "python": sys.version.split()[0],
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": [run_isolated(name, args.reruns, args.imports) for name in (args.app or APPS)],
+    }
+    print_table(report["results"], args.imports)
+
+    if all("skipped" in r for r in report["results"]):
+        print("Nothing was measured; baseline left untouched.")
+        return 1
+
+    baseline = load_baseline()
+    if args.save_baseline or baseline is None:
+        save_baseline(report)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return 0
+
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  ❌ {line}")
+        return 1
+    print("\n✅ No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""Warm Playwright browsers shared by all form automation runs.
+
+Launching Firefox costs seconds, so the browsers are kept running between
+runs. Every browser lives on its own worker thread (the sync Playwright API
+may only be used from the thread that started it); callers lease a worker
+and send it jobs. Each job gets a fresh browser context, so cookies and
+storage never leak from one URL to the next::
+
+    with get_browser_pool().lease(headless=False, profile=get_profile("debug")) as browser:
+        results = [browser.run(fill_page, url) for url in urls]
+
+Before a job the browser is health-checked (and relaunched if it died or
+the launch options differ). After a lease it is recycled once it has served
+``MAX_USES`` contexts or the browsers together use more than
+``MEMORY_CAP_MB``. A recycled browser is relaunched right away, so the next
+lease starts warm; a browser unused for ``IDLE_SECONDS`` is closed.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from features import require
+from form_profiles import apply_timeouts, get_profile, launch_options
+from resource_blocking import block_playwright
+from instrumentation import span
+from metrics import BROWSER_LAUNCHES, OPEN_BROWSERS
+
+POOL_SIZE = 2            # browsers (worker threads) at most
+MAX_USES = 25            # contexts per browser before it is relaunched
+MEMORY_CAP_MB = 1500     # all browser processes of this app together
+IDLE_SECONDS = 600       # close a browser nobody used for 10 minutes
+LEASE_TIMEOUT = 300      # wait this long for a free browser
+ENGINE = "firefox"
+
+
+def browser_memory_mb():
+    """RSS of all child processes (Playwright drivers and browsers) in MB, None if unknown."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        children = psutil.Process().children(recursive=True)
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass  # exited meanwhile
+        return total / 2**20
+    if not os.path.isdir("/proc"):
+        return None
+    # Linux without psutil: walk the process tree in /proc
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    todo = list(parents.get(os.getpid(), []))
+    while todo:
+        pid = todo.pop()
+        todo.extend(parents.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            pass
+    return total / 2**20
+
+
+class _Worker:
+    """One thread owning one Playwright instance and (at most) one browser."""
+
+    def __init__(self, number):
+        self.number = number
+        self.uses = 0            # contexts since the last launch
+        self.options = None      # launch options of the running browser
+        self.leased = False
+        self._inbox = queue.Queue()
+        self._playwright = None
+        self._browser = None
+        self._kept = []          # contexts kept open until the lease ends
+        self._thread = threading.Thread(target=self._loop, name=f"browser-pool-{number}", daemon=True)
+        self._thread.start()
+
+    # ----- caller side -----
+    def call(self, fn, *args):
+        """Run ``fn(*args)`` on the worker thread and return its result."""
+        future = Future()
+        ctx = _script_run_ctx()
+        self._inbox.put((fn, args, future, ctx))
+        return future.result()
+
+    @property
+    def running(self):
+        return self._browser is not None
+
+    # ----- worker thread -----
+    def _loop(self):
+        while True:
+            try:
+                item = self._inbox.get(timeout=IDLE_SECONDS)
+            except queue.Empty:
+                if not self.leased and self._browser is not None:
+                    self._close()
+                continue
+            if item is None:
+                self._close()
+                if self._playwright is not None:
+                    try:
+                        self._playwright.stop()
+                    except Exception:
+                        pass
+                return
+            fn, args, future, ctx = item
+            # Let st.* calls of the job render into the caller's session, and
+            # only the caller's: a job without a caller context gets none
+            _set_script_run_ctx(ctx)
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                _set_script_run_ctx(None)
+
+    def _launch(self, options, reason):
+        if self._playwright is None:
+            require("playwright")
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+        with span("browser.launch"):
+            self._browser = getattr(self._playwright, ENGINE).launch(**options)
+        self.options = options
+        self.uses = 0
+        OPEN_BROWSERS.inc(engine=ENGINE)
+        BROWSER_LAUNCHES.inc(reason=reason)
+
+    def _close(self):
+        self._close_kept()
+        if self._browser is None:
+            return
+        try:
+            self._browser.close()
+        except Exception:
+            pass  # already crashed
+        self._browser = None
+        OPEN_BROWSERS.dec(engine=ENGINE)
+
+    def ensure_browser(self, options):
+        """Health check: (re)launch unless a connected browser with these options is running."""
+        if self._browser is None:
+            self._launch(options, "cold")
+        elif not self._browser.is_connected():
+            self._close()
+            self._launch(options, "unhealthy")
+        elif self.options != options:
+            self._close()
+            self._launch(options, "options")
+
+    def run_job(self, options, profile, fn, args, kwargs, keep_open):
+        self.ensure_browser(options)
+        context = self._browser.new_context()
+        apply_timeouts(context, profile)
+        if profile["block_resources"]:
+            block_playwright(context)
+        self.uses += 1
+        try:
+            return fn(context.new_page(), *args, **kwargs)
+        finally:
+            if keep_open:
+                self._kept.append(context)
+            else:
+                try:
+                    context.close()
+                except Exception:
+                    pass  # browser crashed; the next health check relaunches it
+
+    def release(self, recycle):
+        self._close_kept()
+        if recycle and self._browser is not None:
+            options = self.options
+            self._close()
+            self._launch(options, "recycle")  # warm again for the next lease
+
+    def _close_kept(self):
+        for context in self._kept:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._kept = []
+
+    def stop(self):
+        self._inbox.put(None)
+
+
+class Lease:
+    """A browser reserved for one caller; ``run`` opens a new context per job."""
+
+    def __init__(self, worker, options, profile):
+        self._worker = worker
+        self.options = options
+        self.profile = profile
+
+    def run(self, fn, *args, keep_open=False, **kwargs):
+        """Call ``fn(page, *args, **kwargs)`` in a fresh browser context on the browser's thread.
+
+        With ``keep_open`` the context stays open until the lease ends
+        (e.g. to let the user inspect the filled forms).
+        """
+        return self._worker.call(self._worker.run_job, self.options, self.profile, fn, args, kwargs, keep_open)
+
+    def call(self, fn, *args):
+        """Call ``fn(*args)`` on the browser's thread, e.g. ``call(page.pause)`` for a kept page."""
+        return self._worker.call(fn, *args)
+
+    def warm(self):
+        """Launch the browser now (a no-op if it is already running)."""
+        self._worker.call(self._worker.ensure_browser, self.options)
+
+    @property
+    def uses(self):
+        return self._worker.uses
+
+
+class BrowserPool:
+    """Up to ``size`` warm browsers, each on its own thread."""
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES, memory_cap_mb=MEMORY_CAP_MB):
+        self.size = size
+        self.max_uses = max_uses
+        self.memory_cap_mb = memory_cap_mb
+        self._workers = []
+        self._idle = queue.LifoQueue()   # most recently used first: its browser is warm
+        self._lock = threading.Lock()
+        self.recycled = 0
+
+    def _acquire(self, timeout):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = _Worker(len(self._workers) + 1)
+                self._workers.append(worker)
+                return worker
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Kein Browser frei nach {timeout} s") from None
+
+    @contextmanager
+    def lease(self, headless=False, profile=None, timeout=LEASE_TIMEOUT):
+        """Reserve a browser for the ``with`` block, launched for the execution profile."""
+        profile = profile or get_profile()
+        options = launch_options(headless, profile)
+        worker = self._acquire(timeout)
+        worker.leased = True
+        try:
+            yield Lease(worker, options, profile)
+        finally:
+            memory = browser_memory_mb() if self.memory_cap_mb else None
+            recycle = worker.uses >= self.max_uses or (memory is not None and memory > self.memory_cap_mb)
+            try:
+                worker.call(worker.release, recycle)
+            except Exception:
+                pass  # relaunch failed; the next lease tries again
+            if recycle:
+                self.recycled += 1
+            worker.leased = False
+            self._idle.put(worker)
+
+    def run(self, fn, *args, headless=False, profile=None, **kwargs):
+        """Run a single job on a leased browser."""
+        with self.lease(headless=headless, profile=profile) as browser:
+            return browser.run(fn, *args, **kwargs)
+
+    def warm(self, headless=False, profile=None):
+        """Launch a browser in the background so the next lease does not wait for it."""
+        def launch():
+            with self.lease(headless=headless, profile=profile) as browser:
+                browser.warm()
+        threading.Thread(target=launch, name="browser-pool-warm", daemon=True).start()
+
+    def status(self):
+        """One row per browser for the UI."""
+        return [{
+            "browser": w.number,
+            "läuft": w.running,
+            "belegt": w.leased,
+            "kontexte": w.uses,
+            "optionen": str(w.options or ""),
+        } for w in self._workers]
+
+    def shutdown(self):
+        """Close all browsers and stop their threads."""
+        for worker in self._workers:
+            worker.stop()
+
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+
+def _set_script_run_ctx(ctx):
+    """Set (or with None remove) the current thread's ScriptRunContext.
+
+    ``add_script_run_ctx(thread, None)`` cannot be used to detach: it falls
+    back to the thread's current context and leaves it in place.
+    """
+    try:
+        from streamlit.runtime.scriptrunner.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+    except ImportError:
+        return
+    thread = threading.current_thread()
+    if ctx is not None:
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx)
+    elif hasattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME):
+        delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
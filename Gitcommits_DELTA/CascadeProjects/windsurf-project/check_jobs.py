@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from exports import export_widget
+from job_frame import get_job_frame
+from plz_index import get_index
+
 # Initialize session state if not exists
 if 'jobs' not in st.session_state:
     st.session_state.jobs = []
@@ -17,32 +21,50 @@ else:
     
     # Check for Anlagenmechaniker jobs
     anlagen_jobs = df[df['title'].str.contains('anlagenmechaniker', case=False, na=False)]
-    
+
     st.subheader("🔍 Anlagenmechaniker Jobs Found")
     if len(anlagen_jobs) > 0:
         st.success(f"✅ Found {len(anlagen_jobs)} Anlagenmechaniker jobs!")
-        
+
         # Check for phone numbers
         anlagen_jobs_with_phone = anlagen_jobs[anlagen_jobs['phone'] != 'N/A']
-        
+
         if len(anlagen_jobs_with_phone) > 0:
             st.success(f"✅ {len(anlagen_jobs_with_phone)} jobs have phone numbers!")
             st.dataframe(anlagen_jobs_with_phone[['title', 'company', 'phone', 'url']])
-            
-            # Save results to CSV
-            csv = anlagen_jobs_with_phone.to_csv(index=False)
-            st.download_button(
-                "💾 Download Anlagenmechaniker Jobs with Phone Numbers",
-                data=csv,
-                file_name="anlagenmechaniker_jobs.csv",
-                mime="text/csv"
-            )
+
+            # Export is only built on request and reused until new jobs arrive
+            export_widget(anlagen_jobs_with_phone, "anlagenmechaniker_jobs", key="anlagen_export",
+                          version=len(st.session_state.jobs))
         else:
             st.warning("ℹ️ No phone numbers found for Anlagenmechaniker jobs.")
             st.dataframe(anlagen_jobs[['title', 'company', 'phone', 'url']])
     else:
         st.warning("⚠️ No Anlagenmechaniker jobs found in the current session data.")
-    
+
+    # Radius search on the PLZ centroids normalised at ingest
+    st.subheader("📍 Umkreissuche")
+    region_level = get_index().region_level
+    if region_level:
+        st.caption("ℹ️ Ungefähre Umkreissuche: Orte werden nur auf 2-stellige PLZ-Regionen (ca. ±30 km) "
+                   "abgebildet. Für genaue Entfernungen die GeoNames-Datei DE.txt unter geodata/ ablegen.")
+    col_center, col_radius = st.columns([2, 3])
+    with col_center:
+        center = st.text_input("PLZ oder Ort", placeholder="z.B. 14193 Berlin", key="radius_center")
+    with col_radius:
+        radius_km = st.slider("Umkreis (km, ca.)" if region_level else "Umkreis (km)", min_value=5, max_value=200, value=30, step=5, key="radius_km")
+    only_anlagen = st.checkbox("Nur Anlagenmechaniker", value=True, key="radius_only_anlagen")
+    if center:
+        # Locations are normalised once per job, not on every rerun
+        frame = get_job_frame(st.session_state)
+        nearby = frame.within(center, radius_km, only_anlagen=only_anlagen)
+        if nearby is None:
+            st.warning(f"⚠️ '{center}' konnte keiner PLZ bzw. keinem Ort zugeordnet werden.")
+        else:
+            approx = "ca. " if region_level else ""
+            st.success(f"✅ {len(nearby)} Jobs im Umkreis von {approx}{radius_km} km um {center}")
+            st.dataframe(nearby[['title', 'company', 'location', 'distance_km', 'phone', 'url']])
+
     # Show all jobs for reference
     st.subheader("📋 All Jobs in Session")
     st.dataframe(df[['title', 'company', 'phone']])
@@ -0,0 +1,261 @@
+"""Streamed CSV/Parquet/XLSX exports for the download buttons.
+
+``write_export`` consumes the data chunk by chunk (a DataFrame or any
+iterable of dicts) and writes straight into a ``SpooledTemporaryFile``,
+optionally through gzip or zip. Small exports stay in memory, large ones
+spill to disk, and no intermediate ``to_csv()`` string is ever built.
+``export_widget`` only builds the file once the user asks for it, on disk.
+"""
+import gzip
+import io
+import os
+import tempfile
+import weakref
+import zipfile
+from itertools import islice
+
+import pandas as pd
+
+CHUNK_ROWS = 5000
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # larger exports are spooled to a temp file
+
+FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+COMPRESSIONS = {
+    None: ("", None),
+    "gzip": (".gz", "application/gzip"),
+    "zip": (".zip", "application/zip"),
+}
+
+
+def available_formats():
+    """Formats whose writer dependency is installed."""
+    formats = ["csv"]
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append("parquet")
+    except ImportError:
+        pass
+    try:
+        import openpyxl  # noqa: F401
+        formats.append("xlsx")
+    except ImportError:
+        pass
+    return formats
+
+
+def iter_chunks(data, columns=None, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrame chunks from a DataFrame or an iterable of dicts.
+
+    Without rows a single empty chunk is yielded, so the writers still
+    produce the CSV header, the Parquet schema and the XLSX header row.
+    """
+    if isinstance(data, pd.DataFrame):
+        if columns:
+            data = data[columns]
+        if data.empty:
+            yield data
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+        return
+
+    rows = iter(data)
+    empty = True
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        if not batch:
+            break
+        empty = False
+        yield pd.DataFrame.from_records(batch, columns=columns)
+    if empty:
+        yield pd.DataFrame(columns=columns or [])
+
+
+def _write_csv(chunks, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(text, index=False, header=header)
+        header = False
+    text.detach()
+
+
+def _parquet_schema(chunk):
+    """Explicit schema from the first chunk: text columns are strings whatever the chunk holds.
+
+    Letting Arrow infer it would type a column that is all None in the first
+    chunk as ``null``, and the first later chunk with a value would fail.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for name, dtype in chunk.dtypes.items():
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+            arrow_type = pa.array(chunk[name], from_pandas=True).type  # bool, int64, float64, timestamp
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(name), arrow_type))
+    return pa.schema(fields)
+
+
+def _parquet_table(chunk, schema):
+    """A chunk converted column by column to ``schema`` (missing columns are null)."""
+    import pyarrow as pa
+
+    names = {str(c): c for c in chunk.columns}
+    arrays = []
+    for field in schema:
+        if field.name not in names:
+            arrays.append(pa.nulls(len(chunk), field.type))
+            continue
+        column = chunk[names[field.name]]
+        if field.type == pa.string():
+            column = column.astype(str).where(column.notna(), None)
+        try:
+            arrays.append(pa.array(column, type=field.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Spalte {field.name}: Werte passen nicht zum Typ {field.type} ({e})") from e
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet(chunks, out):
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(out, _parquet_schema(chunk), compression="snappy")
+            writer.write_table(_parquet_table(chunk, writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(chunks, out):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    header = True
+    for chunk in chunks:
+        if header:
+            ws.append([str(c) for c in chunk.columns])
+            header = False
+        for row in chunk.astype(object).itertuples(index=False, name=None):
+            ws.append([None if pd.isna(v) else v for v in row])
+    wb.save(out)
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def export_filename(file_stem, fmt, compression=None):
+    return f"{file_stem}.{fmt}{COMPRESSIONS[compression][0]}"
+
+
+def export_mime(fmt, compression=None):
+    return COMPRESSIONS[compression][1] or FORMATS[fmt][1]
+
+
+def write_export(data, fmt="csv", compression=None, columns=None, file_stem="export", chunk_rows=CHUNK_ROWS,
+                 out=None):
+    """Write ``data`` as ``fmt`` and return a spooled file positioned at 0.
+
+    ``compression`` is None, "gzip" or "zip". XLSX is already a zip container
+    and is never compressed again. With ``out`` (a binary file opened for
+    writing and reading) the export is written there instead.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unbekanntes Exportformat: {fmt}")
+    if fmt == "xlsx":
+        compression = None
+
+    spool = out if out is not None else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    chunks = iter_chunks(data, columns, chunk_rows)
+    try:
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=spool, mode="wb", filename=f"{file_stem}.{fmt}") as gz:
+                WRITERS[fmt](chunks, gz)
+        elif compression == "zip":
+            with zipfile.ZipFile(spool, "w", zipfile.ZIP_DEFLATED) as zf:
+                with zf.open(f"{file_stem}.{fmt}", "w", force_zip64=True) as member:
+                    WRITERS[fmt](chunks, member)
+        else:
+            WRITERS[fmt](chunks, spool)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+class _ExportFile:
+    """A finished export on disk; the file is removed with this object or by ``discard``."""
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self._finalizer = weakref.finalize(self, _remove, path)
+
+    def discard(self):
+        self._finalizer()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_widget(data, file_stem, key, version=None, columns=None):
+    """Format picker plus a button that builds the export only on request.
+
+    The finished file is written to a temporary file; session_state keeps
+    only its path under ``key`` until ``version`` (or the chosen format)
+    changes, then the file is deleted. It is also deleted when the session
+    state is dropped.
+    """
+    import streamlit as st
+
+    formats = available_formats()
+    col_fmt, col_comp, col_btn = st.columns([2, 2, 3])
+    with col_fmt:
+        fmt = st.selectbox("Format", formats, key=f"{key}_fmt")
+    with col_comp:
+        compression = st.selectbox("Komprimierung", ["keine", "gzip", "zip"], key=f"{key}_comp",
+                                   disabled=fmt == "xlsx")
+    if compression == "keine" or fmt == "xlsx":
+        compression = None
+
+    signature = (version, fmt, compression)
+    cached = st.session_state.get(key)
+    if cached is not None and (cached.signature != signature or not os.path.exists(cached.path)):
+        cached.discard()
+        cached = st.session_state[key] = None
+
+    with col_btn:
+        if cached is None and st.button("📦 Export erstellen", key=f"{key}_build"):
+            with st.spinner("Export wird erstellt..."):
+                fd, path = tempfile.mkstemp(prefix="export_", suffix=f".{fmt}")
+                try:
+                    with os.fdopen(fd, "w+b") as f:
+                        write_export(data, fmt, compression, columns, file_stem, out=f)
+                except Exception:
+                    _remove(path)
+                    raise
+            cached = st.session_state[key] = _ExportFile(path, signature)
+        if cached is not None:
+            # Streamlit copies the data into its media store while the button is shown
+            with open(cached.path, "rb") as f:
+                st.download_button(
+                    label=f"📥 {FORMATS[fmt][0]} herunterladen",
+                    data=f,
+                    file_name=export_filename(file_stem, fmt, compression),
+                    mime=export_mime(fmt, compression),
+                    key=f"{key}_download",
+                )
@@ -0,0 +1,101 @@
+"""Optional heavy dependencies of the Agent Hub, imported on first use.
+
+app.py must start even if PyAudio/PortAudio, the browser stacks or the
+OpenAI SDK are missing, and a cold start should not pay for libraries no
+action has needed yet. ``available(feature)`` is a cheap check (module spec
+lookup, nothing is imported) for rendering the UI. ``require(feature)``
+imports the feature's modules when it is actually used, records the import
+time as an ``import.<feature>`` span and raises FeatureUnavailable with an
+install hint if something is missing; ``missing(feature)`` returns that
+message instead of raising. Results are kept per process.
+"""
+import importlib
+import importlib.util
+import threading
+import time
+
+from instrumentation import record
+
+# feature -> (modules, install hint)
+FEATURES = {
+    "speech": (("speech_recognition",), "pip install SpeechRecognition"),
+    "microphone": (("pyaudio",), "brew install portaudio && pip install pyaudio"),
+    "openai": (("openai",), "pip install openai"),
+    "playwright": (("playwright.sync_api",), "pip install playwright && playwright install firefox"),
+    "selenium": (("selenium.webdriver", "selenium.webdriver.support.ui"), "pip install selenium"),
+    "html": (("bs4",), "pip install beautifulsoup4"),
+}
+
+_lock = threading.Lock()
+_errors = {}          # feature -> error message (None once imported)
+_import_seconds = {}  # feature -> seconds spent importing it
+
+
+class FeatureUnavailable(RuntimeError):
+    """A feature's dependencies are not installed (or fail to load)."""
+
+
+def available(feature):
+    """True if the feature is loaded or its modules are installed (no import)."""
+    with _lock:
+        if feature in _errors:
+            return _errors[feature] is None
+    modules, _ = FEATURES[feature]
+    # Only the top-level package: find_spec of a submodule would import its parents
+    return all(importlib.util.find_spec(module.partition(".")[0]) is not None for module in modules)
+
+
+def require(feature):
+    """Import the feature's modules once; raises FeatureUnavailable if that fails."""
+    with _lock:
+        if feature in _errors:
+            if _errors[feature] is None:
+                return
+            raise FeatureUnavailable(_errors[feature])
+        modules, hint = FEATURES[feature]
+        start = time.perf_counter_ns()
+        try:
+            for module in modules:
+                importlib.import_module(module)
+        except Exception as e:  # ImportError, or OSError for a missing shared library (PortAudio)
+            _errors[feature] = f"{feature} nicht verfügbar ({e}). Installation: {hint}"
+            record(f"import.{feature}", time.perf_counter_ns() - start, error=True)
+            raise FeatureUnavailable(_errors[feature]) from e
+        duration = time.perf_counter_ns() - start
+        _errors[feature] = None
+        _import_seconds[feature] = duration / 1e9
+        record(f"import.{feature}", duration)
+
+
+def missing(feature):
+    """Load the feature now; returns the error message, or None if it is usable."""
+    try:
+        require(feature)
+    except FeatureUnavailable as e:
+        return str(e)
+    return None
+
+
+def status():
+    """One row per feature: installed, loaded, import time and error."""
+    with _lock:
+        errors, seconds = dict(_errors), dict(_import_seconds)
+    rows = []
+    for feature in FEATURES:
+        rows.append({
+            "feature": feature,
+            "verfügbar": available(feature),
+            "geladen": errors.get(feature, "") is None,
+            "import_ms": round(seconds[feature] * 1000, 1) if feature in seconds else None,
+            "fehler": errors.get(feature) or "",
+        })
+    return rows
+
+
+def render_feature_status():
+    """Streamlit expander listing the optional features and their import cost."""
+    import streamlit as st
+
+    with st.expander("🧩 Optionale Module"):
+        st.caption("Module werden erst bei der ersten Nutzung geladen.")
+        st.dataframe(status(), use_container_width=True, hide_index=True)
@@ -0,0 +1,222 @@
+"""Local form field classifier: the fast path before the LLM field mapping.
+
+Every visible input/textarea/select of the chosen form is described by its
+name, id, placeholder, aria-label, label text, autocomplete, type and tag.
+Their words and character 3/4-grams are hashed into ``DIM`` buckets and
+scored by a linear softmax model over ``CLASSES`` ("other" for fields none
+of the keys applies to). Scoring a whole form is a few hundred additions.
+
+``classify_form(soup)`` returns the mapping (one field per key, the most
+probable) and its confidence, the lowest probability among the mapped
+fields. Callers use it when the confidence reaches ``MIN_CONFIDENCE`` and
+ask the LLM otherwise.
+
+The weights (``field_weights.json.gz``) are trained offline by
+``train_field_classifier.py``. Each mapping the LLM returns is logged as
+labelled examples (attributes only, never values) to ``FIELD_EXAMPLES_LOG``
+(default ``field_examples.jsonl``) for the next training run.
+"""
+import gzip
+import json
+import math
+import os
+import re
+import threading
+import zlib
+
+from form_cache import domain_of, parse
+from form_fields import choose_form, css_selector
+from metrics import FIELD_CLASSIFIER
+
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "field_weights.json.gz")
+EXAMPLES_LOG = os.getenv("FIELD_EXAMPLES_LOG", "field_examples.jsonl")
+CLASSES = ("first_name", "last_name", "name", "email", "phone", "street", "zip", "city", "message", "other")
+DIM = 2 ** 14
+MIN_CONFIDENCE = 0.8
+MIN_FIELDS = 2             # fewer mapped fields is not a contact form worth trusting
+
+FIELD_TAGS = ["input", "textarea", "select"]
+_IGNORED_TYPES = {"hidden", "submit", "button", "reset", "image", "checkbox", "radio", "file"}
+_CAMEL_RE = re.compile(r"([a-z])([A-Z])")
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_log_lock = threading.Lock()
+
+
+# ===== FEATURES =====
+def describe(field, labels):
+    """Raw attributes of a field (the logged and trained representation)."""
+    label = ""
+    if field.get("id") and field["id"] in labels:
+        label = labels[field["id"]]
+    else:
+        wrapping = field.find_parent("label")
+        if wrapping is not None:
+            label = wrapping.get_text(" ", strip=True)
+    return {
+        "tag": field.name,
+        "type": (field.get("type") or "").lower(),
+        "name": field.get("name") or "",
+        "id": field.get("id") or "",
+        "placeholder": field.get("placeholder") or "",
+        "aria": field.get("aria-label") or "",
+        "autocomplete": (field.get("autocomplete") or "").lower(),
+        "label": label[:80],
+    }
+
+
+def _words(text):
+    return _WORD_RE.findall(_CAMEL_RE.sub(r"\1 \2", text).lower().translate(_UMLAUTS))
+
+
+def features(info):
+    """Hashed feature buckets of a described field."""
+    keys = {f"tag:{info['tag']}", f"type:{info['type']}"}
+    if info["autocomplete"]:
+        keys.add(f"ac:{info['autocomplete']}")
+    for source in ("name", "id", "placeholder", "aria", "label"):
+        for word in _words(info[source]):
+            keys.add(f"w:{word}")
+            padded = f"^{word}$"
+            for n in (3, 4):
+                keys.update(f"g:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    return sorted({zlib.crc32(key.encode("utf-8")) % DIM for key in keys})
+
+
+def form_fields(soup):
+    """(element, description) for every visible field of the chosen form."""
+    form = choose_form(soup)
+    if form is None:
+        return []
+    labels = {label["for"]: label.get_text(" ", strip=True)
+              for label in soup.find_all("label", attrs={"for": True})}
+    return [(field, describe(field, labels)) for field in form.find_all(FIELD_TAGS)
+            if (field.get("type") or "").lower() not in _IGNORED_TYPES]
+
+
+# ===== MODEL =====
+class FieldClassifier:
+    """Linear softmax model over hashed features."""
+
+    def __init__(self, bias, weights, classes=CLASSES, dim=DIM):
+        self.classes = tuple(classes)
+        self.dim = dim
+        self.bias = list(bias)
+        self.weights = weights      # bucket -> per-class weights (sparse: only trained buckets)
+
+    @classmethod
+    def load(cls, path=WEIGHTS_FILE):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["bias"], {int(k): v for k, v in data["weights"].items()}, data["classes"], data["dim"])
+
+    def save(self, path=WEIGHTS_FILE):
+        data = {"version": 1, "dim": self.dim, "classes": list(self.classes), "bias": self.bias,
+                "weights": {str(k): [round(w, 4) for w in v] for k, v in sorted(self.weights.items())}}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    def probabilities(self, buckets):
+        scores = list(self.bias)
+        for bucket in buckets:
+            row = self.weights.get(bucket)
+            if row is not None:
+                for i, w in enumerate(row):
+                    scores[i] += w
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, info):
+        """(class, probability) of a described field."""
+        probs = self.probabilities(features(info))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.classes[best], probs[best]
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """The shipped model, loaded once per process; None if the weights file is missing."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            try:
+                _model = FieldClassifier.load()
+            except (OSError, ValueError, KeyError):
+                _model = False
+    return _model or None
+
+
+def classify_form(soup, model=None):
+    """Return ``(mapping, confidence)``: field key -> selector, and the lowest probability used.
+
+    Each key goes to the field most likely to be it; a field is used once.
+    ``confidence`` is 0.0 if nothing was mapped.
+    """
+    model = model or get_model()
+    if model is None:
+        return {}, 0.0
+    candidates = []
+    for field, info in form_fields(soup):
+        selector = css_selector(field)
+        if not selector:
+            continue
+        probs = model.probabilities(features(info))
+        for i, key in enumerate(model.classes):
+            if key != "other":
+                candidates.append((probs[i], key, selector, max(probs)))
+    mapping = {}
+    confidence = 1.0
+    for prob, key, selector, best in sorted(candidates, reverse=True):
+        # Only where the key is the field's own top class
+        if key in mapping or selector in mapping.values() or prob < best:
+            continue
+        mapping[key] = selector
+        confidence = min(confidence, prob)
+    return mapping, (confidence if mapping else 0.0)
+
+
+def confident_mapping(soup):
+    """The classifier's mapping if it can be used without asking the LLM, else None."""
+    mapping, confidence = classify_form(soup)
+    if len(mapping) >= MIN_FIELDS and confidence >= MIN_CONFIDENCE:
+        FIELD_CLASSIFIER.inc(result="confident")
+        return mapping
+    FIELD_CLASSIFIER.inc(result="unsure")
+    return None
+
+
+# ===== TRAINING DATA =====
+def labelled_examples(soup, mapping):
+    """Fields of the chosen form labelled by an (LLM) mapping; unmapped fields are "other"."""
+    keys = {}
+    for key, selector in mapping.items():
+        if not selector or key not in CLASSES:
+            continue
+        try:
+            element = soup.select_one(selector)
+        except Exception:  # selector the HTML parser cannot evaluate
+            continue
+        if element is not None:
+            keys[id(element)] = key
+    if not keys:
+        return []
+    return [{"label": keys.get(id(field), "other"), "field": info} for field, info in form_fields(soup)]
+
+
+def log_examples(url, html, mapping, path=None):
+    """Append the fields of an LLM-mapped form to the training log (JSON lines)."""
+    try:
+        examples = labelled_examples(parse(html), mapping)
+        if not examples:
+            return
+        domain = domain_of(url) if url else ""
+        with _log_lock, open(path or EXAMPLES_LOG, "a", encoding="utf-8") as f:
+            for example in examples:
+                f.write(json.dumps(dict(example, domain=domain), ensure_ascii=False) + "\n")
+    except Exception:
+        pass  # training data is a by-product; never fail the form run for it
@@ -0,0 +1,144 @@
+"""Persistent cache for LLM form-field mappings.
+
+``ai_extract_form_fields`` costs seconds and tokens per page, but a site's
+contact form rarely changes. Mappings are stored in SQLite keyed by the
+domain plus a structural fingerprint of the chosen form: a hash of the
+tag, type, name and id of its visible fields, in document order, so a
+changed form gets a new key while text edits, tokens and hidden fields
+don't matter.
+
+Entries expire after ``TTL_DAYS``; beyond ``MAX_ENTRIES`` the least
+recently used ones are evicted. Before a cached mapping is reused every
+selector is checked against the current HTML; if one no longer resolves
+the entry is dropped and the LLM is asked again.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from features import require
+from form_fields import choose_form, visible_fields
+from metrics import FORM_CACHE
+
+DB_NAME = "form_cache.db"
+TTL_DAYS = 30
+MAX_ENTRIES = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    domain TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    mapping TEXT NOT NULL,      -- JSON: field -> CSS selector
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (domain, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS mappings_last_used ON mappings (last_used);
+"""
+
+
+def domain_of(url):
+    """Lower-case host without a leading "www."."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse(html):
+    require("html")
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
+
+
+def form_fingerprint(form):
+    """Hash of the form's visible fields (tag, type, name, id) in document order."""
+    parts = [f"{field.name}:{(field.get('type') or '').lower()}:{field.get('name') or ''}:{field.get('id') or ''}"
+             for field in visible_fields(form)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def selectors_resolve(soup, mapping):
+    """True if every selector of the mapping still matches an element."""
+    for selector in mapping.values():
+        if not selector:
+            continue
+        try:
+            if soup.select_one(selector) is None:
+                return False
+        except Exception:  # selector the HTML parser cannot evaluate
+            return False
+    return True
+
+
+class FormCache:
+    """SQLite-backed TTL/LRU cache of field -> selector mappings; safe to share between sessions."""
+
+    def __init__(self, path=DB_NAME, ttl_days=TTL_DAYS, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: sessions and form runner threads share the cache
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:  # commit or roll back
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, url, html):
+        """Return ``(mapping or None, key)``; pass ``key`` to ``store`` after asking the LLM.
+
+        ``key`` is None if the page has no form (nothing to cache).
+        """
+        soup = parse(html)
+        form = choose_form(soup)
+        if form is None:
+            return None, None
+        key = (domain_of(url), form_fingerprint(form))
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT mapping, created FROM mappings WHERE domain = ? AND fingerprint = ?",
+                               key).fetchone()
+            if row is None:
+                FORM_CACHE.inc(result="miss")
+                return None, key
+            mapping = json.loads(row[0])
+            if now - row[1] > self.ttl:
+                result = "expired"
+            elif not selectors_resolve(soup, mapping):
+                result = "stale"
+            else:
+                conn.execute("UPDATE mappings SET last_used = ?, hits = hits + 1 "
+                             "WHERE domain = ? AND fingerprint = ?", (now, *key))
+                FORM_CACHE.inc(result="hit")
+                return mapping, key
+            conn.execute("DELETE FROM mappings WHERE domain = ? AND fingerprint = ?", key)
+        FORM_CACHE.inc(result=result)
+        return None, key
+
+    def store(self, key, mapping):
+        """Remember a mapping (field -> selector) and evict beyond ``max_entries``."""
+        if key is None or not mapping:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO mappings (domain, fingerprint, mapping, created, last_used) "
+                         "VALUES (?, ?, ?, ?, ?)", (*key, json.dumps(mapping), now, now))
+            conn.execute("DELETE FROM mappings WHERE created < ?", (now - self.ttl,))
+            conn.execute("DELETE FROM mappings WHERE rowid IN (SELECT rowid FROM mappings "
+                         "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM mappings").fetchone()
+        return {"entries": entries, "hits": hits}
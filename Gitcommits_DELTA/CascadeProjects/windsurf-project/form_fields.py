@@ -0,0 +1,143 @@
+"""Regex form field extraction, shared by the Agent Hub and the contact scanners.
+
+``extract_form_fields_regex(html)`` maps the visible fields of the page's
+largest form to first_name, last_name, name, email, phone, street, zip, city and
+message. It used to be copied into app.py, kontakt_agent.py and
+kontakt_agent/app.py, and each copy parsed the whole page and searched the
+whole document for a ``<label for=...>`` once per input. Here it runs in a
+fixed number of passes however large the page is:
+
+* only ``<form>`` and ``<label>`` elements are parsed (``SoupStrainer``),
+* the ``for`` -> label text index is built once,
+* the field patterns are compiled once per process.
+
+It returns ``{key: FieldInfo}``; ``selector_mapping`` turns that into the
+``{key: selector}`` shape the contact scanners and the LLM mapping use.
+
+``rank_forms``/``choose_form`` (which form a page is about) and
+``css_selector`` (how a field is addressed) are the single definitions the
+form cache, the field classifier and the compact form HTML use as well.
+"""
+import re
+from typing import Dict, Optional, TypedDict
+
+from features import require
+from instrumentation import timed
+
+FIELD_TAGS = ["input", "textarea", "select"]
+# Never filled by the user: hidden inputs carry tokens, buttons only change wording
+NON_FIELD_TYPES = {"hidden", "submit", "button", "reset", "image"}
+# An id usable as #id without escaping ("1-email" and "form:email" are not)
+_CSS_IDENT_RE = re.compile(r"-?[A-Za-z_][\w-]*")
+
+# key -> pattern over "name id placeholder aria-label label" (lower case), in
+# priority order: the first field matching a key gets it
+PATTERNS = {
+    "name": re.compile(r"(full.?name|your.?name|contact.?name|^name$|\bname\b)"),
+    "first_name": re.compile(r"(vorname|first.?name|given.?name|\bfname\b)"),
+    "last_name": re.compile(r"(nachname|last.?name|family.?name|\blname\b|surname)"),
+    "email": re.compile(r"(mail|e.?mail)"),
+    "phone": re.compile(r"(telefon|handy|mobil|phone|tel|telephone|phone.?number)"),
+    "street": re.compile(r"(stra(ss|ß)e|street|address(\s*line)?\s*1|hausnummer|addr1)"),
+    "zip": re.compile(r"(plz|zip|postal.?code|post.?code)"),
+    "city": re.compile(r"(ort|stadt|city|locality|town)"),
+    "message": re.compile(r"(nachricht|message|bemerkung|kommentar|anschreiben|cover.?letter|motivation|"
+                          r"inquiry|comments|text)"),
+}
+# Input types that decide the key on their own
+TYPE_KEYS = {"email": "email", "tel": "phone"}
+
+
+class FieldInfo(TypedDict):
+    selector: Optional[str]
+    name: Optional[str]
+    id: Optional[str]
+    type: Optional[str]
+    placeholder: Optional[str]
+
+
+def parse_forms(html):
+    """Soup with only the forms and labels of the page."""
+    require("html")
+    from bs4 import BeautifulSoup, SoupStrainer
+    return BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(["form", "label"]))
+
+
+def label_index(soup):
+    """``for`` attribute -> label text (lower case); the first label wins, like ``soup.find``."""
+    index = {}
+    for label in soup.find_all("label", attrs={"for": True}):
+        index.setdefault(label["for"], label.text.strip().lower())
+    return index
+
+
+def visible_fields(root):
+    """The fillable fields below ``root``, in document order."""
+    return [f for f in root.find_all(FIELD_TAGS) if (f.get("type") or "").lower() not in NON_FIELD_TYPES]
+
+
+def rank_forms(soup):
+    """Forms with visible fields, most visible fields first (document order on ties)."""
+    forms = [(form, len(visible_fields(form))) for form in soup.find_all("form")]
+    return [form for form, count in sorted(forms, key=lambda item: -item[1]) if count]
+
+
+def choose_form(soup):
+    """The form the extractors work on: the one with the most visible fields, or None."""
+    forms = rank_forms(soup)
+    return forms[0] if forms else None
+
+
+def _quoted(value):
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def css_selector(field):
+    """Selector for a field: #id, [id='...'] for ids that are no CSS identifier, else [name='...']."""
+    if field.get("id"):
+        if _CSS_IDENT_RE.fullmatch(field["id"]):
+            return f"#{field['id']}"
+        return f"[id={_quoted(field['id'])}]"
+    if field.get("name"):
+        return f"[name={_quoted(field['name'])}]"
+    return None
+
+
+@timed("regex.extract_form_fields")
+def extract_form_fields_regex(html) -> Optional[Dict[str, FieldInfo]]:
+    """Map the fields of the chosen form by name, id, placeholder, aria-label and label text."""
+    soup = parse_forms(html)
+    form = choose_form(soup)
+    if form is None:
+        return None
+    fields = visible_fields(form)
+
+    labels = label_index(soup)
+    mapping = {}
+    for field in fields:
+        attr_text = " ".join([
+            (field.get("name") or ""),
+            (field.get("id") or ""),
+            (field.get("placeholder") or ""),
+            (field.get("aria-label") or "")
+        ]).lower()
+        if field.get("id") in labels:
+            attr_text += " " + labels[field.get("id")]
+
+        info = FieldInfo(selector=css_selector(field), name=field.get("name"), id=field.get("id"),
+                         type=field.get("type"), placeholder=field.get("placeholder"))
+        type_key = TYPE_KEYS.get((field.get("type") or "").lower())
+        for key, pattern in PATTERNS.items():
+            if key in mapping:
+                continue
+            if pattern.search(attr_text) or key == type_key or (key == "message" and field.name == "textarea"):
+                mapping[key] = info
+
+    return mapping if mapping else None
+
+
+def selector_mapping(fields):
+    """``{key: FieldInfo}`` -> ``{key: selector}``; None stays None."""
+    if not fields:
+        return None
+    return {key: info["selector"] for key, info in fields.items()}
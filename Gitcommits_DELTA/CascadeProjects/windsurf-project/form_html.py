@@ -0,0 +1,143 @@
+"""Compact form HTML for the LLM field mapping.
+
+The extractors used to send the first 60,000 characters of the rendered
+page: mostly navigation, inline scripts and SVG icons, and a contact form
+near the footer was often cut off. ``compact_form_html(html)`` sends only
+what a field mapping needs:
+
+* the candidate forms (largest first), or, for fields outside a ``<form>``,
+  the surrounding block up to a size limit,
+* the ``<label for=...>`` elements and ``aria-labelledby`` targets outside
+  the form that describe its fields,
+* with scripts, styles, SVG, images and hidden inputs removed, only the
+  attributes selectors and labels are built from, layout wrappers unwrapped
+  and long texts (privacy notices) and option lists shortened.
+
+The result is typically 10-50x smaller than the page. Selectors written
+against it (#id, [name=...], form#id ...) still match the live page, since
+ids, names and the form element itself are kept.
+"""
+import copy
+import re
+
+from features import require
+from form_fields import rank_forms, visible_fields
+from metrics import LLM_HTML_CHARS
+
+MAX_CHARS = 12000        # cap on the compacted HTML (forms beyond it are dropped)
+MAX_TEXT = 160           # characters per text node
+MAX_OPTIONS = 8          # options per <select>
+MAX_BLOCK_TEXT = 1500    # text around fields outside a <form>
+
+# Never fillable and never needed to describe a field
+DROP_TAGS = ["script", "style", "noscript", "template", "svg", "img", "picture", "video",
+             "audio", "canvas", "iframe", "object", "link", "meta", "head"]
+# Kept as elements; everything else is unwrapped to its contents
+KEEP_TAGS = {"form", "input", "textarea", "select", "option", "optgroup", "label", "fieldset",
+             "legend", "button", "h1", "h2", "h3", "h4", "h5", "h6"}
+KEEP_ATTRS = {"id", "name", "type", "placeholder", "for", "aria-label", "aria-labelledby",
+              "autocomplete", "required", "title", "value", "action", "role"}
+# class is only kept where it may be the sole selector handle
+CLASS_TAGS = {"form", "input", "textarea", "select"}
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _candidates(soup):
+    """Forms with visible fields, largest first; else the blocks around the fields."""
+    forms = rank_forms(soup)
+    if forms:
+        return forms
+    # JS forms without a <form> element: the widest block around each field
+    # that is still small (labels and neighbouring fields, not the whole page)
+    groups = {}
+    for field in visible_fields(soup):
+        block = field
+        for parent in field.find_parents():
+            if parent.name in ("body", "html", "[document]") or len(parent.get_text()) > MAX_BLOCK_TEXT:
+                break
+            block = parent
+        groups[id(block)] = block
+    blocks = [b for b in groups.values() if not any(id(p) in groups for p in b.find_parents())]
+    return sorted(blocks, key=lambda b: len(visible_fields(b)), reverse=True)
+
+
+def _outside_labels(soup, root):
+    """Labels and aria-labelledby targets outside ``root`` that describe its fields."""
+    ids = {f.get("id") for f in visible_fields(root) if f.get("id")}
+    labelled_by = {part for f in visible_fields(root) for part in (f.get("aria-labelledby") or "").split()}
+    seen = set(map(id, root.find_all(True)))
+    found = []
+    for label in soup.find_all("label", attrs={"for": True}):
+        if label.get("for") in ids and id(label) not in seen:
+            found.append(label)
+            seen.add(id(label))
+    for target_id in labelled_by:
+        target = soup.find(id=target_id)
+        if target is not None and id(target) not in seen:
+            found.append(target)
+            seen.add(id(target))
+    return found
+
+
+def _clean(element):
+    """Strip an element (a copy) down to fields, labels, kept attributes and short texts."""
+    require("html")
+    from bs4 import Comment, NavigableString
+
+    for tag in element.find_all(DROP_TAGS):
+        tag.decompose()
+    for comment in element.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+    for field in element.find_all("input"):
+        if (field.get("type") or "").lower() == "hidden":
+            field.decompose()
+    for select in element.find_all("select"):
+        for option in select.find_all("option")[MAX_OPTIONS:]:
+            option.decompose()
+
+    for tag in [element, *element.find_all(True)]:
+        if tag.name not in KEEP_TAGS and tag is not element:
+            continue
+        attrs = {k: v for k, v in tag.attrs.items() if k in KEEP_ATTRS}
+        if tag.name in CLASS_TAGS and tag.get("class"):
+            attrs["class"] = tag["class"][:3]
+        if "value" in attrs and tag.name == "input" and (tag.get("type") or "text").lower() not in ("radio", "checkbox"):
+            del attrs["value"]  # prefilled text, not structure
+        tag.attrs = attrs
+    for tag in element.find_all(True):
+        if tag.name not in KEEP_TAGS:
+            tag.unwrap()
+
+    for text in element.find_all(string=True):
+        if not isinstance(text, NavigableString):
+            continue
+        compact = _SPACE_RE.sub(" ", text)
+        if len(compact) > MAX_TEXT:
+            compact = compact[:MAX_TEXT] + "…"
+        text.replace_with(compact)
+    return element
+
+
+def compact_form_html(html, max_chars=MAX_CHARS):
+    """The page's candidate forms and their labels as compact HTML.
+
+    Empty if the page has no fillable fields: there is nothing to ask the LLM.
+    """
+    require("html")
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    parts = []
+    size = 0
+    for root in _candidates(soup):
+        labels = _outside_labels(soup, root)
+        chunk = "".join(str(_clean(copy.copy(el))) for el in [*labels, root])
+        chunk = _SPACE_RE.sub(" ", chunk).replace("> <", "><").strip()
+        if parts and size + len(chunk) > max_chars:
+            break
+        parts.append(chunk)
+        size += len(chunk)
+    compact = "\n".join(parts)[:max_chars]
+    LLM_HTML_CHARS.inc(len(html), stage="page")
+    LLM_HTML_CHARS.inc(len(compact), stage="compact")
+    return compact
@@ -0,0 +1,82 @@
+"""Execution profiles for the Playwright form paths.
+
+"fast" waits only for conditions: the document is parsed (no waiting for
+images, fonts or beacons), a form (or input) is attached, and every
+click/fill relies on Playwright's own actionability checks (visible,
+enabled, stable). No slow-mo, no typing delay,
+no fixed sleeps, so a form takes as long as the page needs. Images, fonts,
+media and trackers are not loaded at all.
+
+"debug" is the visual mode for watching or stepping through a run:
+``slow_mo`` on every action, waiting for the full ``load`` event, keystroke
+delays and a pause after each page. It is the only profile in which
+``slow_mo`` can be set.
+
+``wait_until="networkidle"`` is used by neither: analytics beacons and
+long polling keep many sites from ever going idle.
+"""
+PROFILES = {
+    "fast": {
+        "slow_mo": 0,
+        "wait_until": "domcontentloaded",
+        "form_timeout": 10_000,    # ms until a form/input must be attached
+        "action_timeout": 10_000,  # ms per click/fill (Playwright's default is 30 s)
+        "navigation_timeout": 30_000,
+        "type_delay": 0,           # ms between keystrokes when fill() does not work
+        "watch_ms": 0,             # ms to keep a finished page visible
+        "block_resources": True,   # no images, fonts, media and trackers (resource_blocking)
+    },
+    "debug": {
+        "slow_mo": 200,
+        "wait_until": "load",
+        "form_timeout": 30_000,
+        "action_timeout": 30_000,
+        "navigation_timeout": 30_000,
+        "type_delay": 15,
+        "watch_ms": 1000,
+        "block_resources": False,  # show the page as a visitor sees it
+    },
+}
+DEFAULT_PROFILE = "fast"
+# Labels for the UI (plain strings for st.radio)
+PROFILE_LABELS = {"⚡ Schnell": "fast", "🐢 Debug (sichtbar, Slow Motion)": "debug"}
+
+# Something fillable is on the page
+FORM_SELECTOR = "form, textarea, input:not([type=hidden])"
+
+
+def get_profile(name=DEFAULT_PROFILE, slow_mo=None):
+    """Settings of a profile; ``slow_mo`` only overrides the debug profile."""
+    profile = dict(PROFILES[name], name=name)
+    if slow_mo is not None and name == "debug":
+        profile["slow_mo"] = slow_mo
+    return profile
+
+
+def wait_for_form(page, profile):
+    """Wait until something fillable is attached (sync API); False on timeout."""
+    try:
+        page.wait_for_selector(FORM_SELECTOR, state="attached", timeout=profile["form_timeout"])
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_form_async(page, profile):
+    """``wait_for_form`` for the async API."""
+    try:
+        await page.wait_for_selector(FORM_SELECTOR, state="attached", timeout=profile["form_timeout"])
+        return True
+    except Exception:
+        return False
+
+
+def launch_options(headless, profile):
+    """Browser launch options for the pool and the form runner."""
+    return {"headless": headless, "slow_mo": profile["slow_mo"]}
+
+
+def apply_timeouts(context, profile):
+    """Default timeouts of a new browser context (sync or async API, both are plain setters)."""
+    context.set_default_timeout(profile["action_timeout"])
+    context.set_default_navigation_timeout(profile["navigation_timeout"])
@@ -0,0 +1,202 @@
+"""Process many form URLs concurrently with async Playwright.
+
+``FormRunner.stream(urls, job)`` opens every URL in its own browser context
+and runs ``await job(page, url)`` on it, at most ``concurrency`` URLs at a
+time. A context is closed as soon as its URL is done, so memory stays
+bounded by the concurrency, not by the length of the list. Results are
+yielded in completion order while the other URLs are still running::
+
+    for url, result in get_form_runner().stream(urls, fill_form, concurrency=8):
+        show(url, result)   # result is the job's return value or its exception
+
+The event loop, the Playwright driver and the browser live on one
+background thread and are reused by later runs (and other sessions); the
+browser is relaunched if it died, the launch options changed, it served
+``MAX_CONTEXTS`` contexts or the browser processes exceed
+``browser_pool.MEMORY_CAP_MB``. Jobs must not call ``st.*``: they run on
+the loop thread, so they return what the UI should show.
+"""
+import asyncio
+import queue
+import threading
+
+from browser_pool import ENGINE, IDLE_SECONDS, MEMORY_CAP_MB, browser_memory_mb
+from features import require
+from form_profiles import apply_timeouts, get_profile, launch_options
+from resource_blocking import block_playwright_async
+from instrumentation import record, span
+from metrics import BROWSER_LAUNCHES, OPEN_BROWSERS, QUEUE_DEPTH
+
+CONCURRENCY = 8            # URLs (browser contexts) in flight per run
+MAX_CONCURRENCY = 16
+MAX_CONTEXTS = 500         # relaunch the browser between runs after this many contexts
+URL_TIMEOUT = 90           # seconds per URL, including the job
+_DONE = object()
+
+
+class FormRunner:
+    """One async Playwright browser on a background event loop, shared by all runs."""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._options = None
+        self._browser_lock = None   # asyncio.Lock, created on the loop
+        self._idle_handle = None
+        self.contexts = 0           # contexts since the last launch
+        self.active = 0             # contexts open right now
+        self.runs = 0               # runs holding the browser, from _get_browser to their end
+
+    # ----- loop thread -----
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="form-runner", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    async def _get_browser(self, options):
+        """Health check and recycling happen here, between runs.
+
+        The caller holds the browser (``self.runs``) until it calls ``_release``.
+        """
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._idle_handle is not None:
+                self._idle_handle.cancel()
+                self._idle_handle = None
+            reason = None
+            if self._browser is None:
+                reason = "cold"
+            elif not self._browser.is_connected():
+                reason = "unhealthy"
+            elif self._options != options:
+                reason = "options"
+            elif self.runs == 0:
+                memory = browser_memory_mb()
+                if self.contexts >= MAX_CONTEXTS or (memory is not None and memory > MEMORY_CAP_MB):
+                    reason = "recycle"
+            if reason is None:
+                self.runs += 1
+                return self._browser
+            while reason == "options" and self.runs:
+                # A run with other launch options is in progress; wait for it
+                await asyncio.sleep(0.2)
+            await self._close_browser()
+            if self._playwright is None:
+                require("playwright")
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            with span("browser.launch"):
+                self._browser = await getattr(self._playwright, ENGINE).launch(**options)
+            self._options = options
+            self.contexts = 0
+            OPEN_BROWSERS.inc(engine=ENGINE)
+            BROWSER_LAUNCHES.inc(reason=reason)
+            self.runs += 1
+            return self._browser
+
+    async def _close_browser(self):
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception:
+            pass  # already crashed
+        OPEN_BROWSERS.dec(engine=ENGINE)
+
+    def _release(self):
+        """End of a run: close the browser after ``IDLE_SECONDS`` if no other run holds it."""
+        self.runs -= 1
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if self.runs == 0 and self._browser is not None:
+            self._idle_handle = self._loop.call_later(
+                IDLE_SECONDS, lambda: asyncio.ensure_future(self._close_idle()))
+
+    async def _close_idle(self):
+        async with self._browser_lock:
+            if self.runs == 0 and self.active == 0:
+                await self._close_browser()
+
+    async def _run_one(self, browser, profile, semaphore, url, job, results):
+        async with semaphore:
+            self.active += 1
+            self.contexts += 1
+            context = None
+            start = asyncio.get_running_loop().time()
+            try:
+                context = await browser.new_context()
+                apply_timeouts(context, profile)
+                if profile["block_resources"]:
+                    await block_playwright_async(context)
+                page = await context.new_page()
+                result = await asyncio.wait_for(job(page, url), URL_TIMEOUT)
+            except Exception as e:  # reported per URL, the other URLs go on
+                result = e
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                self.active -= 1
+            duration = asyncio.get_running_loop().time() - start
+            record("browser.form_url", int(duration * 1e9), error=isinstance(result, Exception))
+            results.put((url, result))
+
+    async def _run_all(self, urls, job, profile, options, concurrency, results):
+        browser = None
+        try:
+            browser = await self._get_browser(options)
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(self._run_one(browser, profile, semaphore, url, job, results) for url in urls))
+        except Exception as e:
+            results.put((None, e))  # e.g. Playwright missing or the launch failed
+        finally:
+            if browser is not None:
+                self._release()
+            results.put(_DONE)
+
+    # ----- caller side (Streamlit script thread) -----
+    def stream(self, urls, job, concurrency=CONCURRENCY, headless=True, profile=None):
+        """Yield ``(url, result)`` for each URL as it finishes.
+
+        ``result`` is the job's return value or the exception it raised. A
+        failure before any URL started is raised here. ``profile`` is a
+        ``form_profiles.get_profile()`` dict (fast by default).
+        """
+        urls = list(urls)
+        results = queue.Queue()
+        profile = profile or get_profile()
+        options = launch_options(headless, profile)
+        concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_all(urls, job, profile, options, concurrency, results), self._ensure_loop())
+        remaining = len(urls)
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                url, result = item
+                if url is None:
+                    raise result
+                remaining -= 1
+                QUEUE_DEPTH.set(remaining, queue="form_runner")
+                yield url, result
+        finally:
+            # Also reached when the script is stopped by a rerun: drop the rest
+            future.cancel()
+            QUEUE_DEPTH.set(0, queue="form_runner")
+
+    def status(self):
+        return {"browser": self._browser is not None, "laeufe": self.runs, "offene_kontexte": self.active,
+                "kontexte": self.contexts, "optionen": str(self._options or "")}
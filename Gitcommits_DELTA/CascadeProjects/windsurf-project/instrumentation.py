@@ -0,0 +1,151 @@
+"""Lightweight per-stage timing.
+
+Wrap a stage in ``with span("fetch.save_website"):`` or decorate a function
+with ``@timed("parse.generic_scrape")``. Durations are measured with
+``time.perf_counter_ns`` and aggregated into process-wide histograms, so the
+numbers survive Streamlit reruns. The part of a span name before the first
+dot is its stage (fetch, parse, regex, llm, browser, ...).
+"""
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts are built on export)."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.errors = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+
+    def observe(self, duration_ns, error=False):
+        seconds = duration_ns / 1e9
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.sum_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Approximate quantile in seconds (linear interpolation inside the bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(BUCKETS, self.buckets):
+            if n and seen + n >= rank:
+                upper = bound if bound != math.inf else self.max_ns / 1e9
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return self.max_ns / 1e9
+
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+def record(name, duration_ns, error=False):
+    """Add one observation for ``name``."""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(duration_ns, error)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block; exceptions are counted as errors and re-raised."""
+    start = time.perf_counter_ns()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter_ns() - start, error)
+
+
+def timed(name):
+    """Decorator form of :func:`span`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def histograms():
+    """Copy of all histograms as ``{name: Histogram}``."""
+    with _lock:
+        copies = {}
+        for name, hist in _histograms.items():
+            copy = Histogram()
+            copy.buckets = list(hist.buckets)
+            copy.count, copy.errors, copy.sum_ns, copy.max_ns = hist.count, hist.errors, hist.sum_ns, hist.max_ns
+            copies[name] = copy
+        return copies
+
+
+def snapshot():
+    """One summary row per span, slowest total first."""
+    rows = []
+    for name, hist in histograms().items():
+        rows.append({
+            "stage": name.split(".", 1)[0],
+            "span": name,
+            "count": hist.count,
+            "errors": hist.errors,
+            "total_s": round(hist.sum_ns / 1e9, 3),
+            "mean_ms": round(hist.sum_ns / hist.count / 1e6, 2) if hist.count else 0.0,
+            "p50_ms": round(hist.quantile(0.5) * 1000, 2),
+            "p90_ms": round(hist.quantile(0.9) * 1000, 2),
+            "p99_ms": round(hist.quantile(0.99) * 1000, 2),
+            "max_ms": round(hist.max_ns / 1e6, 2),
+        })
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def render_diagnostics():
+    """Streamlit expander with the aggregated span timings."""
+    import streamlit as st
+
+    with st.expander("🩺 Diagnose: Laufzeit pro Stufe"):
+        rows = snapshot()
+        if not rows:
+            st.info("Noch keine Messwerte - führen Sie zuerst eine Aktion aus.")
+            return
+
+        # The chart imports altair (~0.4 s), so it is only drawn on request
+        if st.checkbox("Diagramm pro Stufe", key="diagnostics_chart"):
+            stages = {}
+            for row in rows:
+                stages[row["stage"]] = stages.get(row["stage"], 0.0) + row["total_s"]
+            st.bar_chart({"Sekunden": stages})
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        if st.button("Messwerte zurücksetzen", key="diagnostics_reset"):
+            reset()
+            st.rerun()
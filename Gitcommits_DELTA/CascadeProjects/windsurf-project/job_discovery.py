@@ -0,0 +1,248 @@
+"""Sitemap and robots.txt driven discovery of job URLs.
+
+Career sites and job portals usually publish a ``sitemap.xml`` (often gzipped,
+often a sitemap index) listing every job URL with its ``lastmod``. robots.txt is
+cached per host, sitemaps are streamed instead of parsed into a DOM, and only
+new or changed job URLs are returned.
+"""
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# URLs, die nach einer Stellenanzeige aussehen
+DEFAULT_JOB_URL_PATTERN = r"(job|jobs|stelle|stellen|karriere|career|vacanc|ausbildung)"
+
+ROBOTS_TTL_SECONDS = 6 * 60 * 60
+MAX_SITEMAP_DEPTH = 3
+MAX_SITEMAPS = 200
+
+DATA_DIR = Path("data")
+STATE_FILE = DATA_DIR / "sitemap_state.json"
+
+# host -> (fetched_at, RobotFileParser)
+_robots_cache = {}
+
+
+def _host_root(url):
+    parts = urlparse(url if "://" in url else "https://" + url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_robots(site_url, ttl=ROBOTS_TTL_SECONDS):
+    """Return a parsed robots.txt for the site, cached per host for ``ttl`` seconds."""
+    root = _host_root(site_url)
+    cached = _robots_cache.get(root)
+    if cached and time.time() - cached[0] < ttl:
+        return cached[1]
+
+    parser = RobotFileParser(root + "/robots.txt")
+    try:
+        r = requests.get(root + "/robots.txt", headers={"User-Agent": USER_AGENT}, timeout=10)
+        if r.status_code in (401, 403):
+            parser.disallow_all = True
+        elif r.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(r.text.splitlines())
+    except requests.RequestException:
+        parser.allow_all = True
+
+    _robots_cache[root] = (time.time(), parser)
+    return parser
+
+
+def sitemap_urls_for(site_url):
+    """Sitemaps announced in robots.txt, falling back to /sitemap.xml."""
+    robots = get_robots(site_url)
+    sitemaps = robots.site_maps() or []
+    return sitemaps or [_host_root(site_url) + "/sitemap.xml"]
+
+
+def parse_lastmod(value):
+    """Parse a W3C datetime (``2024-05-01`` or ``2024-05-01T10:00:00Z``) into an aware datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def load_state():
+    if STATE_FILE.exists():
+        try:
+            return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+    return {"urls": {}, "sitemaps": {}}
+
+
+def save_state(state):
+    try:
+        DATA_DIR.mkdir(exist_ok=True)
+        STATE_FILE.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    except Exception:
+        pass
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _decompressed(chunks):
+    """Yield chunks, inflating them on the fly if they are gzip data.
+
+    Decided by the gzip magic bytes, not the ``.gz`` suffix: requests already
+    undoes ``Content-Encoding: gzip``, and some ``.xml.gz`` URLs serve plain XML.
+    """
+    inflater = None
+    head = b""       # until the first two bytes are known
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if head is not None:
+            head += chunk
+            if len(head) < 2:
+                continue
+            chunk, head = head, None
+            if chunk[:2] == b"\x1f\x8b":
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        yield inflater.decompress(chunk) if inflater else chunk
+    if head:
+        yield head
+    if inflater:
+        yield inflater.flush()
+
+
+def iter_sitemap(chunks):
+    """Stream ``(kind, loc, lastmod)`` entries from sitemap bytes without building a DOM.
+
+    ``kind`` is ``"sitemap"`` for entries of a sitemap index and ``"url"`` for
+    entries of a urlset.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    loc = lastmod = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            tag = _local(elem.tag)
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+            elif tag == "lastmod":
+                lastmod = (elem.text or "").strip()
+            elif tag in ("url", "sitemap"):
+                if loc:
+                    yield tag, loc, lastmod
+                loc = lastmod = None
+                elem.clear()
+    parser.close()
+
+
+def _open_sitemap(url, cache_entry):
+    """GET a sitemap with conditional headers; returns (response or None if unchanged, byte chunks)."""
+    headers = {"User-Agent": USER_AGENT}
+    if cache_entry.get("etag"):
+        headers["If-None-Match"] = cache_entry["etag"]
+    if cache_entry.get("last_modified"):
+        headers["If-Modified-Since"] = cache_entry["last_modified"]
+
+    r = requests.get(url, headers=headers, timeout=20, stream=True)
+    if r.status_code == 304:
+        r.close()
+        return None, None
+    r.raise_for_status()
+    return r, _decompressed(r.iter_content(64 * 1024))
+
+
+def discover_job_urls(site_url, url_pattern=DEFAULT_JOB_URL_PATTERN, since=None, state=None, respect_robots=True):
+    """Find new or changed job URLs for a site via its sitemaps.
+
+    Only entries whose URL matches ``url_pattern``, whose ``lastmod`` is newer
+    than ``since`` (if given) and that were not already queued with the same
+    ``lastmod`` are returned. Entries older than ``since`` count as seen. The
+    seen-state and the sitemap validators (ETag/Last-Modified, per pattern) are
+    persisted, so the next run only downloads and yields what changed.
+    """
+    own_state = state is None
+    if own_state:
+        state = load_state()
+    seen_urls = state.setdefault("urls", {})
+    sitemap_cache = state.setdefault("sitemaps", {}).setdefault(url_pattern or "*", {})
+
+    pattern = re.compile(url_pattern, re.IGNORECASE) if url_pattern else None
+    robots = get_robots(site_url) if respect_robots else None
+
+    queue = [(sm, 0) for sm in sitemap_urls_for(site_url)]
+    visited = set()
+    found = []
+
+    while queue and len(visited) < MAX_SITEMAPS:
+        sm_url, depth = queue.pop(0)
+        if sm_url in visited:
+            continue
+        visited.add(sm_url)
+
+        entry = sitemap_cache.setdefault(sm_url, {})
+        try:
+            r, chunks = _open_sitemap(sm_url, entry)
+        except (requests.RequestException, OSError):
+            continue
+
+        if r is None:
+            # Unverändert: Indizes trotzdem über die gemerkten Kinder expandieren
+            if depth < MAX_SITEMAP_DEPTH:
+                queue.extend((child, depth + 1) for child in entry.get("children", []))
+            continue
+
+        children = []
+        complete = True
+        try:
+            for kind, loc, lastmod in iter_sitemap(chunks):
+                if kind == "sitemap":
+                    children.append(urljoin(sm_url, loc))
+                    continue
+                if pattern and not pattern.search(loc):
+                    continue
+                if seen_urls.get(loc, False) == (lastmod or ""):
+                    continue
+                if robots and not robots.can_fetch(USER_AGENT, loc):
+                    continue
+                seen_urls[loc] = lastmod or ""
+                modified = parse_lastmod(lastmod)
+                if since and modified and modified < since:
+                    continue
+                found.append({"url": loc, "lastmod": lastmod})
+        except (ET.ParseError, requests.RequestException, OSError, EOFError, zlib.error):
+            complete = False
+        finally:
+            r.close()
+
+        # Validators only for fully read sitemaps, otherwise a 304 would hide the rest
+        entry["etag"] = r.headers.get("ETag") if complete else None
+        entry["last_modified"] = r.headers.get("Last-Modified") if complete else None
+        entry["children"] = children
+        if depth < MAX_SITEMAP_DEPTH:
+            queue.extend((child, depth + 1) for child in children)
+
+    if own_state:
+        save_state(state)
+    return found
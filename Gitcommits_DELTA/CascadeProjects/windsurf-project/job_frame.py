@@ -0,0 +1,98 @@
+"""Job table with normalised locations for the radius search.
+
+``get_job_frame`` keeps one ``JobFrame`` per session that only converts the
+rows added to ``st.session_state.jobs`` since the last rerun. Locations are
+normalised to PLZ/Ort and a centroid at ingest (see ``plz_index``), so radius
+queries never re-parse the free text; their results are memoized until the
+job list changes.
+"""
+import pandas as pd
+
+from plz_index import get_index, haversine_km, normalize_location
+
+JOB_COLUMNS = ['title', 'company', 'location', 'phone', 'url', 'scraped_at']
+GEO_COLUMNS = ['plz', 'ort', 'geo_key', 'lat', 'lon']
+KEYWORD = 'anlagenmechaniker'
+
+
+def _to_frame(records):
+    """Convert raw job dicts into the frame with normalised location columns."""
+    df = pd.DataFrame.from_records(records)
+    for col in JOB_COLUMNS:
+        if col not in df.columns:
+            df[col] = 'N/A'
+    df = df[JOB_COLUMNS + [c for c in df.columns if c not in JOB_COLUMNS]]
+
+    df['location'] = df['location'].fillna('N/A').astype(str)
+
+    # Each distinct location string is normalised only once
+    codes, uniques = pd.factorize(df['location'])
+    geo = pd.DataFrame([normalize_location(loc) or (None,) * 5 for loc in uniques], columns=GEO_COLUMNS)
+    geo = geo.iloc[codes].reset_index(drop=True)
+    df['plz'] = geo['plz'].fillna('N/A')
+    df['ort'] = geo['ort'].fillna('N/A')
+    df['geo_key'] = geo['geo_key'].astype('category')
+    df['lat'] = geo['lat'].astype(float)
+    df['lon'] = geo['lon'].astype(float)
+    return df
+
+
+class JobFrame:
+    """Incrementally synced view of a session's job list."""
+
+    def __init__(self):
+        self.df = _to_frame([])
+        self.synced_rows = 0
+        self.last_row = None
+        self._cache = {}
+
+    def sync(self, jobs):
+        """Bring the frame up to date; only rows added since the last sync are converted."""
+        if len(jobs) == self.synced_rows and (not jobs or jobs[-1] is self.last_row):
+            return self
+        if len(jobs) < self.synced_rows or (self.synced_rows and jobs[self.synced_rows - 1] is not self.last_row):
+            # List was replaced or cleared - start over
+            self.__init__()
+        new_rows = jobs[self.synced_rows:]
+        if new_rows:
+            new = _to_frame(new_rows)
+        if new_rows and not self.synced_rows:
+            self.df = new
+        elif new_rows:
+            geo_key = pd.api.types.union_categoricals([self.df['geo_key'], new['geo_key']], ignore_order=True)
+            self.df = pd.concat([self.df, new], ignore_index=True)
+            self.df['geo_key'] = geo_key
+        self.synced_rows = len(jobs)
+        self.last_row = jobs[-1] if jobs else None
+        self._cache.clear()
+        return self
+
+    def _memo(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def within(self, center, radius_km, only_anlagen=False):
+        """Jobs within ``radius_km`` of a PLZ or Ort, nearest first; None if the center is unknown."""
+        loc = normalize_location(center.strip())
+        if loc is None:
+            return None
+        lat, lon = loc[3], loc[4]
+
+        def build():
+            keys, _ = get_index().within(lat, lon, radius_km)
+            base = self.df
+            if only_anlagen:
+                base = base[base['title'].str.contains(KEYWORD, case=False, na=False)]
+            hits = base[base['geo_key'].isin(keys)]
+            distance = haversine_km(lat, lon, hits['lat'].to_numpy(), hits['lon'].to_numpy())
+            return hits.assign(distance_km=distance.round(1)).sort_values('distance_km', kind='stable')
+
+        return self._memo(('within', loc[2], radius_km, only_anlagen), build)
+
+
+def get_job_frame(session_state):
+    """The session's JobFrame, synced to the current job list."""
+    if 'job_frame' not in session_state:
+        session_state.job_frame = JobFrame()
+    return session_state.job_frame.sync(session_state.get('jobs', []))
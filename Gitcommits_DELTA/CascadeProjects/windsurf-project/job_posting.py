@@ -0,0 +1,189 @@
+"""schema.org JobPosting fast path (JSON-LD and Microdata).
+
+Most German job pages embed a ``JobPosting`` object. Only those blocks are
+read here - no BeautifulSoup tree is built for the page - and mapped into the
+job record used by ``JobScraper``.
+"""
+import json
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+
+LD_JSON_RE = re.compile(
+    r"<script[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+MICRODATA_RE = re.compile(r"itemtype\s*=\s*[\"']?https?://schema\.org/JobPosting", re.IGNORECASE)
+
+
+def _iter_objects(data):
+    """Walk nested JSON-LD (lists, @graph) and yield every dict."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_objects(data["@graph"])
+
+
+def _is_job_posting(obj):
+    types = obj.get("@type")
+    if isinstance(types, list):
+        return "JobPosting" in types
+    return types == "JobPosting"
+
+
+def _name(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        return value.get("name") or value.get("legalName")
+    return value
+
+
+def _location(value):
+    """Format jobLocation as 'PLZ Ort' (first location if several)."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, dict):
+        return value
+    address = value.get("address", value)
+    if isinstance(address, str):
+        return address
+    if not isinstance(address, dict):
+        return None
+    parts = [address.get("postalCode"), address.get("addressLocality") or address.get("addressRegion")]
+    text = " ".join(str(p).strip() for p in parts if p)
+    return text or address.get("streetAddress")
+
+
+def _clean(value):
+    if value is None:
+        return "N/A"
+    value = re.sub(r"\s+", " ", str(value)).strip()
+    return value or "N/A"
+
+
+def map_job_posting(obj, url):
+    """Map a JobPosting dict onto the job record shape used by JobScraper."""
+    org = obj.get("hiringOrganization")
+    contact = obj.get("applicationContact")
+    phone = None
+    if isinstance(contact, dict):
+        phone = contact.get("telephone")
+    if not phone and isinstance(org, dict):
+        phone = org.get("telephone")
+
+    location = _location(obj.get("jobLocation"))
+    if not location and obj.get("jobLocationType") == "TELECOMMUTE":
+        location = "Remote"
+
+    return {
+        'title': _clean(obj.get("title") or obj.get("name")),
+        'company': _clean(_name(org)),
+        'location': _clean(location),
+        'phone': _clean(phone),
+        'url': obj.get("url") if isinstance(obj.get("url"), str) else url,
+        'date_posted': _clean(obj.get("datePosted")),
+        'valid_through': _clean(obj.get("validThrough")),
+        'scraped_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def extract_ld_json(html):
+    """Return all JobPosting dicts from the page's ld+json blocks."""
+    postings = []
+    for block in LD_JSON_RE.findall(html):
+        try:
+            data = json.loads(block.strip(), strict=False)
+        except ValueError:
+            continue
+        postings.extend(obj for obj in _iter_objects(data) if _is_job_posting(obj))
+    return postings
+
+
+class _MicrodataParser(HTMLParser):
+    """Collect itemprop values inside a JobPosting itemscope.
+
+    Nested scopes are flattened into dicts, e.g. ``hiringOrganization`` becomes
+    ``{"name": ...}`` so that map_job_posting can treat it like JSON-LD.
+    """
+
+    VOID = {"meta", "link", "img", "br", "hr", "input", "source"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.postings = []
+        self._scopes = []   # [(depth, prop, dict)]
+        self._text = []     # [(depth, prop, [chunks])]
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        prop = attrs.get("itemprop")
+        itemtype = attrs.get("itemtype") or ""
+
+        if "itemscope" in attrs and (self._scopes or itemtype.endswith("JobPosting")):
+            scope = {"@type": itemtype.rsplit("/", 1)[-1]}
+            self._scopes.append((self._depth, prop, scope))
+        elif prop and self._scopes:
+            value = attrs.get("content") or attrs.get("datetime")
+            if value is None and tag in ("link", "a"):
+                value = attrs.get("href")
+            if value is not None:
+                self._scopes[-1][2].setdefault(prop, value)
+            elif tag not in self.VOID:
+                self._text.append((self._depth, prop, []))
+
+        if tag not in self.VOID:
+            self._depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID:
+            self._depth -= 1
+
+    def handle_data(self, data):
+        for _, _, chunks in self._text:
+            chunks.append(data)
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID:
+            return
+        self._depth -= 1
+        while self._text and self._text[-1][0] >= self._depth:
+            _, prop, chunks = self._text.pop()
+            if self._scopes:
+                self._scopes[-1][2].setdefault(prop, "".join(chunks))
+        while self._scopes and self._scopes[-1][0] >= self._depth:
+            _, prop, scope = self._scopes.pop()
+            if self._scopes and prop:
+                self._scopes[-1][2].setdefault(prop, scope)
+            elif not self._scopes:
+                self.postings.append(scope)
+
+
+def extract_microdata(html):
+    """Return JobPosting dicts from Microdata, parsing only from the first JobPosting scope on."""
+    m = MICRODATA_RE.search(html)
+    if not m:
+        return []
+    start = html.rfind("<", 0, m.start())
+    parser = _MicrodataParser()
+    try:
+        parser.feed(html[start:])
+        parser.close()
+    except Exception:
+        pass
+    return [p for p in parser.postings if p.get("@type") == "JobPosting"]
+
+
+def extract_job_postings(html, url):
+    """Job records from structured JobPosting data, or [] if the page has none."""
+    if not html:
+        return []
+    postings = extract_ld_json(html) if "ld+json" in html else []
+    if not postings:
+        postings = extract_microdata(html)
+    return [map_job_posting(p, url) for p in postings]
@@ -1,36 +1,23 @@
 import streamlit as st
-from playwright.sync_api import sync_playwright, TimeoutError
-from bs4 import BeautifulSoup
-import requests, json, re, os
+import asyncio, json, re, os
 
 
 # ===== OpenAI integration =====
-import os
-from dotenv import load_dotenv
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# .env is read and the LLM gateway created once per process, not on every rerun;
+# the browser is kept running between runs by the form runner
+from resources import get_llm_gateway, get_http_session, get_form_runner, get_form_cache
+from form_runner import CONCURRENCY, MAX_CONCURRENCY
+from form_profiles import PROFILE_LABELS, get_profile, wait_for_form_async
+from form_html import compact_form_html
+from form_fields import extract_form_fields_regex, selector_mapping
+from form_cache import parse as parse_html
+from field_classifier import confident_mapping, log_examples
 
 
-# Detect and support both new and legacy OpenAI SDKs
-client_new = None
-client_legacy = None
-openai_mode = None   # "new" or "legacy" or None
-
-
-try:
-    # New SDK (>=1.0): from openai import OpenAI
-    from openai import OpenAI
-    client_new = OpenAI(api_key=OPENAI_API_KEY)
-    openai_mode = "new"
-except Exception:
-    try:
-        # Legacy SDK (<1.0): import openai and set api_key
-        import openai as openai_legacy
-        openai_legacy.api_key = OPENAI_API_KEY
-        client_legacy = openai_legacy
-        openai_mode = "legacy"
-    except Exception:
-        openai_mode = None
+llm = get_llm_gateway()   # llm.mode: "new" or "legacy" or None
+# Resolved here: analyze_page runs outside the script thread
+http = get_http_session()
+form_cache = get_form_cache()
 
 
 st.set_page_config(page_title="Auto Bewerbungs Scanner", layout="centered")
@@ -68,6 +55,9 @@ message = st.text_area(
 
 use_ai = st.checkbox("🤖 KI zur Felderkennung verwenden", value=True)
 show_debug = st.checkbox("🛠️ Debug-Ausgaben anzeigen", value=True)
+show_browser = st.checkbox("👀 Browser anzeigen", value=False)
+profile = get_profile(PROFILE_LABELS[st.radio("Ausführung", list(PROFILE_LABELS), horizontal=True)])
+concurrency = st.slider("⚡ Parallele Seiten", 1, MAX_CONCURRENCY, CONCURRENCY)
 run = st.button("🔍 Webseiten analysieren (ohne Absenden)")
 
 
@@ -92,104 +82,38 @@ def normalize_selector_value(v):
     return None
 
 
-# --- Heuristic (Regex) extractor extended
-def extract_form_fields_regex(html):
-    soup = BeautifulSoup(html, "html.parser")
-    forms = soup.find_all("form")
-    if not forms:
-        return None
-
-
-    # Pick the largest form
-    form = max(forms, key=lambda f: len(f.find_all(["input", "textarea", "select"])))
-
-
-    mapping = {}
-
-
-    def selector(inp):
-        if inp.get("id"): return f"#{inp.get('id')}"
-        if inp.get("name"): return f"[name='{inp.get('name')}']"
-        return None
-
-
-    for inp in form.find_all(["input", "textarea", "select"]):
-        attr_text = " ".join([
-            (inp.get("name") or ""),
-            (inp.get("id") or ""),
-            (inp.get("placeholder") or ""),
-            (inp.get("aria-label") or "")
-        ]).lower()
-
-
-        if inp.get("id"):
-            label_tag = soup.find("label", {"for": inp.get("id")})
-            if label_tag:
-                attr_text += " " + label_tag.text.strip().lower()
-
-
-        sel = selector(inp)
-
-
-        # Name fields
-        if re.search(r"(full.?name|your.?name|contact.?name|^name$|\bname\b)", attr_text):
-            mapping.setdefault("name", sel)
-        if re.search(r"(vorname|first.?name|given.?name|\bfname\b)", attr_text):
-            mapping.setdefault("first_name", sel)
-        if re.search(r"(nachname|last.?name|family.?name|\blname\b|surname)", attr_text):
-            mapping.setdefault("last_name", sel)
-
-
-        # Email
-        if re.search(r"(mail|e.?mail)", attr_text) or (inp.get("type") or "").lower() == "email":
-            mapping.setdefault("email", sel)
-
-
-        # Phone
-        if re.search(r"(telefon|handy|mobil|phone|tel|telephone|phone.?number)", attr_text) or (inp.get("type") or "").lower() == "tel":
-            mapping.setdefault("phone", sel)
-
-
-        # Street (address line)
-        if re.search(r"(stra(ss|ß)e|street|address(\s*line)?\s*1|hausnummer|addr1)", attr_text):
-            mapping.setdefault("street", sel)
-
-
-        # ZIP/PLZ
-        if re.search(r"(plz|zip|postal.?code|post.?code)", attr_text):
-            mapping.setdefault("zip", sel)
-
-
-        # City
-        if re.search(r"(ort|stadt|city|locality|town)", attr_text):
-            mapping.setdefault("city", sel)
-
-
-        # Message
-        if re.search(r"(nachricht|message|bemerkung|kommentar|anschreiben|cover.?letter|motivation|inquiry|comments|text)", attr_text) or inp.name == "textarea":
-            mapping.setdefault("message", sel)
-
-
-    return mapping if mapping else None
-
-
 # --- AI extractor (German system prompt, extended keys)
-def ai_extract_form_fields(html):
-    if openai_mode is None:
+async def ai_extract_form_fields(html, url, log):
+    # A form mapped before (same domain, same field structure) skips the LLM;
+    # parsing is CPU work, so it runs off the event loop like the request itself
+    cached, cache_key = await asyncio.to_thread(form_cache.lookup, url, html)
+    if cached:
+        log("info", "Feldzuordnung aus dem Cache.")
+        return cached
+
+    # Local classifier first: the LLM is only asked when it is unsure
+    local = await asyncio.to_thread(lambda: confident_mapping(parse_html(html)))
+    if local:
+        log("info", "Feldzuordnung vom lokalen Klassifikator.")
+        return local
+
+    if not llm.available:
         return None
 
 
-    max_chars = 60000
-    html_snippet = html[:max_chars] if len(html) > max_chars else html
+    # Only the forms and their labels, not the first 60,000 characters of the page
+    html_snippet = await asyncio.to_thread(compact_form_html, html)
+    if not html_snippet:
+        return None  # no fillable fields
 
 
     system_prompt = (
-        "Du bist ein Experte für Web-Formulare. Du erhältst das GERENDERTE HTML einer Seite und sollst die besten Felder "
+        "Du bist ein Experte für Web-Formulare. Du erhältst die Formulare einer gerenderten Seite (gekürztes HTML: nur Formulare, Labels und Felder) und sollst die besten Felder "
         "(input/textarea/select) für folgende Zwecke identifizieren: first_name, last_name, name, email, phone, street, zip, city, message.\n\n"
         "Ziel: Liefere AUSSCHLIESSLICH ein JSON-Objekt mit GENAU diesen Schlüsseln. Jeder Wert ist entweder ein CSS-Selektor (String) oder null.\n\n"
         "Suche gründlich in: id, name, placeholder, aria-label, type, <label for=...>-Texten und nahen Überschriften. IDs/Namen sind oft englisch/zusammengesetzt "
         "(z. B. text-name, your_name, first_name, last_name, email_address, phone_number, locality, town, street, address_line1, zip, postal_code, message, comments).\n"
-        "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child ohne Not. "
+        "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child/:nth-of-type und keine >-Kombinatoren (die Struktur ist gekürzt). "
         "Nur sichtbare, interaktive Felder.\n"
         "Feldlogik (de+en): first_name (vorname/given_name), last_name (nachname/family_name/surname), name (fullname), email, phone, street (straße/strasse/address/address_line1/hausnummer), "
         "zip (plz/zip/postal_code), city (ort/stadt/locality/town), message (textarea bevorzugt).\n"
@@ -199,29 +123,16 @@ def ai_extract_form_fields(html):
 
 
     try:
-        if openai_mode == "new":
-            completion = client_new.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0,
-                response_format={"type": "json_object"}
-            )
-            content = completion.choices[0].message.content.strip()
-        else:
-            resp = client_legacy.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0
-            )
-            content = resp.choices[0].message["content"].strip()
-            m = re.search(r"\{[\s\S]*\}", content)
-            content = m.group(0) if m else content
+        # Rate-limited and retried by the gateway; the other pages keep going meanwhile
+        content = await llm.acomplete(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            model="gpt-4o-mini",
+            json_mode=True,
+            temperature=0
+        )
 
 
         mapping = json.loads(content)
@@ -229,82 +140,81 @@ def ai_extract_form_fields(html):
             mapping[k] = normalize_selector_value(mapping.get(k))
         if not any(mapping.values()):
             return None
+        selectors = {k: v for k, v in mapping.items() if v}
+        await asyncio.to_thread(form_cache.store, cache_key, selectors)
+        await asyncio.to_thread(log_examples, url, html, selectors)  # training data for the local classifier
         return mapping
     except Exception as e:
-        if show_debug:
-            st.warning(f"KI-Extraktion fehlgeschlagen: {e}")
+        log("warning", f"KI-Extraktion fehlgeschlagen: {e}")
         return None
 
 
 # --- Locator helpers
-def find_locator_in_page_or_iframes(page, selector):
+async def find_locator_in_page_or_iframes(page, selector):
     try:
         loc = page.locator(selector)
-        if loc.count() > 0:
+        if await loc.count() > 0:
             return loc.first, page
     except Exception:
         pass
     for frame in page.frames:
         try:
             loc = frame.locator(selector)
-            if loc.count() > 0:
+            if await loc.count() > 0:
                 return loc.first, frame
         except Exception:
             continue
     return None, None
 
 
-def try_fill_by_selector(page, selector, value, field_name, debug=False):
-    loc, container = find_locator_in_page_or_iframes(page, selector)
+async def try_fill_by_selector(page, selector, value, field_name, log, type_delay=0):
+    from playwright.async_api import TimeoutError  # loaded by the form runner already
+    loc, container = await find_locator_in_page_or_iframes(page, selector)
     if not loc:
-        if debug:
-            st.error(f"[{field_name}] Selektor nicht gefunden: {selector}")
+        log("error", f"[{field_name}] Selektor nicht gefunden: {selector}")
         return False
     try:
         try:
-            (container or page).wait_for_selector(selector, state="visible", timeout=3000)
+            await (container or page).wait_for_selector(selector, state="visible", timeout=3000)
         except TimeoutError:
             pass
-        loc.scroll_into_view_if_needed()
+        await loc.scroll_into_view_if_needed()
         tag = None
         try:
-            tag = loc.evaluate("el => el.tagName.toLowerCase()")
+            tag = await loc.evaluate("el => el.tagName.toLowerCase()")
         except Exception:
             tag = None
 
 
         if tag == "select":
             try:
-                loc.select_option(label=value)
+                await loc.select_option(label=value)
             except Exception:
                 try:
-                    options = loc.evaluate("el => Array.from(el.options).map(o => ({value:o.value, label:o.label}))")
+                    options = await loc.evaluate("el => Array.from(el.options).map(o => ({value:o.value, label:o.label}))")
                     if options and len(options) > 0:
-                        loc.select_option(options[0]["value"])
+                        await loc.select_option(options[0]["value"])
                 except Exception:
                     pass
         else:
             try:
-                loc.fill(value)
+                await loc.fill(value)
             except Exception:
                 try:
-                    loc.click()
-                    loc.type(value, delay=15)
+                    await loc.click()
+                    await loc.type(value, delay=type_delay)
                 except Exception:
-                    if debug:
-                        st.error(f"[{field_name}] Konnte nicht füllen: {selector}")
+                    log("error", f"[{field_name}] Konnte nicht füllen: {selector}")
                     return False
-        if debug:
-            st.success(f"[{field_name}] Gefüllt mit Selektor: {selector}")
+        log("success", f"[{field_name}] Gefüllt mit Selektor: {selector}")
         return True
     except Exception as e:
-        if debug:
-            st.error(f"[{field_name}] Fehler beim Füllen: {selector} -> {e}")
+        log("error", f"[{field_name}] Fehler beim Füllen: {selector} -> {e}")
         return False
 
 
 # --- Semantic fallbacks via label/placeholder
-def try_semantic_fill(page, field_name, value, debug=False):
+async def try_semantic_fill(page, field_name, value, log, type_delay=0):
     label_map = {
         "first_name": ["Vorname", "First name", "Given name", "Forename"],
         "last_name": ["Nachname", "Last name", "Surname", "Family name"],
@@ -333,13 +243,12 @@ def try_semantic_fill(page, field_name, value, debug=False):
     for lbl in label_map.get(field_name, []):
         try:
             loc = page.get_by_label(lbl, exact=False)
-            if loc.count() > 0:
+            if await loc.count() > 0:
                 try:
-                    loc.first.fill(value)
+                    await loc.first.fill(value)
                 except Exception:
-                    loc.first.type(value, delay=15)
-                if debug:
-                    st.success(f"[{field_name}] Gefüllt über Label: {lbl}")
+                    await loc.first.type(value, delay=type_delay)
+                log("success", f"[{field_name}] Gefüllt über Label: {lbl}")
                 return True
         except Exception:
             continue
@@ -349,33 +258,104 @@ def try_semantic_fill(page, field_name, value, debug=False):
     for ph in placeholder_map.get(field_name, []):
         try:
             loc = page.get_by_placeholder(ph, exact=False)
-            if loc.count() > 0:
+            if await loc.count() > 0:
                 try:
-                    loc.first.fill(value)
+                    await loc.first.fill(value)
                 except Exception:
-                    loc.first.type(value, delay=15)
-                if debug:
-                    st.success(f"[{field_name}] Gefüllt über Placeholder: {ph}")
+                    await loc.first.type(value, delay=type_delay)
+                log("success", f"[{field_name}] Gefüllt über Placeholder: {ph}")
                 return True
         except Exception:
             continue
 
 
-    if debug:
-        st.warning(f"[{field_name}] Semantischer Fallback nicht gefunden.")
+    log("warning", f"[{field_name}] Semantischer Fallback nicht gefunden.")
     return False
 
 
 # --- Execution
+async def analyze_page(page, url):
+    """Fill the form on one URL; runs on the form runner's event loop in a fresh context.
+
+    Returns a result dict; the messages are shown by the script once the URL is done.
+    """
+    messages = []
+    log = lambda level, text: messages.append((level, text))
+    await page.goto(url, wait_until=profile["wait_until"])
+    # Condition instead of a fixed 1.5 s sleep: a form or input is in the DOM
+    await wait_for_form_async(page, profile)
+    rendered_html = await page.content()
+
+
+    mapping = None
+    if use_ai:
+        mapping = await ai_extract_form_fields(rendered_html, url, log)
+
+
+    if not mapping:
+        log("info", "KI-Erkennung nicht verfügbar/fehlgeschlagen. Verwende Regex-Fallback.")
+        r = await asyncio.to_thread(http.get, url, timeout=15)
+        mapping = selector_mapping(extract_form_fields_regex(r.text))
+
+
+    result = {"url": url, "mapping": mapping, "messages": messages}
+    filled_any = False
+    if mapping:
+        # Prepare data, including split names
+        first_name_val, last_name_val = split_full_name(full_name)
+        data = {
+            "name": full_name,
+            "first_name": first_name_val or full_name,
+            "last_name": last_name_val or "",
+            "email": email,
+            "phone": phone,
+            "street": street,
+            "zip": zip_code,
+            "city": city,
+            "message": message
+        }
+
+
+        # Try mapping selectors first
+        for field_key, value in data.items():
+            sel = mapping.get(field_key)
+            ok = False
+            if sel:
+                ok = await try_fill_by_selector(page, sel, value, field_key, log, profile["type_delay"])
+            # If selector path failed or missing, use semantic fallbacks
+            if not ok and value:
+                ok = await try_semantic_fill(page, field_key, value, log, profile["type_delay"])
+            filled_any = filled_any or ok
+
+
+        if filled_any:
+            result["status"] = "✅ Formular erkannt und ausgefüllt (inkl. Nachname/Straße, falls vorhanden)"
+        else:
+            result["status"] = "⚠️ Formular erkannt, aber keine Felder erfolgreich gefüllt"
+    else:
+        result["status"] = "⚠️ Kein Formular gefunden"
+    return result
+
+
+def show_result(result):
+    st.write(f"🌐 **{result['url']}** — {result['status']}")
+    if result["mapping"]:
+        st.code(json.dumps(result["mapping"], indent=2, ensure_ascii=False))
+    if show_debug:
+        show = {"info": st.info, "success": st.success, "warning": st.warning, "error": st.error}
+        for level, text in result["messages"]:
+            show[level](text)
+
+
 if run:
     urls = [u.strip() for u in urls_input.split("\n") if u.strip()]
     if not urls:
         st.error("Bitte geben Sie mindestens eine gültige URL ein.")
     else:
         if use_ai:
-            if openai_mode == "new":
+            if llm.mode == "new":
                 st.info("KI-Modus: Neuer OpenAI SDK erkannt.")
-            elif openai_mode == "legacy":
+            elif llm.mode == "legacy":
                 st.info("KI-Modus: Legacy OpenAI SDK erkannt.")
             else:
                 st.warning("KI-Modus aktiviert, aber kein funktionierender OpenAI-Client gefunden. Es wird der Regex-Fallback verwendet.")
@@ -383,83 +363,23 @@ if run:
 
         st.info(f"{len(urls)} Webseiten werden überprüft...")
         results = []
+        progress = st.progress(0)
 
 
-        with st.spinner("Starte Browser und analysiere Webseiten..."):
-            with sync_playwright() as p:
-                browser = p.firefox.launch(headless=False, slow_mo=200)
-                page = browser.new_page()
-
-
-                for url in urls:
-                    st.write(f"🌐 **{url}** wird analysiert...")
-                    try:
-                        page.goto(url, wait_until="load")
-                        page.wait_for_timeout(1500)
-                        rendered_html = page.content()
-
-
-                        mapping = None
-                        if use_ai and openai_mode is not None:
-                            mapping = ai_extract_form_fields(rendered_html)
-
-
-                        if not mapping:
-                            if show_debug:
-                                st.info("KI-Erkennung nicht verfügbar/fehlgeschlagen. Verwende Regex-Fallback.")
-                            r = requests.get(url, timeout=15)
-                            mapping = extract_form_fields_regex(r.text)
-
-
-                        filled_any = False
-                        if mapping:
-                            st.code(json.dumps(mapping, indent=2, ensure_ascii=False))
-
-
-                            # Prepare data, including split names
-                            first_name_val, last_name_val = split_full_name(full_name)
-                            data = {
-                                "name": full_name,
-                                "first_name": first_name_val or full_name,
-                                "last_name": last_name_val or "",
-                                "email": email,
-                                "phone": phone,
-                                "street": street,
-                                "zip": zip_code,
-                                "city": city,
-                                "message": message
-                            }
-
-
-                            # Try mapping selectors first
-                            for field_key, value in data.items():
-                                sel = mapping.get(field_key)
-                                ok = False
-                                if sel:
-                                    ok = try_fill_by_selector(page, sel, value, field_key, debug=show_debug)
-                                # If selector path failed or missing, use semantic fallbacks
-                                if not ok and value:
-                                    ok = try_semantic_fill(page, field_key, value, debug=show_debug)
-                                filled_any = filled_any or ok
-
-
-                            if filled_any:
-                                results.append({"url": url, "status": "✅ Formular erkannt und ausgefüllt (inkl. Nachname/Straße, falls vorhanden)"})
-                            else:
-                                results.append({"url": url, "status": "⚠️ Formular erkannt, aber keine Felder erfolgreich gefüllt"})
-                        else:
-                            results.append({"url": url, "status": "⚠️ Kein Formular gefunden"})
-
-
-                    except Exception as e:
-                        results.append({"url": url, "status": f"❌ Fehler: {e}"})
-                        if show_debug:
-                            st.error(f"Fehler bei {url}: {e}")
-                        continue
-
-
-                page.pause()
-                browser.close()
+        # Every URL gets its own browser context; results appear as soon as a URL is done
+        try:
+            for url, result in get_form_runner().stream(urls, analyze_page, concurrency=concurrency,
+                                                         headless=not show_browser, profile=profile):
+                if isinstance(result, Exception):
+                    results.append({"url": url, "status": f"❌ Fehler: {result}"})
+                    if show_debug:
+                        st.error(f"Fehler bei {url}: {result}")
+                else:
+                    show_result(result)
+                    results.append({"url": url, "status": result["status"]})
+                progress.progress(len(results) / len(urls))
+        except Exception as e:
+            st.error(f"Browser konnte nicht gestartet werden: {e}")
 
 
         st.success("Analyse abgeschlossen.")
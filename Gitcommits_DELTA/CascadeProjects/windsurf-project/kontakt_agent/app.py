@@ -1,34 +1,22 @@
 import streamlit as st
-from playwright.sync_api import sync_playwright, TimeoutError
-from bs4 import BeautifulSoup
-import requests, json, re, os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from playwright.sync_api import TimeoutError
+import requests, json, re, os, sys
+
+# Shared helpers (form_html.py, field_classifier.py, resources.py) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from form_html import compact_form_html
+from form_fields import extract_form_fields_regex, selector_mapping
+from form_cache import parse as parse_html
+from field_classifier import confident_mapping, log_examples
+from form_profiles import PROFILE_LABELS, get_profile, wait_for_form
+from llm_gateway import MAX_CONCURRENCY
 
 # ===== OpenAI integration =====
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Detect and support both new and legacy OpenAI SDKs
-client_new = None
-client_legacy = None
-openai_mode = None   # "new" or "legacy" or None
-
-try:
-    # New SDK (>=1.0): from openai import OpenAI
-    from openai import OpenAI
-    client_new = OpenAI(api_key=OPENAI_API_KEY)
-    openai_mode = "new"
-except Exception:
-    try:
-        # Legacy SDK (<1.0): import openai and set api_key
-        import openai as openai_legacy
-        openai_legacy.api_key = OPENAI_API_KEY
-        client_legacy = openai_legacy
-        openai_mode = "legacy"
-    except Exception:
-        openai_mode = None
+# .env is read and the LLM gateway (new or legacy SDK, rate limits, retries)
+# created once per process
+from resources import get_browser_pool, get_llm_gateway
+
+llm = get_llm_gateway()   # llm.mode: "new" or "legacy" or None
 
 st.set_page_config(page_title="Auto Bewerbungs Scanner", layout="centered")
 
@@ -59,6 +47,8 @@ message = st.text_area(
 
 use_ai = st.checkbox("🤖 KI zur Felderkennung verwenden", value=True)
 show_debug = st.checkbox("🛠️ Debug-Ausgaben anzeigen", value=True)
+show_browser = st.checkbox("👀 Browser anzeigen", value=True)
+profile = get_profile(PROFILE_LABELS[st.radio("Ausführung", list(PROFILE_LABELS), horizontal=True)])
 run = st.button("🔍 Webseiten analysieren (ohne Absenden)")
 
 # --- Utilities
@@ -80,129 +70,83 @@ def normalize_selector_value(v):
         return v if v else None
     return None
 
-# --- Heuristic (Regex) extractor extended
-def extract_form_fields_regex(html):
-    soup = BeautifulSoup(html, "html.parser")
-    forms = soup.find_all("form")
-    if not forms:
-        return None
-
-    # Pick the largest form
-    form = max(forms, key=lambda f: len(f.find_all(["input", "textarea", "select"])))
-
-    mapping = {}
-
-    def selector(inp):
-        if inp.get("id"): return f"#{inp.get('id')}"
-        if inp.get("name"): return f"[name='{inp.get('name')}']"
-        return None
-
-    for inp in form.find_all(["input", "textarea", "select"]):
-        attr_text = " ".join([
-            (inp.get("name") or ""),
-            (inp.get("id") or ""),
-            (inp.get("placeholder") or ""),
-            (inp.get("aria-label") or "")
-        ]).lower()
-
-        if inp.get("id"):
-            label_tag = soup.find("label", {"for": inp.get("id")})
-            if label_tag:
-                attr_text += " " + label_tag.text.strip().lower()
-
-        sel = selector(inp)
-
-        # Name fields
-        if re.search(r"(full.?name|your.?name|contact.?name|^name$|\bname\b)", attr_text):
-            mapping.setdefault("name", sel)
-        if re.search(r"(vorname|first.?name|given.?name|\bfname\b)", attr_text):
-            mapping.setdefault("first_name", sel)
-        if re.search(r"(nachname|last.?name|family.?name|\blname\b|surname)", attr_text):
-            mapping.setdefault("last_name", sel)
-
-        # Email
-        if re.search(r"(mail|e.?mail)", attr_text) or (inp.get("type") or "").lower() == "email":
-            mapping.setdefault("email", sel)
-
-        # Phone
-        if re.search(r"(telefon|handy|mobil|phone|tel|telephone|phone.?number)", attr_text) or (inp.get("type") or "").lower() == "tel":
-            mapping.setdefault("phone", sel)
+# --- AI extractor (German system prompt, extended keys)
+MAPPING_KEYS = ["first_name", "last_name", "name", "email", "phone", "street", "zip", "city", "message"]
+SYSTEM_PROMPT = (
+    "Du bist ein Experte für Web-Formulare. Du erhältst die Formulare einer gerenderten Seite (gekürztes HTML: nur Formulare, Labels und Felder) und sollst die besten Felder "
+    "(input/textarea/select) für folgende Zwecke identifizieren: first_name, last_name, name, email, phone, street, zip, city, message.\n\n"
+    "Ziel: Liefere AUSSCHLIESSLICH ein JSON-Objekt mit GENAU diesen Schlüsseln. Jeder Wert ist entweder ein CSS-Selektor (String) oder null.\n\n"
+    "Suche gründlich in: id, name, placeholder, aria-label, type, <label for=...>-Texten und nahen Überschriften. IDs/Namen sind oft englisch/zusammengesetzt "
+    "(z. B. text-name, your_name, first_name, last_name, email_address, phone_number, locality, town, street, address_line1, zip, postal_code, message, comments).\n"
+    "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child/:nth-of-type und keine >-Kombinatoren (die Struktur ist gekürzt). "
+    "Nur sichtbare, interaktive Felder.\n"
+    "Feldlogik (de+en): first_name (vorname/given_name), last_name (nachname/family_name/surname), name (fullname), email, phone, street (straße/strasse/address/address_line1/hausnummer), "
+    "zip (plz/zip/postal_code), city (ort/stadt/locality/town), message (textarea bevorzugt).\n"
+    "Validierung: Jeder Selektor soll ein konkretes Feld adressieren; sonst null."
+)
 
-        # Street (address line)
-        if re.search(r"(stra(ss|ß)e|street|address(\s*line)?\s*1|hausnummer|addr1)", attr_text):
-            mapping.setdefault("street", sel)
 
-        # ZIP/PLZ
-        if re.search(r"(plz|zip|postal.?code|post.?code)", attr_text):
-            mapping.setdefault("zip", sel)
+def _mapping_request(html_snippet):
+    user_prompt = f"HTML:\n\n{html_snippet}\n\nGib NUR das JSON-Objekt zurück mit den Schlüsseln: first_name, last_name, name, email, phone, street, zip, city, message."
+    return {
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        "model": "gpt-4o-mini",
+        "json_mode": True,
+        "params": {"temperature": 0},
+    }
 
-        # City
-        if re.search(r"(ort|stadt|city|locality|town)", attr_text):
-            mapping.setdefault("city", sel)
 
-        # Message
-        if re.search(r"(nachricht|message|bemerkung|kommentar|anschreiben|cover.?letter|motivation|inquiry|comments|text)", attr_text) or inp.name == "textarea":
-            mapping.setdefault("message", sel)
+def _parse_mapping(content):
+    mapping = json.loads(content)
+    for k in MAPPING_KEYS:
+        mapping[k] = normalize_selector_value(mapping.get(k))
+    return mapping if any(mapping.values()) else None
 
-    return mapping if mapping else None
 
-# --- AI extractor (German system prompt, extended keys)
-def ai_extract_form_fields(html):
-    if openai_mode is None:
-        return None
+def ai_extract_form_fields_many(pages):
+    """Field mappings for ``[(url, html), ...]``, in order; None where nothing was found.
 
-    max_chars = 60000
-    html_snippet = html[:max_chars] if len(html) > max_chars else html
-
-    system_prompt = (
-        "Du bist ein Experte für Web-Formulare. Du erhältst das GERENDERTE HTML einer Seite und sollst die besten Felder "
-        "(input/textarea/select) für folgende Zwecke identifizieren: first_name, last_name, name, email, phone, street, zip, city, message.\n\n"
-        "Ziel: Liefere AUSSCHLIESSLICH ein JSON-Objekt mit GENAU diesen Schlüsseln. Jeder Wert ist entweder ein CSS-Selektor (String) oder null.\n\n"
-        "Suche gründlich in: id, name, placeholder, aria-label, type, <label for=...>-Texten und nahen Überschriften. IDs/Namen sind oft englisch/zusammengesetzt "
-        "(z. B. text-name, your_name, first_name, last_name, email_address, phone_number, locality, town, street, address_line1, zip, postal_code, message, comments).\n"
-        "Bevorzuge #ID, sonst [name='...'], sonst robuster, eindeutiger Selektor (am Formular verankert, z. B. form#contact [name='email']). Keine :nth-child ohne Not. "
-        "Nur sichtbare, interaktive Felder.\n"
-        "Feldlogik (de+en): first_name (vorname/given_name), last_name (nachname/family_name/surname), name (fullname), email, phone, street (straße/strasse/address/address_line1/hausnummer), "
-        "zip (plz/zip/postal_code), city (ort/stadt/locality/town), message (textarea bevorzugt).\n"
-        "Validierung: Jeder Selektor soll ein konkretes Feld adressieren; sonst null."
-    )
-    user_prompt = f"HTML:\n\n{html_snippet}\n\nGib NUR das JSON-Objekt zurück mit den Schlüsseln: first_name, last_name, name, email, phone, street, zip, city, message."
+    The local classifier answers where it is confident; the remaining pages
+    go to the LLM as one batch, sent concurrently by the gateway.
+    """
+    mappings = [None] * len(pages)
+    pending = []   # (index, request)
+    for i, (url, html) in enumerate(pages):
+        # Local classifier first: the LLM is only asked when it is unsure
+        local = confident_mapping(parse_html(html))
+        if local:
+            mappings[i] = local
+            continue
+        if not llm.available:
+            continue
+        # Only the forms and their labels, not the first 60,000 characters of the page
+        html_snippet = compact_form_html(html)
+        if html_snippet:  # else no fillable fields
+            pending.append((i, _mapping_request(html_snippet)))
 
+    if not pending:
+        return mappings
     try:
-        if openai_mode == "new":
-            completion = client_new.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0,
-                response_format={"type": "json_object"}
-            )
-            content = completion.choices[0].message.content.strip()
-        else:
-            resp = client_legacy.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0
-            )
-            content = resp.choices[0].message["content"].strip()
-            m = re.search(r"\{[\s\S]*\}", content)
-            content = m.group(0) if m else content
-
-        mapping = json.loads(content)
-        for k in ["first_name", "last_name", "name", "email", "phone", "street", "zip", "city", "message"]:
-            mapping[k] = normalize_selector_value(mapping.get(k))
-        if not any(mapping.values()):
-            return None
-        return mapping
+        answers = llm.complete_many([request for _, request in pending])
     except Exception as e:
-        if show_debug:
-            st.warning(f"KI-Extraktion fehlgeschlagen: {e}")
-        return None
+        answers = [e] * len(pending)
+    for (i, _), answer in zip(pending, answers):
+        url, html = pages[i]
+        try:
+            if isinstance(answer, Exception):
+                raise answer
+            mapping = _parse_mapping(answer)
+        except Exception as e:
+            if show_debug:
+                st.warning(f"KI-Extraktion fehlgeschlagen ({url}): {e}")
+            continue
+        if mapping:
+            log_examples(url, html, {k: v for k, v in mapping.items() if v})  # training data for the local classifier
+            mappings[i] = mapping
+    return mappings
 
 # --- Locator helpers
 def find_locator_in_page_or_iframes(page, selector):
@@ -255,7 +199,7 @@ def try_fill_by_selector(page, selector, value, field_name, debug=False):
             except Exception:
                 try:
                     loc.click()
-                    loc.type(value, delay=15)
+                    loc.type(value, delay=profile["type_delay"])
                 except Exception:
                     if debug:
                         st.error(f"[{field_name}] Konnte nicht füllen: {selector}")
@@ -334,9 +278,9 @@ if run:
         st.error("Bitte geben Sie mindestens eine gültige URL ein.")
     else:
         if use_ai:
-            if openai_mode == "new":
+            if llm.mode == "new":
                 st.info("KI-Modus: Neuer OpenAI SDK erkannt.")
-            elif openai_mode == "legacy":
+            elif llm.mode == "legacy":
                 st.info("KI-Modus: Legacy OpenAI SDK erkannt.")
             else:
                 st.warning("KI-Modus aktiviert, aber kein funktionierender OpenAI-Client gefunden. Es wird der Regex-Fallback verwendet.")
@@ -344,72 +288,103 @@ if run:
         st.info(f"{len(urls)} Webseiten werden überprüft...")
         results = []
 
+        # Prepare data, including split names
+        first_name_val, last_name_val = split_full_name(full_name)
+        data = {
+            "name": full_name,
+            "first_name": first_name_val or full_name,
+            "last_name": last_name_val or "",
+            "email": email,
+            "phone": phone,
+            "street": street,
+            "zip": zip_code,
+            "city": city,
+            "message": message
+        }
+
+        def render_page(page, url):
+            """Rendered HTML of a URL; the context is closed right after."""
+            page.goto(url, wait_until=profile["wait_until"])
+            wait_for_form(page, profile)
+            return page.content()
+
+        def fill_page(page, url, mapping):
+            """Fill a freshly opened page; True if any field was filled."""
+            page.goto(url, wait_until=profile["wait_until"])
+            wait_for_form(page, profile)
+            filled_any = False
+            # Try mapping selectors first
+            for field_key, value in data.items():
+                sel = mapping.get(field_key)
+                ok = False
+                if sel:
+                    ok = try_fill_by_selector(page, sel, value, field_key, debug=show_debug)
+                # If selector path failed or missing, use semantic fallbacks
+                if not ok and value:
+                    ok = try_semantic_fill(page, field_key, value, debug=show_debug)
+                filled_any = filled_any or ok
+            if profile["watch_ms"]:
+                page.wait_for_timeout(profile["watch_ms"])
+            return filled_any, page
+
         with st.spinner("Starte Browser und analysiere Webseiten..."):
-            with sync_playwright() as p:
-                browser = p.firefox.launch(headless=False, slow_mo=200)
-                page = browser.new_page()
-
-                for url in urls:
-                    st.write(f"🌐 **{url}** wird analysiert...")
-                    try:
-                        page.goto(url, wait_until="load")
-                        page.wait_for_timeout(1500)
-                        rendered_html = page.content()
-
-                        mapping = None
-                        if use_ai and openai_mode is not None:
-                            mapping = ai_extract_form_fields(rendered_html)
-
-                        if not mapping:
-                            if show_debug:
-                                st.info("KI-Erkennung nicht verfügbar/fehlgeschlagen. Verwende Regex-Fallback.")
-                            r = requests.get(url, timeout=15)
-                            mapping = extract_form_fields_regex(r.text)
-
-                        filled_any = False
-                        if mapping:
-                            st.code(json.dumps(mapping, indent=2, ensure_ascii=False))
-
-                            # Prepare data, including split names
-                            first_name_val, last_name_val = split_full_name(full_name)
-                            data = {
-                                "name": full_name,
-                                "first_name": first_name_val or full_name,
-                                "last_name": last_name_val or "",
-                                "email": email,
-                                "phone": phone,
-                                "street": street,
-                                "zip": zip_code,
-                                "city": city,
-                                "message": message
-                            }
-
-                            # Try mapping selectors first
-                            for field_key, value in data.items():
-                                sel = mapping.get(field_key)
-                                ok = False
-                                if sel:
-                                    ok = try_fill_by_selector(page, sel, value, field_key, debug=show_debug)
-                                # If selector path failed or missing, use semantic fallbacks
-                                if not ok and value:
-                                    ok = try_semantic_fill(page, field_key, value, debug=show_debug)
-                                filled_any = filled_any or ok
-
-                            if filled_any:
-                                results.append({"url": url, "status": "✅ Formular erkannt und ausgefüllt (inkl. Nachname/Straße, falls vorhanden)"})
+            # Warm browser from the pool; one context per page, closed when the
+            # page is done. URLs go in windows: render, map the window as one
+            # concurrent LLM batch, fill. Only the last filled page stays open.
+            with get_browser_pool().lease(headless=not show_browser, profile=profile) as browser:
+                last_page = None
+                for start in range(0, len(urls), MAX_CONCURRENCY):
+                    window = urls[start:start + MAX_CONCURRENCY]
+                    rendered = []
+                    for url in window:
+                        st.write(f"🌐 **{url}** wird geladen...")
+                        try:
+                            rendered.append((url, browser.run(render_page, url)))
+                        except Exception as e:
+                            rendered.append((url, e))
+
+                    loaded = [i for i, (_, html) in enumerate(rendered) if not isinstance(html, Exception)]
+                    ai_mappings = {}
+                    if use_ai and loaded:
+                        with st.spinner(f"KI-Felderkennung für {len(loaded)} Webseiten..."):
+                            found = ai_extract_form_fields_many([rendered[i] for i in loaded])
+                        ai_mappings = dict(zip(loaded, found))
+
+                    for i, (url, html) in enumerate(rendered):
+                        st.write(f"🌐 **{url}** wird analysiert...")
+                        try:
+                            if isinstance(html, Exception):
+                                raise html
+
+                            mapping = ai_mappings.get(i)
+                            if not mapping:
+                                if show_debug:
+                                    st.info("KI-Erkennung nicht verfügbar/fehlgeschlagen. Verwende Regex-Fallback.")
+                                r = requests.get(url, timeout=15)
+                                mapping = selector_mapping(extract_form_fields_regex(r.text))
+
+                            if mapping:
+                                st.code(json.dumps(mapping, indent=2, ensure_ascii=False))
+                                is_last = start + i == len(urls) - 1
+                                filled_any, page = browser.run(fill_page, url, mapping, keep_open=is_last and show_browser)
+                                if is_last:
+                                    last_page = page
+                                if filled_any:
+                                    results.append({"url": url, "status": "✅ Formular erkannt und ausgefüllt (inkl. Nachname/Straße, falls vorhanden)"})
+                                else:
+                                    results.append({"url": url, "status": "⚠️ Formular erkannt, aber keine Felder erfolgreich gefüllt"})
                             else:
-                                results.append({"url": url, "status": "⚠️ Formular erkannt, aber keine Felder erfolgreich gefüllt"})
-                        else:
-                            results.append({"url": url, "status": "⚠️ Kein Formular gefunden"})
-
-                    except Exception as e:
-                        results.append({"url": url, "status": f"❌ Fehler: {e}"})
-                        if show_debug:
-                            st.error(f"Fehler bei {url}: {e}")
-                        continue
-
-                page.pause()
-                browser.close()
+                                results.append({"url": url, "status": "⚠️ Kein Formular gefunden"})
+
+                        except Exception as e:
+                            results.append({"url": url, "status": f"❌ Fehler: {e}"})
+                            if show_debug:
+                                st.error(f"Fehler bei {url}: {e}")
+                            continue
+
+                # Keep the last page open for inspection
+                if last_page is not None and show_browser:
+                    browser.call(last_page.pause)
 
         st.success("Analyse abgeschlossen.")
         st.json(results)
@@ -0,0 +1,250 @@
+"""One client for all OpenAI chat calls.
+
+The form mappers and the search-term helper used to call the SDK directly:
+blocking, without retries, timeouts or any limit on how many requests a batch
+of URLs fires at once, and each with its own new/legacy SDK branch.
+``LLMGateway`` replaces that:
+
+* async SDK client (``AsyncOpenAI``, or ``ChatCompletion.acreate`` of the
+  legacy SDK) on one background event loop,
+* token buckets for requests and tokens per minute (``LLM_RPM``/``LLM_TPM``),
+  and at most ``MAX_CONCURRENCY`` requests in flight,
+* ``TIMEOUT`` per attempt, retries with exponential backoff and full jitter
+  on rate limits, timeouts, connection and server errors,
+* identical requests in flight at the same time are sent once,
+* per-call latency (``llm.request.<model>`` spans) and token counts.
+
+Sync code calls ``complete`` (or ``complete_many`` for a batch, dispatched
+concurrently, e.g. the field mappings of all URLs in kontakt_agent/app.py);
+coroutines on another event loop, e.g. form runner jobs, ``await acomplete``::
+
+    content = get_llm_gateway().complete(messages, model="gpt-4o-mini", json_mode=True, temperature=0)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from instrumentation import record
+from metrics import LLM_REQUESTS, record_llm_usage
+
+RPM = int(os.getenv("LLM_RPM", "500"))          # requests per minute
+TPM = int(os.getenv("LLM_TPM", "200000"))       # tokens per minute (prompt + completion)
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 4
+TIMEOUT = 30              # seconds per attempt
+BACKOFF_MAX = 20          # seconds, before jitter
+DEFAULT_MODEL = "gpt-4o-mini"
+COMPLETION_ESTIMATE = 500  # tokens reserved for the answer if max_tokens is not given
+
+# Worth another attempt (new and legacy SDK exception names)
+_RETRYABLE = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+              "ServiceUnavailableError", "Timeout", "TryAgain", "TimeoutError"}
+
+
+class TokenBucket:
+    """``per_minute`` units per minute, bursts of up to one minute's worth."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None  # asyncio.Lock, created on the loop
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount):
+        """Wait until ``amount`` units are available and take them (first come, first served)."""
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount):
+        """Correct an estimate once the real usage is known (the bucket may go negative)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def estimate_tokens(messages, params):
+    """Rough token count of a request: 4 characters per token plus the answer."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + int(params.get("max_tokens") or COMPLETION_ESTIMATE)
+
+
+def _retryable(error):
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in _RETRYABLE
+
+
+def _backoff(attempt, error):
+    """Seconds to wait before the next attempt: Retry-After if sent, else full jitter."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return min(float(headers.get("retry-after")), BACKOFF_MAX)
+    except (TypeError, ValueError):
+        return random.uniform(0, min(BACKOFF_MAX, 2 ** attempt))
+
+
+def _tokens_used(usage):
+    if not usage:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+    return get("total_tokens")
+
+
+class LLMGateway:
+    """Rate-limited, retrying async OpenAI chat client shared by all sessions.
+
+    ``mode`` is the SDK flavour from ``resources.get_openai_client`` ("new",
+    "legacy" or None if no SDK is usable).
+    """
+
+    def __init__(self, mode, api_key, rpm=RPM, tpm=TPM, concurrency=MAX_CONCURRENCY,
+                 max_retries=MAX_RETRIES, timeout=TIMEOUT):
+        self.mode = mode
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._concurrency = concurrency
+        self._rpm = TokenBucket(rpm)
+        self._tpm = TokenBucket(tpm)
+        self._client = None
+        self._semaphore = None     # created on the loop
+        self._inflight = {}        # request key -> task, for coalescing
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def available(self):
+        return self.mode is not None
+
+    # ----- loop thread -----
+    def _ensure_loop(self):
+        if not self.available:
+            raise RuntimeError("Kein OpenAI-Client verfügbar")
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _get_client(self):
+        if self._client is None:
+            if self.mode == "new":
+                from openai import AsyncOpenAI
+                # Retries and timeouts are handled here, not by the SDK
+                self._client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+            else:
+                import openai
+                self._client = openai
+        return self._client
+
+    async def _create(self, model, messages, json_mode, params):
+        """One SDK call; returns (content, usage)."""
+        client = self._get_client()
+        if self.mode == "new":
+            if json_mode:
+                params = dict(params, response_format={"type": "json_object"})
+            response = await client.chat.completions.create(model=model, messages=messages, **params)
+            return response.choices[0].message.content or "", response.usage
+        response = await client.ChatCompletion.acreate(model=model, messages=messages,
+                                                       request_timeout=self.timeout, **params)
+        content = response.choices[0].message["content"] or ""
+        if json_mode:
+            # The legacy API has no JSON mode: cut the object out of the answer
+            from resources import JSON_OBJECT_RE
+            match = JSON_OBJECT_RE.search(content)
+            content = match.group(0) if match else content
+        return content, response.get("usage")
+
+    async def _request(self, model, messages, json_mode, params):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        estimate = estimate_tokens(messages, params)
+        for attempt in range(self.max_retries + 1):
+            await self._rpm.acquire(1)
+            await self._tpm.acquire(estimate)
+            async with self._semaphore:
+                start = time.perf_counter_ns()
+                try:
+                    content, usage = await asyncio.wait_for(self._create(model, messages, json_mode, params),
+                                                            self.timeout)
+                    error = None
+                except Exception as e:
+                    error = e
+                record(f"llm.request.{model}", time.perf_counter_ns() - start, error=error is not None)
+            if error is None:
+                record_llm_usage(model, usage)
+                used = _tokens_used(usage)
+                if used:
+                    self._tpm.adjust(used - estimate)
+                LLM_REQUESTS.inc(model=model, result="ok")
+                return content.strip()
+            if attempt >= self.max_retries or not _retryable(error):
+                LLM_REQUESTS.inc(model=model, result="error")
+                raise error
+            LLM_REQUESTS.inc(model=model, result="retry")
+            await asyncio.sleep(_backoff(attempt, error))
+
+    async def _coalesced(self, model, messages, json_mode, params):
+        key = hashlib.sha1(json.dumps([model, messages, json_mode, params], sort_keys=True,
+                                      ensure_ascii=False).encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(model, messages, json_mode, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            LLM_REQUESTS.inc(model=model, result="coalesced")
+        # One caller giving up must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _gather(self, requests):
+        return await asyncio.gather(*(self._coalesced(r.get("model", DEFAULT_MODEL), r["messages"],
+                                                      r.get("json_mode", False), r.get("params", {}))
+                                      for r in requests), return_exceptions=True)
+
+    # ----- caller side -----
+    def complete(self, messages, model=DEFAULT_MODEL, json_mode=False, **params):
+        """Send one chat request and return the answer text; blocks the calling thread.
+
+        ``params`` go to the SDK (temperature, max_tokens, ...). With
+        ``json_mode`` the answer is a JSON object string. Raises the SDK's
+        error once the retries are used up.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._coalesced(model, messages, json_mode, params),
+                                                  self._ensure_loop())
+        return future.result()
+
+    async def acomplete(self, messages, model=DEFAULT_MODEL, json_mode=False, **params):
+        """``complete`` for coroutines running on another event loop."""
+        future = asyncio.run_coroutine_threadsafe(self._coalesced(model, messages, json_mode, params),
+                                                  self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def complete_many(self, requests):
+        """Send a batch concurrently (within the rate limits); results in request order.
+
+        Each request is a dict with ``messages`` and optionally ``model``,
+        ``json_mode`` and ``params``. A failed request yields its exception.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._gather(list(requests)), self._ensure_loop())
+        return future.result()
@@ -0,0 +1,204 @@
+"""Prometheus/OpenMetrics exporter for scraper and agent throughput.
+
+Counters and gauges live in this module, latency histograms come from the
+spans in ``instrumentation``. ``start_metrics_server()`` serves everything on
+``http://127.0.0.1:<METRICS_PORT>/metrics``; it is safe to call on every
+Streamlit rerun because the server is only started once per process.
+"""
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import instrumentation
+
+PREFIX = "agenthub"
+DEFAULT_PORT = 9464
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = f"{PREFIX}_{name}"
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return list(self._values.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+# ===== REGISTRY =====
+PAGES_FETCHED = Counter("pages_fetched", "Web pages downloaded", ["source"])
+BYTES_FETCHED = Counter("fetched_bytes", "Bytes downloaded", ["source"])
+JOBS_FOUND = Counter("jobs_found", "Job postings found", ["source"])
+PHONES_FOUND = Counter("phones_found", "Phone numbers extracted from pages")
+FORMS_FILLED = Counter("forms_filled", "Contact forms with at least one filled field")
+SHOP_RESULTS = Counter("shop_results", "Product results returned by the shopping agent", ["shop"])
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens used", ["model", "kind"])
+LLM_REQUESTS = Counter("llm_requests", "LLM gateway requests (ok, error, retry, coalesced)", ["model", "result"])
+QUEUE_DEPTH = Gauge("queue_depth", "Items waiting in the current batch", ["queue"])
+OPEN_BROWSERS = Gauge("open_browsers", "Browser instances currently open", ["engine"])
+BROWSER_LAUNCHES = Counter("browser_launches", "Pooled browser launches (cold, recycle, unhealthy, options)", ["reason"])
+LLM_HTML_CHARS = Counter("llm_html_chars", "Page HTML chars vs. compacted form HTML sent to the LLM", ["stage"])
+FIELD_CLASSIFIER = Counter("field_classifier_forms", "Forms mapped by the local classifier (confident) or left to the LLM (unsure)", ["result"])
+FORM_CACHE = Counter("form_cache_lookups", "Form mapping cache lookups (hit, miss, expired, stale)", ["result"])
+BLOCKED_REQUESTS = Counter("blocked_requests", "Browser requests aborted by the resource block list", ["engine", "reason"])
+SPEECH_AUDIO_SECONDS = Counter("speech_audio_seconds", "Audio seconds captured vs. sent to recognition after VAD", ["stage"])
+SPEECH_UPLOAD_BYTES = Counter("speech_upload_bytes", "Raw PCM bytes vs. FLAC bytes uploaded for remote recognition", ["stage"])
+
+REGISTRY = [PAGES_FETCHED, BYTES_FETCHED, JOBS_FOUND, PHONES_FOUND, FORMS_FILLED,
+            SHOP_RESULTS, LLM_TOKENS, LLM_REQUESTS, QUEUE_DEPTH, OPEN_BROWSERS, BROWSER_LAUNCHES, BLOCKED_REQUESTS, FORM_CACHE,
+            FIELD_CLASSIFIER, LLM_HTML_CHARS, SPEECH_AUDIO_SECONDS, SPEECH_UPLOAD_BYTES]
+
+
+def record_llm_usage(model, usage):
+    """Count prompt/completion tokens from an OpenAI ``usage`` object or dict."""
+    if not usage:
+        return
+    get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if get(kind):
+            LLM_TOKENS.inc(get(kind), model=model, kind=kind.split("_")[0])
+
+
+# ===== EXPOSITION =====
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def render(openmetrics=False):
+    """Text exposition of all metrics (Prometheus 0.0.4 or OpenMetrics 1.0)."""
+    lines = []
+    for metric in REGISTRY:
+        family = metric.name
+        if metric.kind == "counter" and not openmetrics:
+            family += "_total"
+        lines.append(f"# HELP {family} {metric.help}")
+        lines.append(f"# TYPE {family} {metric.kind}")
+        sample_name = metric.name + ("_total" if metric.kind == "counter" else "")
+        for key, value in metric.samples():
+            lines.append(f"{sample_name}{_labels(metric.labelnames, key)} {_number(value)}")
+
+    hists = instrumentation.histograms()
+    duration = f"{PREFIX}_stage_duration_seconds"
+    lines.append(f"# HELP {duration} Duration of instrumented stages (fetch, parse, llm, browser, ...)")
+    lines.append(f"# TYPE {duration} histogram")
+    for name, hist in sorted(hists.items()):
+        base = {"stage": name.split(".", 1)[0], "span": name}
+        cumulative = 0
+        for bound, n in zip(instrumentation.BUCKETS, hist.buckets):
+            cumulative += n
+            lines.append(f"{duration}_bucket{_labels((), (), {**base, 'le': _number(bound)})} {cumulative}")
+        lines.append(f"{duration}_count{_labels((), (), base)} {hist.count}")
+        lines.append(f"{duration}_sum{_labels((), (), base)} {_number(hist.sum_ns / 1e9)}")
+
+    errors = f"{PREFIX}_stage_errors"
+    lines.append(f"# HELP {errors}{'' if openmetrics else '_total'} Instrumented stages that raised an exception")
+    lines.append(f"# TYPE {errors}{'' if openmetrics else '_total'} counter")
+    for name, hist in sorted(hists.items()):
+        base = {"stage": name.split(".", 1)[0], "span": name}
+        lines.append(f"{errors}_total{_labels((), (), base)} {hist.errors}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = render(openmetrics).encode("utf-8")
+        self.send_response(200)
+        if openmetrics:
+            self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+        else:
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep the Streamlit console clean
+
+
+_server = None            # False once binding failed: not retried on every rerun
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, addr="127.0.0.1"):
+    """Start the /metrics endpoint once per process; returns the bound port or None.
+
+    The port comes from ``METRICS_PORT`` (default 9464); ``METRICS_PORT=0``
+    disables the exporter.
+    """
+    global _server
+    with _server_lock:
+        if _server is False:
+            return None
+        if _server is not None:
+            return _server.server_address[1]
+        if port is None:
+            port = int(os.getenv("METRICS_PORT", DEFAULT_PORT))
+        if not port:
+            return None
+        try:
+            _server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        except OSError:
+            # Port taken (e.g. a second Streamlit process) - run without exporter
+            _server = False
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True).start()
+        return port
@@ -0,0 +1,167 @@
+"""Offline PLZ geocoding and radius search for job locations.
+
+Centroids come from ``geodata/``: the bundled ``plz_leitregionen.tsv`` only
+knows the 2-digit PLZ regions (roughly +-30 km). For street-level accuracy
+drop the GeoNames postal code dump for Germany (``DE.txt``) into
+``geodata/`` or point ``PLZ_DATASET`` at it; both formats are read by the
+same loader.
+
+Free-text locations are normalised once (``normalize_location``) to a
+centroid key plus coordinates. Radius queries first ask the centroid
+index for the keys within range (scipy ``cKDTree`` on unit vectors if
+installed, vectorised haversine otherwise); the job table is then
+filtered by key and the distances are computed with numpy.
+"""
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+GEODATA_DIR = Path(__file__).resolve().parent / "geodata"
+SEED_FILE = GEODATA_DIR / "plz_leitregionen.tsv"
+GEONAMES_FILE = GEODATA_DIR / "DE.txt"
+EARTH_RADIUS_KM = 6371.0088
+
+PLZ_RE = re.compile(r"(?<!\d)(\d{5})(?!\d)")
+CITY_CUT_RE = re.compile(r"[,/(|;]| - ")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; all arguments may be numpy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _city_key(text):
+    return re.sub(r"\s+", " ", text.casefold().replace("ß", "ss")).strip()
+
+
+def read_centroids(path):
+    """Yield (plz, ort, lat, lon) from the seed TSV or a GeoNames postal code dump."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 11:
+                # GeoNames: country, postal code, place, admin1..3 (name, code), lat, lon, accuracy
+                plz, ort, lat, lon = cols[1], cols[2], cols[9], cols[10]
+            elif len(cols) >= 4:
+                plz, ort, lat, lon = cols[:4]
+            else:
+                continue
+            try:
+                yield plz.strip(), ort.strip(), float(lat), float(lon)
+            except ValueError:
+                continue  # header line
+
+
+class PLZIndex:
+    """Spatial index over PLZ centroids with PLZ and city name lookup."""
+
+    def __init__(self, rows):
+        keys, orte, lats, lons = [], [], [], []
+        self._by_plz = {}
+        self._by_city = {}
+        for plz, ort, lat, lon in rows:
+            if plz in self._by_plz:
+                continue  # GeoNames lists one row per place; keep the first
+            self._by_plz[plz] = len(keys)
+            self._by_city.setdefault(_city_key(ort), len(keys))
+            keys.append(plz)
+            orte.append(ort)
+            lats.append(lat)
+            lons.append(lon)
+        if not keys:
+            raise ValueError("PLZ-Datensatz ist leer")
+
+        self.keys = np.array(keys)
+        self.orte = orte
+        self.lat = np.array(lats)
+        self.lon = np.array(lons)
+        self.key_lengths = sorted({len(k) for k in keys}, reverse=True)
+        # Only PLZ regions (the bundled seed): distances are approximate
+        self.region_level = 5 not in self.key_lengths
+        self._tree = cKDTree(_unit_vectors(self.lat, self.lon)) if cKDTree is not None else None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _entry(self, i):
+        return str(self.keys[i]), self.orte[i], float(self.lat[i]), float(self.lon[i])
+
+    def lookup_plz(self, plz):
+        """Centroid for a 5-digit PLZ, falling back to shorter prefixes (region)."""
+        for n in self.key_lengths:
+            i = self._by_plz.get(plz[:n])
+            if i is not None:
+                return self._entry(i)
+        return None
+
+    def lookup_city(self, name):
+        i = self._by_city.get(_city_key(name))
+        return self._entry(i) if i is not None else None
+
+    def within(self, lat, lon, radius_km):
+        """Keys and distances (km) of all centroids within ``radius_km``."""
+        if self._tree is not None:
+            chord = 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+            idx = np.array(self._tree.query_ball_point(_unit_vectors([lat], [lon])[0], chord), dtype=int)
+            dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        else:
+            dist = haversine_km(lat, lon, self.lat, self.lon)
+            idx = np.flatnonzero(dist <= radius_km)
+            dist = dist[idx]
+        return self.keys[idx], dist
+
+
+@lru_cache(maxsize=1)
+def get_index():
+    """Process-wide index from ``PLZ_DATASET``, ``geodata/DE.txt`` or the bundled regions."""
+    path = os.getenv("PLZ_DATASET")
+    if not path:
+        path = GEONAMES_FILE if GEONAMES_FILE.exists() else SEED_FILE
+    return PLZIndex(read_centroids(path))
+
+
+@lru_cache(maxsize=65536)
+def normalize_location(text):
+    """Map a free-text location to ``(plz, ort, geo_key, lat, lon)``, or None if unknown.
+
+    ``plz`` is the 5-digit PLZ found in the text (else None); ``geo_key`` is
+    the centroid the location was resolved to.
+    """
+    if not text or text == "N/A":
+        return None
+    index = get_index()
+    m = PLZ_RE.search(text)
+    plz = m.group(1) if m else None
+    hit = index.lookup_plz(plz) if plz else None
+    if hit is None or len(hit[0]) < 5:
+        # Only a region matched: an explicit Ort in the text is more precise
+        # Try "Frankfurt (Oder)", then "Köln" for "Köln, NRW" / "Köln-Ehrenfeld"
+        full = re.sub(r"^\s*(?:D-|DE-)", "", PLZ_RE.sub(" ", text)).strip()
+        cut = CITY_CUT_RE.split(full, 1)[0].strip()
+        for city in dict.fromkeys((full, cut, re.split(r"[\s-]", cut, maxsplit=1)[0])):
+            city_hit = index.lookup_city(city) if city else None
+            if city_hit:
+                hit = city_hit
+                break
+    if hit is None:
+        return None
+    geo_key, ort, lat, lon = hit
+    return plz, ort, geo_key, lat, lon
+
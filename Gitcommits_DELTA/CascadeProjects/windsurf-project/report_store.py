@@ -0,0 +1,299 @@
+"""Searchable index over the HVAC reports in ``hvac_reports/``.
+
+The report files stay the source of truth; ``reports.db`` (SQLite, next to
+the reports) indexes timestamp, technician, customer and device/fault
+keywords plus the full text (FTS5 with the trigram tokenizer, so "pumpe"
+also finds "Wärmepumpe"; ``LIKE`` fallback if the SQLite build lacks it). ``add`` indexes a report as it is saved; ``sync`` only rescans
+the folder when its mtime changed and then reads new or modified files, so
+listing and searching never touch the report files on a rerun.
+"""
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+DB_NAME = "reports.db"
+PAGE_SIZE = 20
+KEYWORD_SEP = ", "  # keywords may contain spaces ("Kein Warmwasser")
+
+# Header lines written by save_report
+HEADER_RE = re.compile(r"^(Techniker|Kunde)\s*:\s*(.+?)\s*$", re.MULTILINE | re.IGNORECASE)
+# Spoken variants in untagged reports ("Kunde Müller", "bei Familie Schmidt",
+# "Kundin Anna Weber", "bei Frau Dr. Berg"): title, name and an optional
+# second name; see _customer_name for when the second one is kept
+CUSTOMER_RE = re.compile(r"\b(?:Kunde|Kundin|Familie|bei Frau|bei Herrn?)\s+((?:Dr\.|Prof\.)\s+)?"
+                         r"([A-ZÄÖÜ][\wäöüß-]+)(?:\s+([A-ZÄÖÜ][\wäöüß-]+))?")
+TECHNICIAN_RE = re.compile(r"\b(?:Techniker|Monteur)\s+([A-ZÄÖÜ][\wäöüß-]+)")
+FILENAME_TS_RE = re.compile(r"report_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})")
+# "Fehlercode 28", "Störung F 75", "E119"
+ERROR_CODE_RE = re.compile(r"\b(?:Fehler(?:code)?|Störung(?:scode)?|Code)\s+([A-Z]{0,2}\s?\d{1,3})\b|\b([FE]\d{1,3})\b")
+
+# Word stem -> keyword stored in the index
+DEVICE_KEYWORDS = {
+    "wärmepumpe": "Wärmepumpe", "therme": "Therme", "brenner": "Brenner", "kessel": "Kessel",
+    "umwälzpumpe": "Umwälzpumpe", "pumpe": "Pumpe", "heizkörper": "Heizkörper", "thermostat": "Thermostat",
+    "ventil": "Ventil", "mischer": "Mischer", "ausdehnungsgefäß": "Ausdehnungsgefäß",
+    "speicher": "Speicher", "boiler": "Boiler", "durchlauferhitzer": "Durchlauferhitzer",
+    "klimaanlage": "Klimaanlage", "klimagerät": "Klimaanlage", "lüftung": "Lüftung",
+    "fußbodenheizung": "Fußbodenheizung", "zündelektrode": "Zündelektrode", "gasventil": "Gasventil",
+    "abgas": "Abgas", "filter": "Filter", "regler": "Regler", "solar": "Solar", "pellet": "Pellet",
+}
+FAULT_KEYWORDS = {
+    "undicht": "Leck", "leck": "Leck", "tropft": "Leck", "störung": "Störung", "defekt": "Defekt",
+    "kaputt": "Defekt", "kein warmwasser": "Kein Warmwasser", "kalt": "Kalt", "druckverlust": "Druckverlust",
+    "druck": "Druck", "geräusch": "Geräusch", "pfeift": "Geräusch", "klopft": "Geräusch",
+    "verstopft": "Verstopft", "verkalkt": "Kalk", "kalk": "Kalk", "zündfehler": "Zündfehler",
+    "überhitz": "Überhitzung", "entlüften": "Luft im System", "luft im": "Luft im System",
+    "wartung": "Wartung", "austausch": "Austausch", "getauscht": "Austausch",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    created_at TEXT NOT NULL,
+    technician TEXT NOT NULL DEFAULT '',
+    customer TEXT NOT NULL DEFAULT '',
+    keywords TEXT NOT NULL DEFAULT '',
+    preview TEXT NOT NULL DEFAULT '',
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports(created_at);
+CREATE INDEX IF NOT EXISTS reports_technician ON reports(technician);
+CREATE INDEX IF NOT EXISTS reports_customer ON reports(customer);
+"""
+# Trigrams (SQLite >= 3.34) match inside German compounds: "pumpe" -> "Wärmepumpe"
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+    body, technician, customer, keywords, tokenize = 'trigram'
+);
+"""
+FTS_COLUMNS = ("body", "technician", "customer", "keywords")
+# Without FTS5 the body lives in a plain table and is searched with LIKE
+PLAIN_SCHEMA = "CREATE TABLE IF NOT EXISTS reports_text (rowid INTEGER PRIMARY KEY, body TEXT NOT NULL);"
+
+
+_STEMS = sorted({**DEVICE_KEYWORDS, **FAULT_KEYWORDS}.items(), key=lambda item: -len(item[0]))
+
+
+# Capitalised words that follow a name in a report sentence but are no name
+# ("bei Familie Schmidt Therme kaputt"); device and fault words count too
+REPORT_NOUNS = {
+    "heizung", "anlage", "gerät", "wohnung", "haus", "keller", "bad", "küche", "dach", "gas", "wasser",
+    "warmwasser", "rohr", "leitung", "termin", "montag", "dienstag", "mittwoch", "donnerstag", "freitag",
+    "samstag", "sonntag", "heute", "gestern", "morgen", "problem", "fehler", "code", "druck", "störung",
+}
+
+
+def _is_report_noun(word):
+    lowered = word.casefold()
+    return lowered in REPORT_NOUNS or any(stem in lowered for stem, _ in _STEMS)
+
+
+def _customer_name(match):
+    """Customer name from a CUSTOMER_RE match; a second word only if it is no known noun."""
+    title, name, second = match.groups()
+    if second and not _is_report_noun(second):
+        name = f"{name} {second}"
+    return f"{title}{name}" if title else name
+
+
+def extract_keywords(text):
+    """Device, fault and error-code keywords mentioned in a report."""
+    lowered = text.casefold()
+    found = set()
+    for stem, keyword in _STEMS:
+        if stem in lowered:
+            found.add(keyword)
+            # "Wärmepumpe" must not also count as "Pumpe"
+            lowered = lowered.replace(stem, " ")
+    for spoken, code in ERROR_CODE_RE.findall(text):
+        code = (spoken or code).replace(" ", "").upper()
+        found.add(code if not code.isdigit() else f"Code {code}")
+    return sorted(found)
+
+
+def parse_report(text, name=""):
+    """Index fields of one report file: created_at, technician, customer, keywords, body."""
+    header = {k.casefold(): v for k, v in HEADER_RE.findall(text)}
+    technician = header.get("techniker", "")
+    customer = header.get("kunde", "")
+    if not technician:
+        m = TECHNICIAN_RE.search(text)
+        technician = m.group(1) if m else ""
+    if not customer:
+        m = CUSTOMER_RE.search(text)
+        customer = _customer_name(m) if m else ""
+
+    m = FILENAME_TS_RE.search(name)
+    created_at = (datetime.strptime(m.group(1), "%Y-%m-%d_%H-%M-%S").isoformat(sep=" ")
+                  if m else datetime.now().isoformat(sep=" ", timespec="seconds"))
+    # Body without the "HVAC Report – ..." header block
+    body = text.split("=" * 50, 1)[-1]
+    body = HEADER_RE.sub("", body).strip()
+    return {
+        "created_at": created_at,
+        "technician": technician.strip(),
+        "customer": customer.strip(),
+        "keywords": KEYWORD_SEP.join(extract_keywords(body)),
+        "body": body,
+    }
+
+
+class ReportStore:
+    """SQLite index over a report folder; safe to share between Streamlit sessions."""
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.folder / DB_NAME
+        self._lock = threading.Lock()
+        self._folder_mtime = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            old_fts = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'reports_fts'").fetchone()
+            if old_fts and "trigram" not in old_fts["sql"]:
+                # Index of an older version (word tokenizer): rebuilt by the next sync
+                conn.execute("DROP TABLE reports_fts")
+                conn.execute("DELETE FROM reports")
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                conn.executescript(PLAIN_SCHEMA)
+                self.fts = False
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: Streamlit runs sessions on different threads
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:  # commit or roll back
+                yield conn
+        finally:
+            conn.close()
+
+    # ----- indexing -----
+    def _upsert(self, conn, name, text, mtime):
+        fields = parse_report(text, name)
+        row = conn.execute("SELECT id FROM reports WHERE name = ?", (name,)).fetchone()
+        values = (fields["created_at"], fields["technician"], fields["customer"], fields["keywords"],
+                  fields["body"][:200], mtime)
+        if row:
+            report_id = row["id"]
+            conn.execute("UPDATE reports SET created_at=?, technician=?, customer=?, keywords=?, preview=?, mtime=? "
+                         "WHERE id=?", values + (report_id,))
+        else:
+            report_id = conn.execute("INSERT INTO reports (created_at, technician, customer, keywords, preview, mtime, name) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?)", values + (name,)).lastrowid
+        if self.fts:
+            conn.execute("DELETE FROM reports_fts WHERE rowid = ?", (report_id,))
+            conn.execute("INSERT INTO reports_fts (rowid, body, technician, customer, keywords) VALUES (?, ?, ?, ?, ?)",
+                         (report_id, fields["body"], fields["technician"], fields["customer"], fields["keywords"]))
+        else:
+            conn.execute("INSERT OR REPLACE INTO reports_text (rowid, body) VALUES (?, ?)", (report_id, fields["body"]))
+
+    def add(self, path):
+        """Index a report that was just written."""
+        path = Path(path)
+        with self._lock, self._connect() as conn:
+            self._upsert(conn, path.name, path.read_text(encoding="utf-8", errors="ignore"), path.stat().st_mtime)
+
+    def sync(self, force=False):
+        """Index new/changed report files and drop deleted ones; returns the number of changes."""
+        try:
+            folder_mtime = self.folder.stat().st_mtime
+        except FileNotFoundError:
+            return 0
+        if not force and folder_mtime == self._folder_mtime:
+            return 0
+        changes = 0
+        with self._lock, self._connect() as conn:
+            known = {r["name"]: r["mtime"] for r in conn.execute("SELECT name, mtime FROM reports")}
+            on_disk = set()
+            for entry in os.scandir(self.folder):
+                if not (entry.name.startswith("report_") and entry.name.endswith(".txt")):
+                    continue
+                on_disk.add(entry.name)
+                mtime = entry.stat().st_mtime
+                if known.get(entry.name) != mtime:
+                    with open(entry.path, encoding="utf-8", errors="ignore") as f:
+                        self._upsert(conn, entry.name, f.read(), mtime)
+                    changes += 1
+            for name in known.keys() - on_disk:
+                report_id = conn.execute("SELECT id FROM reports WHERE name = ?", (name,)).fetchone()["id"]
+                conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+                conn.execute(f"DELETE FROM {'reports_fts' if self.fts else 'reports_text'} WHERE rowid = ?", (report_id,))
+                changes += 1
+        # Taken after the commit: the database journal lives in the same folder
+        self._folder_mtime = self.folder.stat().st_mtime
+        return changes
+
+    # ----- queries -----
+    def _where(self, query="", technician="", customer="", keyword=""):
+        clauses, params = [], []
+        if query.strip():
+            if self.fts:
+                # Every word as a substring: "pumpe undicht" finds "Wärmepumpe ... undichte".
+                # Trigrams need three characters; shorter words are matched with LIKE
+                terms = re.findall(r"\w+", query)
+                long_terms = [t for t in terms if len(t) >= 3]
+                if long_terms:
+                    clauses.append("r.id IN (SELECT rowid FROM reports_fts WHERE reports_fts MATCH ?)")
+                    params.append(" ".join(f'"{t}"' for t in long_terms))
+                for term in terms:
+                    if len(term) < 3:
+                        clauses.append("r.id IN (SELECT rowid FROM reports_fts WHERE "
+                                       + " OR ".join(f"{c} LIKE ?" for c in FTS_COLUMNS) + ")")
+                        params += [f"%{term}%"] * len(FTS_COLUMNS)
+            else:
+                for term in query.split():
+                    clauses.append("(t.body LIKE ? OR r.technician LIKE ? OR r.customer LIKE ? OR r.keywords LIKE ?)")
+                    params += [f"%{term}%"] * 4
+        if technician:
+            clauses.append("r.technician = ?")
+            params.append(technician)
+        if customer:
+            clauses.append("r.customer LIKE ?")
+            params.append(f"%{customer}%")
+        if keyword:
+            clauses.append("(? || r.keywords || ?) LIKE ?")
+            params += [KEYWORD_SEP, KEYWORD_SEP, f"%{KEYWORD_SEP}{keyword}{KEYWORD_SEP}%"]
+        join = "" if self.fts else " JOIN reports_text t ON t.rowid = r.id"
+        return join + (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM reports r{where}", params).fetchone()[0]
+
+    def search(self, page=1, page_size=PAGE_SIZE, **filters):
+        """One page of matching reports, newest first, as dicts."""
+        where, params = self._where(**filters)
+        offset = max(0, page - 1) * page_size
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT r.id, r.name, r.created_at, r.technician, r.customer, r.keywords, r.preview "
+                f"FROM reports r{where} ORDER BY r.created_at DESC, r.id DESC LIMIT ? OFFSET ?",
+                params + [page_size, offset],
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def technicians(self):
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT DISTINCT technician FROM reports WHERE technician != '' ORDER BY technician")]
+
+    def keywords(self):
+        with self._connect() as conn:
+            found = set()
+            for (kw,) in conn.execute("SELECT DISTINCT keywords FROM reports WHERE keywords != ''"):
+                found.update(kw.split(KEYWORD_SEP))
+        return sorted(found)
+
+    def path(self, name):
+        return self.folder / name
@@ -0,0 +1,143 @@
+"""Block requests the scrapers and form fillers never use.
+
+Contact forms and shop result pages pull in hero images, web fonts, videos,
+chat widgets and third-party trackers. None of them is needed to read or
+fill the DOM, but they cost bandwidth and keep pages from finishing. One
+block list is applied to both browser stacks:
+
+* Playwright: ``block_playwright(context)`` / ``await block_playwright_async(context)``
+  installs a ``route`` handler that aborts requests by resource type and domain.
+* Selenium/Chrome: ``block_selenium_options(options)`` disables images via
+  prefs before the driver starts, ``block_selenium(driver)`` blocks the
+  remaining URL patterns through the DevTools protocol.
+
+Stylesheets and scripts are kept (CSS decides which fields are visible, and
+forms and product grids are often rendered by JS), and so are consent
+managers and captchas, which the flows have to click through. The lists can
+be changed with ``BLOCK_RESOURCE_TYPES`` (comma separated, "none" disables
+type blocking) and ``BLOCK_DOMAINS`` (extra domains, comma separated).
+"""
+import os
+from urllib.parse import urlsplit
+
+from metrics import BLOCKED_REQUESTS
+
+# Playwright resource types
+DEFAULT_RESOURCE_TYPES = ("image", "media", "font")
+
+# Analytics, ads, chat and video widgets (subdomains are matched too). Only hosts
+# that serve nothing but widgets: Selenium cannot exempt the page itself
+DEFAULT_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googleadservices.com", "doubleclick.net",
+    "googlesyndication.com", "connect.facebook.net", "hotjar.com", "hotjar.io", "clarity.ms",
+    "bat.bing.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com",
+    "px.ads.linkedin.com", "snap.licdn.com", "static.ads-twitter.com", "analytics.tiktok.com",
+    "ct.pinterest.com", "matomo.cloud", "etracker.com", "mouseflow.com", "nr-data.net",
+    "js-agent.newrelic.com", "intercom.io", "intercomcdn.com", "zdassets.com", "zopim.com",
+    "embed.tawk.to", "client.crisp.chat", "cdn.livechatinc.com",
+    "widget.trustpilot.com", "ytimg.com", "youtube-nocookie.com", "player.vimeo.com", "vimeocdn.com",
+)
+
+# Chrome's network layer sees URLs, not resource types: block those by file extension
+_TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "media": ("mp4", "webm", "ogg", "mp3", "m3u8", "mov"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+}
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return tuple(default)
+    if value.strip().lower() == "none":
+        return ()
+    return tuple(v.strip().lower() for v in value.split(",") if v.strip())
+
+
+def get_block_list(resource_types=None, domains=None):
+    """Block list from the arguments, else from the environment, else the defaults."""
+    if resource_types is None:
+        resource_types = _env_list("BLOCK_RESOURCE_TYPES", DEFAULT_RESOURCE_TYPES)
+    if domains is None:
+        domains = DEFAULT_DOMAINS + _env_list("BLOCK_DOMAINS", ())
+    return {"resource_types": frozenset(resource_types), "domains": tuple(domains)}
+
+
+def blocked_reason(resource_type, url, block_list):
+    """"type", "domain" or None if the request may pass."""
+    if resource_type in block_list["resource_types"]:
+        return "type"
+    host = (urlsplit(url).hostname or "").lower()
+    for domain in block_list["domains"]:
+        if host == domain or host.endswith("." + domain):
+            return "domain"
+    return None
+
+
+# ----- Playwright -----
+def _is_page(request):
+    """The page's own navigation is never blocked, whatever its domain."""
+    return request.is_navigation_request() and request.frame.parent_frame is None
+
+
+def block_playwright(context, block_list=None):
+    """Abort unneeded requests in a sync-API browser context."""
+    block_list = block_list or get_block_list()
+
+    def handle(route):
+        request = route.request
+        reason = None if _is_page(request) else blocked_reason(request.resource_type, request.url, block_list)
+        if reason:
+            BLOCKED_REQUESTS.inc(engine="playwright", reason=reason)
+            route.abort()
+        else:
+            route.continue_()
+
+    context.route("**/*", handle)
+
+
+async def block_playwright_async(context, block_list=None):
+    """``block_playwright`` for the async API."""
+    block_list = block_list or get_block_list()
+
+    async def handle(route):
+        request = route.request
+        reason = None if _is_page(request) else blocked_reason(request.resource_type, request.url, block_list)
+        if reason:
+            BLOCKED_REQUESTS.inc(engine="playwright", reason=reason)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+
+
+# ----- Selenium (Chrome) -----
+def block_selenium_options(options, block_list=None):
+    """Chrome prefs set before the driver starts: no images."""
+    block_list = block_list or get_block_list()
+    if "image" in block_list["resource_types"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def block_selenium(driver, block_list=None):
+    """Block fonts, media and the tracker domains through the DevTools protocol.
+
+    Returns False if the driver has no DevTools access (not Chrome/Chromium).
+    """
+    block_list = block_list or get_block_list()
+    patterns = []
+    for resource_type in sorted(block_list["resource_types"]):
+        for ext in _TYPE_EXTENSIONS.get(resource_type, ()):
+            # Anchored at the end or the query: "*.ico*" would also match www.icons.de
+            patterns += [f"*.{ext}", f"*.{ext}?*"]
+    patterns.extend(f"*://*.{domain}/*" for domain in block_list["domains"])
+    patterns.extend(f"*://{domain}/*" for domain in block_list["domains"])
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception:
+        return False
+    return True
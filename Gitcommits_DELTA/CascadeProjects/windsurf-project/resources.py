@@ -0,0 +1,182 @@
+"""Process-wide singletons shared by all Streamlit sessions.
+
+Streamlit re-executes the script on every widget interaction. Everything
+that is expensive to build and safe to share is created here once per
+process with ``st.cache_resource``: the settings from ``.env`` and
+``st.secrets``, the OpenAI client and the rate-limited LLM gateway built on
+it, a pooled HTTP session, the data folders, the warm browser pool, the
+parallel form runner and the form mapping cache. Compiled regexes are plain
+constants of this module, which is imported once per process as well.
+
+``invalidate()`` drops all singletons (``invalidate("openai_client")`` a
+single one); they are rebuilt on next use, e.g. after changing the API key.
+"""
+import os
+import re
+
+import streamlit as st
+
+from features import FeatureUnavailable, require
+
+HTTP_POOL_SIZE = 16  # keep-alive connections per host
+
+# Compiled once per process
+PHONE_RE = re.compile(r'\b(?:\+49|0)[1-9][0-9\s\-]{7,}\b')
+JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+FILENAME_UNSAFE_RE = re.compile(r'[^A-Za-z0-9]')
+
+
+@st.cache_resource(show_spinner=False)
+def get_settings():
+    """Read the environment once: ``.env`` (if python-dotenv is installed), then ``st.secrets``."""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass  # On Streamlit Cloud, use st.secrets instead
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        try:
+            # A bare st.secrets access renders an error without secrets.toml,
+            # which breaks the following st.set_page_config
+            api_key = st.secrets.get("OPENAI_API_KEY") if st.secrets.load_if_toml_exists() else None
+        except Exception:  # malformed secrets.toml
+            api_key = None
+    return {"openai_api_key": api_key}
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    """Return (mode, client) for the installed OpenAI SDK; mode is "new", "legacy" or None.
+
+    The SDK is only imported when an AI feature is first used.
+    """
+    api_key = get_settings()["openai_api_key"]
+    try:
+        require("openai")
+    except FeatureUnavailable:
+        return None, None
+    try:
+        # New SDK (>=1.0): from openai import OpenAI
+        from openai import OpenAI
+        return "new", OpenAI(api_key=api_key)
+    except Exception:
+        try:
+            # Legacy SDK (<1.0): import openai and set api_key
+            import openai as openai_legacy
+            openai_legacy.api_key = api_key
+            return "legacy", openai_legacy
+        except Exception:
+            return None, None
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm_gateway():
+    """Async, rate-limited and retrying client for all LLM calls (see llm_gateway)."""
+    from llm_gateway import LLMGateway
+    mode, _ = get_openai_client()
+    return LLMGateway(mode, get_settings()["openai_api_key"])
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """requests.Session with a keep-alive connection pool, shared by all sessions."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_folders(*folders):
+    """Create the data folders once per process."""
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    return folders
+
+
+@st.cache_resource(show_spinner=False)
+def get_browser_pool():
+    """Warm Playwright browsers for form automation (launched on first lease)."""
+    import atexit
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool()
+    atexit.register(pool.shutdown)
+    return pool
+
+
+@st.cache_resource(show_spinner=False)
+def get_form_runner():
+    """Async Playwright runner for processing many form URLs in parallel."""
+    from form_runner import FormRunner
+    return FormRunner()
+
+
+@st.cache_resource(show_spinner=False)
+def get_form_cache():
+    """Persistent cache of LLM form mappings (SQLite in the working directory)."""
+    from form_cache import FormCache
+    return FormCache()
+
+
+def close_browser_pool():
+    """Close all pooled browsers; a new pool is created on next use."""
+    get_browser_pool().shutdown()
+    get_browser_pool.clear()
+
+
+# The browser pool and form runner are not listed: their browsers must be closed
+RESOURCES = {
+    "settings": get_settings,
+    "openai_client": get_openai_client,
+    "llm_gateway": get_llm_gateway,
+    "http_session": get_http_session,
+    "folders": ensure_folders,
+    "form_cache": get_form_cache,
+}
+# Rebuilding a resource also rebuilds the ones created from it
+DEPENDENTS = {"settings": ("openai_client", "llm_gateway"), "openai_client": ("llm_gateway",)}
+
+
+def invalidate(*names):
+    """Drop the named singletons (all if none given); they are rebuilt on next use."""
+    names = set(names or RESOURCES)
+    for name in list(names):
+        names.update(DEPENDENTS.get(name, ()))
+    if "settings" in names:
+        # get_settings' load_dotenv() keeps variables that are already set,
+        # so a changed .env would never be read again
+        try:
+            from dotenv import load_dotenv
+            load_dotenv(override=True)
+        except ImportError:
+            pass
+    for name in names:
+        # Not closed: another session may still be using the old object
+        RESOURCES[name].clear()
+
+
+def render_resource_panel():
+    """Streamlit expander to rebuild the shared resources."""
+    with st.expander("♻️ Gemeinsame Ressourcen"):
+        st.caption("OpenAI-Client, HTTP-Verbindungen, Einstellungen und Browser werden einmal pro Prozess "
+                   "erstellt und von allen Sitzungen geteilt.")
+        if st.button("Ressourcen neu laden", key="resources_invalidate",
+                     help="z.B. nach Änderung des API-Schlüssels in .env oder secrets.toml"):
+            invalidate()
+            st.rerun()
+        cache = get_form_cache().stats()
+        st.caption(f"Formular-Cache: {cache['entries']} Zuordnungen, {cache['hits']} Treffer "
+                   "(KI-Felderkennung übersprungen)")
+        browsers = get_browser_pool().status()
+        if browsers:
+            st.dataframe(browsers, use_container_width=True, hide_index=True)
+            if st.button("Browser schließen", key="resources_close_browsers",
+                         help="Beim nächsten Formular wird ein neuer Browser gestartet"):
+                close_browser_pool()
+                st.rerun()
@@ -0,0 +1,97 @@
+"""Pluggable speech recognition backends for the Transkriber.
+
+``SPEECH_BACKEND`` selects the engine:
+
+- ``google`` (default): ``recognize_google``, needs network access. Audio
+  is resampled to 16 kHz and uploaded as FLAC (``FlacPayload``).
+- ``vosk``: offline, CPU-only Kaldi model. ``VOSK_MODEL_PATH`` points to
+  an unpacked model (default ``models/vosk-model-small-de-0.15``); the
+  model is loaded once and shared by all recognitions.
+
+Every backend exposes ``recognize(audio) -> str`` and raises the usual
+``sr.UnknownValueError`` / ``sr.RequestError``, so callers handle all
+engines the same way. Load backends through ``load_backend`` and cache the
+result (``st.cache_resource`` in app.py).
+"""
+import json
+import os
+from pathlib import Path
+
+import speech_recognition as sr
+
+from audio_processing import FlacPayload
+from instrumentation import span
+from metrics import SPEECH_UPLOAD_BYTES
+
+DEFAULT_BACKEND = "google"
+DEFAULT_VOSK_MODEL = Path(__file__).resolve().parent / "models" / "vosk-model-small-de-0.15"
+
+
+class GoogleBackend:
+    """Google Web Speech API via speech_recognition (online)."""
+
+    name = "google"
+    offline = False
+
+    def __init__(self, language="de-DE"):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        payload = FlacPayload(audio)
+        try:
+            with span("speech.google"):
+                return self._recognizer.recognize_google(payload, language=self.language)
+        finally:
+            if payload.flac_bytes:
+                SPEECH_UPLOAD_BYTES.inc(payload.source_bytes, stage="raw")
+                SPEECH_UPLOAD_BYTES.inc(payload.flac_bytes, stage="sent")
+
+
+class VoskBackend:
+    """Offline Kaldi recognition with a resident Vosk model."""
+
+    name = "vosk"
+    offline = True
+    sample_rate = 16000
+
+    def __init__(self, model_path=None, language="de-DE"):
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("Vosk ist nicht installiert (pip install vosk)") from e
+        model_path = Path(model_path or os.getenv("VOSK_MODEL_PATH") or DEFAULT_VOSK_MODEL)
+        if not model_path.is_dir():
+            raise RuntimeError(f"Vosk-Modell nicht gefunden: {model_path}")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.language = language
+        with span("speech.vosk_load_model"):
+            self.model = vosk.Model(str(model_path))
+
+    def recognize(self, audio):
+        # A KaldiRecognizer is cheap; the Model is shared, so this is thread-safe
+        with span("speech.vosk"):
+            recognizer = self._vosk.KaldiRecognizer(self.model, self.sample_rate)
+            recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+            text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def configured_backend():
+    """Backend name from ``SPEECH_BACKEND`` (falls back to the default)."""
+    name = (os.getenv("SPEECH_BACKEND") or DEFAULT_BACKEND).strip().lower()
+    return name if name in BACKENDS else DEFAULT_BACKEND
+
+
+def load_backend(name=None, language="de-DE"):
+    """Instantiate a backend; raises RuntimeError if it cannot be used here."""
+    return BACKENDS[name or configured_backend()](language=language)
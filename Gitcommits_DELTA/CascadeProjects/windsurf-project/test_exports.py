@@ -0,0 +1,39 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from exports import iter_chunks, write_export
+
+
+def test_iter_chunks_sizes():
+    rows = [{"a": i} for i in range(5)]
+    assert [len(c) for c in iter_chunks(rows, chunk_rows=2)] == [2, 2, 1]
+    assert [len(c) for c in iter_chunks(pd.DataFrame(rows), chunk_rows=2)] == [2, 2, 1]
+
+
+def test_empty_export_keeps_the_header():
+    out = write_export([], columns=["title", "phone"])
+    assert out.read().decode("utf-8").strip() == "title,phone"
+    out = write_export(pd.DataFrame(columns=["title"]), compression="gzip")
+    assert gzip.decompress(out.read()).decode("utf-8").strip() == "title"
+
+
+def test_csv_chunks_write_one_header():
+    out = write_export([{"a": i} for i in range(5)], chunk_rows=2)
+    assert out.read().decode("utf-8").split() == ["a", "0", "1", "2", "3", "4"]
+
+
+def test_parquet_column_that_starts_empty():
+    pytest.importorskip("pyarrow")
+    rows = [{"title": "A", "phone": None}, {"title": "B", "phone": "030 123"}, {"title": "C", "phone": 12}]
+    out = write_export(rows, fmt="parquet", chunk_rows=1)
+    frame = pd.read_parquet(io.BytesIO(out.read()))
+    assert frame["phone"].tolist() == [None, "030 123", "12"]
+
+
+def test_parquet_type_drift_is_reported():
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError, match="Spalte n"):
+        write_export([{"n": 1}, {"n": "x"}], fmt="parquet", chunk_rows=1)
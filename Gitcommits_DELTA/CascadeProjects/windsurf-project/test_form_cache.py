@@ -0,0 +1,33 @@
+from form_cache import FormCache, choose_form, domain_of, form_fingerprint, parse, selectors_resolve
+
+FORM = '<form><input type="hidden" name="csrf" value="{token}"><input name="email"><textarea name="msg"></textarea>' \
+       '<button type="submit">{label}</button></form>'
+
+
+def _fingerprint(html):
+    return form_fingerprint(choose_form(parse(html)))
+
+
+def test_fingerprint_ignores_tokens_and_wording():
+    assert _fingerprint(FORM.format(token="a1", label="Senden")) == _fingerprint(FORM.format(token="b2", label="Absenden"))
+
+
+def test_fingerprint_changes_with_the_fields():
+    changed = FORM.replace('<input name="email">', '<input name="mail">')
+    assert _fingerprint(FORM.format(token="", label="")) != _fingerprint(changed.format(token="", label=""))
+
+
+def test_selectors_resolve():
+    soup = parse(FORM.format(token="", label=""))
+    assert selectors_resolve(soup, {"email": "[name='email']", "message": None})
+    assert not selectors_resolve(soup, {"email": "#gone"})
+
+
+def test_cache_round_trip(tmp_path):
+    cache = FormCache(str(tmp_path / "cache.db"))
+    html = FORM.format(token="", label="")
+    mapping, key = cache.lookup("https://www.example.de/kontakt", html)
+    assert mapping is None and key is not None
+    cache.store(key, {"email": "[name='email']"})
+    assert cache.lookup("https://example.de/kontakt", html)[0] == {"email": "[name='email']"}
+    assert domain_of("https://WWW.Example.de/x") == "example.de"
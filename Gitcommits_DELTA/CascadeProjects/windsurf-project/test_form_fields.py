@@ -0,0 +1,27 @@
+from form_cache import parse
+from form_fields import choose_form, css_selector, extract_form_fields_regex, selector_mapping
+
+TOKEN_FORM = '<form id="search"><input type="hidden" name="a"><input type="hidden" name="b"><input name="q"></form>'
+CONTACT_FORM = ('<form id="contact"><input id="1-email" type="email"><input id="form:name" name="name">'
+                '<input name="it\'s" placeholder="Telefon"><textarea name="msg"></textarea></form>')
+
+
+def test_css_selector_escapes_ids_that_are_no_identifier():
+    fields = parse(CONTACT_FORM).find_all(["input", "textarea"])
+    assert [css_selector(f) for f in fields] == ["[id='1-email']", "[id='form:name']", "[name='it\\'s']", "[name='msg']"]
+    assert css_selector(parse('<input id="email">').input) == "#email"
+    assert css_selector(parse("<input>").input) is None
+
+
+def test_choose_form_ignores_hidden_inputs():
+    assert choose_form(parse(TOKEN_FORM + CONTACT_FORM))["id"] == "contact"
+    assert choose_form(parse('<form><input type="hidden" name="t"></form>')) is None
+
+
+def test_regex_selectors_resolve_on_the_page():
+    html = TOKEN_FORM + CONTACT_FORM
+    mapping = selector_mapping(extract_form_fields_regex(html))
+    assert mapping == {"email": "[id='1-email']", "name": "[id='form:name']", "phone": "[name='it\\'s']",
+                       "message": "[name='msg']"}
+    soup = parse(html)
+    assert all(soup.select_one(selector) is not None for selector in mapping.values())
@@ -0,0 +1,28 @@
+from form_html import compact_form_html
+
+PAGE = """<html><head><script>var tracking = 1;</script><style>body {}</style></head><body>
+<nav><a href="/">Start</a><svg><path d="M0 0"/></svg></nav>
+<form id="newsletter"><input type="email" name="nl"></form>
+<label for="msg">Ihre Nachricht</label>
+<div class="footer"><form id="kontakt" class="contact-form" data-tracking="x">
+  <div class="row"><input id="email" type="email" placeholder="E-Mail" value="prefilled"></div>
+  <input type="hidden" name="csrf" value="secret">
+  <textarea id="msg"></textarea>
+</form></div></body></html>"""
+
+
+def test_keeps_fields_and_outside_labels():
+    html = compact_form_html(PAGE)
+    assert html.index('id="kontakt"') < html.index('id="newsletter"')  # most visible fields first
+    assert 'placeholder="E-Mail"' in html and '<textarea id="msg">' in html
+    assert '<label for="msg">Ihre Nachricht</label>' in html
+
+
+def test_drops_noise():
+    html = compact_form_html(PAGE)
+    for noise in ("<script", "<style", "<svg", "csrf", "secret", "prefilled", "data-tracking", 'class="row"'):
+        assert noise not in html
+
+
+def test_no_fields_means_nothing_to_send():
+    assert compact_form_html("<html><body><p>Impressum</p></body></html>") == ""
@@ -0,0 +1,29 @@
+import gzip
+
+from job_discovery import _decompressed, iter_sitemap, parse_lastmod
+
+SITEMAP = (b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+           b'<url><loc>https://example.de/jobs/1</loc><lastmod>2024-05-01</lastmod></url>'
+           b'<url><loc>https://example.de/impressum</loc></url></urlset>')
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_decompressed_detects_gzip_by_magic_bytes():
+    # Split after the first byte: the magic bytes arrive in two chunks
+    assert b"".join(_decompressed(_split(gzip.compress(SITEMAP), 1))) == SITEMAP
+    assert b"".join(_decompressed(_split(SITEMAP, 7))) == SITEMAP
+    assert b"".join(_decompressed([b"x"])) == b"x"
+
+
+def test_iter_sitemap():
+    entries = list(iter_sitemap(_decompressed(_split(gzip.compress(SITEMAP), 16))))
+    assert entries == [("url", "https://example.de/jobs/1", "2024-05-01"), ("url", "https://example.de/impressum", None)]
+
+
+def test_parse_lastmod():
+    assert parse_lastmod("2024-05-01T10:00:00Z").utcoffset().total_seconds() == 0
+    assert parse_lastmod("2024-05-01").tzinfo is not None
+    assert parse_lastmod("gestern") is None
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from llm_gateway import TokenBucket, estimate_tokens
+
+
+def test_bucket_allows_a_burst_of_one_minute():
+    bucket = TokenBucket(600)
+    start = time.monotonic()
+    asyncio.run(bucket.acquire(600))
+    assert time.monotonic() - start < 0.5
+    assert bucket.tokens < 1
+
+
+def test_bucket_waits_for_the_refill():
+    bucket = TokenBucket(600)  # 10 per second
+    bucket.tokens = 0
+    start = time.monotonic()
+    asyncio.run(bucket.acquire(3))
+    assert 0.25 <= time.monotonic() - start < 1.5
+
+
+def test_adjust_may_go_negative_but_not_above_capacity():
+    bucket = TokenBucket(60)
+    bucket.adjust(100)
+    assert bucket.tokens < 0
+    bucket.adjust(-1000)
+    assert bucket.tokens == bucket.capacity
+
+
+def test_estimate_tokens():
+    messages = [{"role": "user", "content": "x" * 400}, {"role": "system", "content": None}]
+    assert estimate_tokens(messages, {"max_tokens": 50}) == 150
@@ -0,0 +1,39 @@
+import pytest
+
+from plz_index import PLZIndex, get_index, haversine_km, normalize_location
+
+ROWS = [("10", "Berlin", 52.52, 13.405), ("10115", "Berlin", 52.5323, 13.3846),
+        ("20", "Hamburg", 53.5511, 9.9937), ("14193", "Berlin", 52.4848, 13.2617)]
+
+
+def test_haversine_berlin_hamburg():
+    assert haversine_km(52.52, 13.405, 53.5511, 9.9937) == pytest.approx(255, abs=3)
+
+
+def test_lookup_plz_falls_back_to_region():
+    index = PLZIndex(ROWS)
+    assert index.lookup_plz("10115")[0] == "10115"
+    assert index.lookup_plz("10999")[0] == "10"
+    assert index.lookup_plz("99999") is None
+    assert not index.region_level
+
+
+def test_within_radius():
+    keys, dist = PLZIndex(ROWS).within(52.52, 13.405, 30)
+    assert set(keys) == {"10", "10115", "14193"}
+    assert max(dist) < 30
+
+
+def test_bundled_regions_are_region_level():
+    assert get_index().region_level
+
+
+@pytest.mark.parametrize("text, ort", [("10115 Berlin", "Berlin"), ("Köln-Ehrenfeld", "Köln"),
+                                        ("Hamburg, HH", "Hamburg"), ("D-80331 München", "München")])
+def test_normalize_location(text, ort):
+    assert normalize_location(text)[1] == ort
+
+
+def test_unknown_location():
+    assert normalize_location("Homeoffice") is None
+    assert normalize_location("N/A") is None
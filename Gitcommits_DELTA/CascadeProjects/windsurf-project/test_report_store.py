@@ -0,0 +1,43 @@
+import pytest
+
+from report_store import ReportStore, parse_report
+
+
+@pytest.mark.parametrize("text, customer", [
+    ("Heute bei Familie Schmidt Therme kaputt, Fehlercode F28.", "Schmidt"),
+    ("Kunde Müller. Wärmepumpe pfeift.", "Müller"),
+    ("Kundin Anna Weber meldet: Heizung kalt.", "Anna Weber"),
+    ("Termin bei Frau Dr. Berg wegen Druckverlust.", "Dr. Berg"),
+    ("Kunde Meier Wärmepumpe Störung E119", "Meier"),
+    ("Familie Schulz Montag Wartung", "Schulz"),
+    ("Kunde: Hoffmann GmbH\nTherme entkalkt.", "Hoffmann GmbH"),
+    ("Therme entkalkt, alles in Ordnung.", ""),
+])
+def test_customer(text, customer):
+    assert parse_report(text)["customer"] == customer
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "report_2024-05-01_10-00-00.txt").write_text("Kunde Meier. Wärmepumpe undicht, Fehler E5.",
+                                                            encoding="utf-8")
+    (tmp_path / "report_2024-05-02_10-00-00.txt").write_text("Bei Familie Schmidt Therme kaputt.", encoding="utf-8")
+    store = ReportStore(tmp_path)
+    store.sync()
+    return store
+
+
+@pytest.mark.parametrize("query, day", [("pumpe", "2024-05-01"), ("PUMPE undicht", "2024-05-01"),
+                                        ("E5", "2024-05-01"), ("therme", "2024-05-02")])
+def test_search_matches_inside_compounds(store, query, day):
+    assert [r["created_at"][:10] for r in store.search(query=query)] == [day]
+
+
+def test_search_without_match(store):
+    assert store.count(query="Abgasrohr") == 0
+
+
+def test_deleted_report_leaves_the_index(store, tmp_path):
+    (tmp_path / "report_2024-05-02_10-00-00.txt").unlink()
+    store.sync(force=True)
+    assert store.count() == 1
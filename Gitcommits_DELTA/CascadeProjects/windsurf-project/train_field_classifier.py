@@ -0,0 +1,191 @@
+"""Train the local form field classifier (field_classifier.py).
+
+Usage (from the project root):
+
+    python train_field_classifier.py                          # seed data + field_examples.jsonl
+    python train_field_classifier.py --examples a.jsonl b.jsonl
+    python train_field_classifier.py --no-seed --epochs 30
+
+The training data is the field log written whenever the LLM maps a form
+(``FIELD_EXAMPLES_LOG``), plus generated seed examples from the German and
+English field vocabulary below, so a useful model exists before anything
+was logged. Logged examples are weighted higher than seed examples. The
+model is plain multinomial logistic regression trained with SGD; the
+result is written to field_weights.json.gz and a held-out accuracy is
+printed.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from field_classifier import CLASSES, DIM, EXAMPLES_LOG, WEIGHTS_FILE, FieldClassifier, features
+
+# ===== SEED DATA =====
+# class -> (identifier words, label/placeholder texts, input types, autocomplete values)
+SEED_VOCAB = {
+    "first_name": (["vorname", "first name", "firstname", "fname", "given name", "forename", "first"],
+                   ["Vorname", "Ihr Vorname", "First name", "Given name", "Vorname*"],
+                   ["text"], ["given-name"]),
+    "last_name": (["nachname", "last name", "lastname", "lname", "surname", "family name", "last"],
+                  ["Nachname", "Ihr Nachname", "Last name", "Surname", "Familienname"],
+                  ["text"], ["family-name"]),
+    "name": (["name", "full name", "fullname", "your name", "contact name", "ihr name", "kontakt name"],
+             ["Name", "Ihr Name", "Vor- und Nachname", "Vollständiger Name", "Full name", "Your name"],
+             ["text"], ["name"]),
+    "email": (["email", "e mail", "mail", "email address", "emailadresse", "your email", "e mail adresse"],
+              ["E-Mail", "E-Mail-Adresse", "Ihre E-Mail", "Email address", "max@beispiel.de"],
+              ["email", "text"], ["email"]),
+    "phone": (["telefon", "phone", "tel", "telefonnummer", "phone number", "mobil", "handy", "telephone",
+               "rufnummer", "mobile", "fon", "phone nr", "tel nr"],
+              ["Telefon", "Telefonnummer", "Rückrufnummer", "Phone", "Mobilnummer", "+49 ..."],
+              ["tel", "text"], ["tel"]),
+    "street": (["strasse", "street", "address", "adresse", "address line1", "hausnummer", "addr1",
+                "strasse hausnummer", "anschrift"],
+               ["Straße", "Straße und Hausnummer", "Straße, Nr.", "Street", "Address line 1", "Anschrift"],
+               ["text"], ["address-line1", "street-address"]),
+    "zip": (["plz", "zip", "postal code", "postcode", "postleitzahl", "zipcode", "zip code", "postal"],
+            ["PLZ", "Postleitzahl", "ZIP code", "Postal code", "z.B. 10115"],
+            ["text", "number"], ["postal-code"]),
+    "city": (["ort", "stadt", "city", "town", "locality", "wohnort", "plz ort"],
+             ["Ort", "Stadt", "Wohnort", "City", "Town"],
+             ["text"], ["address-level2"]),
+    "message": (["nachricht", "message", "comments", "kommentar", "anliegen", "bemerkung", "anfrage",
+                 "your message", "inquiry", "anschreiben", "motivation", "mitteilung", "msg", "comment",
+                 "text", "body", "content"],
+                ["Ihre Nachricht", "Nachricht", "Message", "Wie können wir helfen?", "Ihr Anliegen",
+                 "Bemerkungen", "Your message"],
+                ["textarea"], [""]),
+    "other": (["firma", "company", "unternehmen", "betreff", "subject", "website", "url", "datum", "date",
+               "suche", "search", "q", "s", "passwort", "password", "captcha", "anrede", "salutation",
+               "land", "country", "fax", "newsletter", "rueckruf zeit", "uhrzeit", "geburtsdatum",
+               "position", "titel", "honeypot", "referrer", "gutschein", "menge", "anzahl"],
+               ["Firma", "Unternehmen", "Betreff", "Subject", "Ihre Website", "Wunschtermin", "Suche",
+                "Suchbegriff", "Passwort", "Sicherheitscode", "Anrede", "Land", "Fax", "Geburtsdatum",
+                "Firmenname", "Company"],
+               ["text", "search", "password", "date", "url", "number"], ["", "organization", "off"]),
+}
+PREFIXES = ["", "", "your-", "contact_", "form-field-", "input_", "wpforms-", "kontakt-", "tx-form-", "field_"]
+STYLES = ("snake", "kebab", "camel", "plain", "bracket")
+SEED_PER_CLASS = 600
+LOGGED_WEIGHT = 3  # logged examples are real forms: repeat them
+
+
+def _identifier(words, style, prefix):
+    parts = words.split()
+    if style == "snake":
+        core = "_".join(parts)
+    elif style == "kebab":
+        core = "-".join(parts)
+    elif style == "camel":
+        core = parts[0] + "".join(p.capitalize() for p in parts[1:])
+    elif style == "bracket":
+        return f"data[{'_'.join(parts)}]"
+    else:
+        core = "".join(parts)
+    return prefix + core
+
+
+def seed_examples(rng, per_class=SEED_PER_CLASS):
+    """Synthetic described fields: random identifiers, labels and attributes per class."""
+    examples = []
+    for label, (idents, texts, types, autocompletes) in SEED_VOCAB.items():
+        for _ in range(per_class):
+            kind = rng.choice(types)
+            ident = _identifier(rng.choice(idents), rng.choice(STYLES), rng.choice(PREFIXES))
+            # Real forms are often missing most of these
+            info = {
+                "tag": "textarea" if kind == "textarea" else ("select" if rng.random() < 0.03 else "input"),
+                "type": "" if kind == "textarea" else (kind if rng.random() < 0.9 else ""),
+                "name": ident if rng.random() < 0.85 else "",
+                "id": (ident if rng.random() < 0.5 else f"field{rng.randint(1, 99)}") if rng.random() < 0.7 else "",
+                "placeholder": rng.choice(texts) if rng.random() < 0.4 else "",
+                "aria": rng.choice(texts) if rng.random() < 0.15 else "",
+                "autocomplete": rng.choice(autocompletes) if rng.random() < 0.2 else "",
+                "label": rng.choice(texts) if rng.random() < 0.6 else "",
+            }
+            if not any(info[k] for k in ("name", "id", "placeholder", "aria", "label")):
+                info["name"] = ident
+            examples.append((info, label))
+    return examples
+
+
+def logged_examples(paths):
+    examples = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if row.get("label") in CLASSES and isinstance(row.get("field"), dict):
+                    examples.append((row["field"], row["label"]))
+    return examples
+
+
+# ===== TRAINING =====
+def train(examples, epochs=15, rate=0.3, l2=1e-6, seed=0):
+    """Multinomial logistic regression with plain SGD on hashed features."""
+    rng = random.Random(seed)
+    index = {c: i for i, c in enumerate(CLASSES)}
+    data = [(features(info), index[label]) for info, label in examples]
+    n = len(CLASSES)
+    model = FieldClassifier([0.0] * n, {})
+    bias, weights = model.bias, model.weights
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        step = rate / (1 + epoch)
+        for buckets, target in data:
+            probs = model.probabilities(buckets)
+            grad = [p - (1.0 if i == target else 0.0) for i, p in enumerate(probs)]
+            for i in range(n):
+                bias[i] -= step * grad[i]
+            scale = step / math.sqrt(len(buckets) or 1)
+            for bucket in buckets:
+                row = weights.setdefault(bucket, [0.0] * n)
+                for i in range(n):
+                    row[i] -= scale * grad[i] + step * l2 * row[i]
+    return model
+
+
+def accuracy(model, examples):
+    if not examples:
+        return 0.0
+    return sum(model.predict(info)[0] == label for info, label in examples) / len(examples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="*", default=[EXAMPLES_LOG], help="logged example files (JSON lines)")
+    parser.add_argument("--no-seed", action="store_true", help="train on logged examples only")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--output", default=WEIGHTS_FILE)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    logged = logged_examples(args.examples)
+    seeded = [] if args.no_seed else seed_examples(rng)
+    examples = seeded + logged * LOGGED_WEIGHT
+    if not examples:
+        print("Keine Trainingsdaten.", file=sys.stderr)
+        return 1
+    rng.shuffle(examples)
+    split = max(1, len(examples) // 10)
+    held_out, training = examples[:split], examples[split:]
+
+    model = train(training, epochs=args.epochs)
+    print(f"{len(seeded)} seed + {len(logged)} logged examples, "
+          f"held-out accuracy {accuracy(model, held_out):.3f}")
+    model = train(examples, epochs=args.epochs)  # final model on everything
+    model.save(args.output)
+    print(f"{len(model.weights)} buckets of {DIM} -> {args.output} ({os.path.getsize(args.output) // 1024} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
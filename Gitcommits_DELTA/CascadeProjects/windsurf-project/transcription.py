@@ -0,0 +1,201 @@
+"""Streaming transcription for the Transkriber tab.
+
+``StreamingTranscriber`` records on a listener thread in short segments
+(cut at speech pauses or after ``segment_seconds``) and hands every
+segment to recognition worker threads while recording continues.
+The Streamlit script only polls ``text`` to show partial results, so the
+user waits for one segment instead of the whole recording.
+"""
+import queue
+import threading
+import time
+
+import speech_recognition as sr
+
+from audio_processing import trim_silence
+from instrumentation import span
+from metrics import SPEECH_AUDIO_SECONDS
+from speech_backends import GoogleBackend
+
+SEGMENT_SECONDS = 3       # upper bound for one recognised chunk
+PAUSE_SECONDS = 0.6       # a shorter pause also ends a segment
+RECOGNITION_WORKERS = 2   # segments recognised in parallel, results kept in order
+SILENCE_STOP_SECONDS = 5  # the UI ends the recording after this long without a new segment
+CALIBRATION_SECONDS = 0.5
+CALIBRATION_TTL_SECONDS = 600  # re-measure the room after 10 minutes
+
+# Calibrated energy threshold per input device, shared by all recordings of this process
+_calibration = {}
+_calibration_lock = threading.Lock()
+
+
+def calibrate(recognizer, source, device_index=None):
+    """Use the cached energy threshold of the device or measure it once.
+
+    Returns True if the ambient noise was measured (0.5 s delay), False if
+    the cached threshold was used.
+    """
+    with _calibration_lock:
+        cached = _calibration.get(device_index)
+    if cached and time.monotonic() - cached[1] < CALIBRATION_TTL_SECONDS:
+        recognizer.energy_threshold = cached[0]
+        return False
+    with span("speech.calibrate"):
+        recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_SECONDS)
+    remember_threshold(recognizer, device_index)
+    return True
+
+
+def remember_threshold(recognizer, device_index=None):
+    """Store the threshold (adapted during listening) for the next recording."""
+    with _calibration_lock:
+        _calibration[device_index] = (recognizer.energy_threshold, time.monotonic())
+
+
+def forget_calibration(device_index=None):
+    with _calibration_lock:
+        _calibration.pop(device_index, None)
+
+
+def prepare_for_recognition(audio, recognizer):
+    """VAD step: trim silence with the calibrated threshold and count the saving.
+
+    Returns None if the audio contains no speech.
+    """
+    captured = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    SPEECH_AUDIO_SECONDS.inc(captured, stage="captured")
+    with span("speech.vad"):
+        trimmed = trim_silence(audio, threshold=recognizer.energy_threshold)
+    if trimmed is not None:
+        SPEECH_AUDIO_SECONDS.inc(len(trimmed.frame_data) / (trimmed.sample_rate * trimmed.sample_width), stage="sent")
+    return trimmed
+
+
+class StreamingTranscriber:
+    """Record in short segments and recognise them while recording continues."""
+
+    def __init__(self, language="de-DE", segment_seconds=SEGMENT_SECONDS, workers=RECOGNITION_WORKERS, backend=None,
+                 device_index=None):
+        self.language = language
+        self.device_index = device_index
+        self.backend = backend or GoogleBackend(language)
+        self.segment_seconds = segment_seconds
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 300
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = PAUSE_SECONDS
+        self.recognizer.non_speaking_duration = min(PAUSE_SECONDS, 0.5)
+
+        self._queue = queue.Queue()
+        self._results = {}        # segment number -> text ("" if not understood)
+        self._lock = threading.Lock()
+        self._next_segment = 0
+        self._workers = [threading.Thread(target=self._recognize_loop, daemon=True) for _ in range(workers)]
+        self._listener = None
+        self._stopping = threading.Event()
+        self.errors = []
+        self.started_at = None
+        self.last_audio_at = None
+
+    # ----- capture (listener thread) -----
+    def _listen_loop(self, microphone):
+        # Unlike listen_in_background, the phrase in progress when stop() is
+        # called is still delivered, so the last words are not lost.
+        with microphone as source:
+            while not self._stopping.is_set():
+                try:
+                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=self.segment_seconds)
+                except sr.WaitTimeoutError:
+                    continue
+                except Exception as e:
+                    self.errors.append(f"Aufnahmefehler: {e}")
+                    return
+                audio = prepare_for_recognition(audio, self.recognizer)
+                if audio is None:
+                    continue  # only noise in this segment
+                with self._lock:
+                    number = self._next_segment
+                    self._next_segment += 1
+                    self.last_audio_at = time.monotonic()
+                self._queue.put((number, audio))
+
+    def start(self, microphone=None):
+        """Calibrate on ambient noise and start recording in the background."""
+        microphone = microphone or sr.Microphone(device_index=self.device_index)
+        with microphone as source:
+            calibrate(self.recognizer, source, self.device_index)
+        for worker in self._workers:
+            worker.start()
+        self.started_at = self.last_audio_at = time.monotonic()
+        self._listener = threading.Thread(target=self._listen_loop, args=(microphone,), daemon=True)
+        self._listener.start()
+        return self
+
+    # ----- recognition (worker threads) -----
+    def _recognize_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            number, audio = item
+            text = ""
+            try:
+                with span("speech.recognize_segment"):
+                    text = self.backend.recognize(audio)
+            except sr.UnknownValueError:
+                pass  # silence or noise in this segment
+            except sr.RequestError as e:
+                self.errors.append(f"Spracherkennung nicht erreichbar: {e}")
+            except Exception as e:
+                # Any other backend failure loses this segment, not the worker
+                self.errors.append(f"Spracherkennung fehlgeschlagen: {e}")
+            finally:
+                with self._lock:
+                    self._results[number] = text
+                self._queue.task_done()
+
+    # ----- polling (Streamlit script thread) -----
+    @property
+    def text(self):
+        """Recognised text of all segments finished so far, in recording order."""
+        parts = []
+        with self._lock:
+            for number in range(self._next_segment):
+                if number not in self._results:
+                    break  # keep order: wait for the earlier segment
+                parts.append(self._results[number])
+        return " ".join(p for p in parts if p)
+
+    @property
+    def segments(self):
+        """Number of segments captured so far."""
+        with self._lock:
+            return self._next_segment
+
+    @property
+    def pending(self):
+        """Number of recorded segments still waiting for recognition."""
+        with self._lock:
+            return self._next_segment - len(self._results)
+
+    def silent_for(self):
+        """Seconds since the last segment was captured."""
+        return time.monotonic() - self.last_audio_at if self.last_audio_at else 0.0
+
+    @property
+    def recording(self):
+        return self._listener is not None and self._listener.is_alive()
+
+    def stop(self, timeout=15):
+        """Stop recording, wait for outstanding segments and return the full text."""
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        if self._listener is not None:
+            self._listener.join(self.segment_seconds + 2)
+            remember_threshold(self.recognizer, self.device_index)
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.1)
+        for _ in self._workers:
+            self._queue.put(None)
+        return self.text